@@ -0,0 +1,65 @@
+"""Per-item cost of computed mapping fields compared to plain from/to mapping.
+
+Usage: python benchmarks/bench_mapping.py [items]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from collectors.generic_collector import GenericCollector  # noqa: E402
+from config.loader import ConnectorConfig  # noqa: E402
+
+PLAIN = [
+    {"from": "title", "to": "name"},
+    {"from": "kind", "to": "type"},
+    {"from": "owner.login", "to": "owner"},
+]
+
+COMPUTED = PLAIN + [
+    {"to": "slug", "expr": "lower(replace(title, ' ', '-'))"},
+    {"to": "category", "expr": "'internal' if private else 'public'"},
+    {"to": "url", "template": "https://{owner.login}.example.com/{title}"},
+]
+
+
+def _collector(fields):
+    collector = GenericCollector.__new__(GenericCollector)
+    collector.source = ConnectorConfig({
+        "name": "bench",
+        "connection": {"host": "https://example.com", "auth_type": "none", "endpoint": "/"},
+        "mapping": {"replace_object": "items", "fields": fields},
+    })
+    return collector
+
+
+def _run(fields, items, repeat=3) -> float:
+    collector = _collector(fields)
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        collector._transform_compact(items)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    items = [
+        {"title": f"Service {i}", "kind": "api", "owner": {"login": f"team{i % 50}"}, "private": i % 3 == 0}
+        for i in range(n)
+    ]
+
+    plain = _run(PLAIN, items)
+    computed = _run(COMPUTED, items)
+    extra = computed - plain
+    print(f"items:            {n}")
+    print(f"plain mapping:    {plain * 1e6 / n:.2f} us/item ({len(PLAIN)} fields)")
+    print(f"with 3 computed:  {computed * 1e6 / n:.2f} us/item ({len(COMPUTED)} fields)")
+    print(f"computed fields:  {extra * 1e6 / n / 3:.2f} us/item per field")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+"""Computed mapping fields: small expressions and templates compiled to closures.
+
+Expressions use a restricted Python syntax and are evaluated against the
+(preprocessed) API item::
+
+    - to: type
+      expr: "'bot' if is_bot else 'user'"
+    - to: slug
+      expr: "lower(replace(title, ' ', '-'))"
+    - to: url
+      template: "https://{org}.example.com/{preferred_info.title}"
+
+Names resolve to item fields, ``a.b`` to nested fields and ``a[0]`` to list
+elements; missing fields are ``None``. Only literals, arithmetic, comparisons,
+boolean logic, conditionals and the functions in ``FUNCTIONS`` are allowed. The
+source is parsed and checked once; evaluation runs a tree of closures and never
+touches ``eval``. A failing evaluation (e.g. ``None + 'x'``) yields ``None``.
+"""
+
+import ast
+import operator
+from string import Formatter
+from typing import Any, Callable, Dict
+
+Compiled = Callable[[Dict[str, Any]], Any]
+
+MAX_EXPRESSION_LENGTH = 1000
+# Largest string/list (counting nested elements) an expression or template may produce.
+MAX_SEQUENCE_LENGTH = 10_000
+
+
+def _text(fn):
+    """Wrap a string function so ``None`` stays ``None``."""
+    return lambda v, *args: None if v is None else fn(str(v), *args)
+
+
+def _coalesce(*values):
+    for value in values:
+        if value is not None and value != "":
+            return value
+    return None
+
+
+def _join(values, sep=","):
+    if values is None:
+        return None
+    return sep.join("" if v is None else str(v) for v in values)
+
+
+FUNCTIONS: Dict[str, Callable[..., Any]] = {
+    "lower": _text(str.lower),
+    "upper": _text(str.upper),
+    "strip": _text(str.strip),
+    "title": _text(str.title),
+    "replace": _text(str.replace),
+    "split": _text(str.split),
+    "startswith": _text(str.startswith),
+    "endswith": _text(str.endswith),
+    "str": lambda v: "" if v is None else str(v),
+    "int": int,
+    "float": float,
+    "bool": bool,
+    "len": lambda v: 0 if v is None else len(v),
+    "join": _join,
+    "coalesce": _coalesce,
+    "min": min,
+    "max": max,
+}
+
+
+def _size(value: Any, limit: int = MAX_SEQUENCE_LENGTH) -> int:
+    """Characters/elements of a str/list/tuple including nested ones; stops counting past ``limit``."""
+    if isinstance(value, str):
+        return len(value)
+    if not isinstance(value, (list, tuple)):
+        return 0
+    total = len(value)
+    for element in value:
+        if total > limit:
+            break
+        total += _size(element, limit - total)
+    return total
+
+
+def _bounded(value: Any) -> Any:
+    if _size(value) > MAX_SEQUENCE_LENGTH:
+        raise ValueError("result too large")
+    return value
+
+
+def _multiply(a, b):
+    for seq, count in ((a, b), (b, a)):
+        if isinstance(seq, (str, list, tuple)) and isinstance(count, int) \
+                and _size(seq) * count > MAX_SEQUENCE_LENGTH:
+            raise ValueError("repeated sequence too large")
+    return a * b
+
+
+def _modulo(a, b):
+    """Numbers only: ``%`` on a string would be printf-style formatting with unbounded widths."""
+    if not isinstance(a, (int, float)) or not isinstance(b, (int, float)):
+        raise TypeError("% takes numbers only")
+    return a % b
+
+
+_BINARY = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: _multiply,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: _modulo,
+}
+
+_UNARY = {
+    ast.Not: operator.not_,
+    ast.USub: operator.neg,
+    ast.UAdd: operator.pos,
+}
+
+_COMPARE = {
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+    ast.In: lambda a, b: b is not None and a in b,
+    ast.NotIn: lambda a, b: b is None or a not in b,
+    ast.Is: operator.is_,
+    ast.IsNot: operator.is_not,
+}
+
+
+def _lookup(container: Any, key: Any) -> Any:
+    if isinstance(container, dict):
+        return container.get(key)
+    if isinstance(container, (list, tuple, str)) and isinstance(key, int):
+        return container[key] if -len(container) <= key < len(container) else None
+    return None
+
+
+def _compile_node(node: ast.AST, source: str) -> Compiled:
+    if isinstance(node, ast.Constant):
+        value = node.value
+        return lambda item: value
+
+    if isinstance(node, ast.Name):
+        name = node.id
+        return lambda item: item.get(name)
+
+    if isinstance(node, ast.Attribute):
+        base = _compile_node(node.value, source)
+        attr = node.attr
+        return lambda item: _lookup(base(item), attr)
+
+    if isinstance(node, ast.Subscript):
+        base = _compile_node(node.value, source)
+        index = _compile_node(node.slice, source)
+        return lambda item: _lookup(base(item), index(item))
+
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINARY:
+        op = _BINARY[type(node.op)]
+        left, right = _compile_node(node.left, source), _compile_node(node.right, source)
+        return lambda item: _bounded(op(left(item), right(item)))
+
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY:
+        op = _UNARY[type(node.op)]
+        operand = _compile_node(node.operand, source)
+        return lambda item: op(operand(item))
+
+    if isinstance(node, ast.BoolOp):
+        values = [_compile_node(v, source) for v in node.values]
+        if isinstance(node.op, ast.And):
+            def all_of(item):
+                result = None
+                for value in values:
+                    result = value(item)
+                    if not result:
+                        return result
+                return result
+            return all_of
+
+        def any_of(item):
+            result = None
+            for value in values:
+                result = value(item)
+                if result:
+                    return result
+            return result
+        return any_of
+
+    if isinstance(node, ast.Compare) and all(type(op) in _COMPARE for op in node.ops):
+        left = _compile_node(node.left, source)
+        chain = [(_COMPARE[type(op)], _compile_node(c, source)) for op, c in zip(node.ops, node.comparators)]
+
+        def compare(item):
+            current = left(item)
+            for op, right in chain:
+                other = right(item)
+                if not op(current, other):
+                    return False
+                current = other
+            return True
+        return compare
+
+    if isinstance(node, ast.IfExp):
+        test, body, orelse = (_compile_node(n, source) for n in (node.test, node.body, node.orelse))
+        return lambda item: body(item) if test(item) else orelse(item)
+
+    if isinstance(node, (ast.List, ast.Tuple)):
+        elements = [_compile_node(e, source) for e in node.elts]
+        return lambda item: _bounded([e(item) for e in elements])
+
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and not node.keywords:
+        fn = FUNCTIONS.get(node.func.id)
+        if fn is None:
+            raise ValueError(f"unknown function '{node.func.id}' in expression '{source}' ({'|'.join(FUNCTIONS)})")
+        args = [_compile_node(a, source) for a in node.args]
+        return lambda item: _bounded(fn(*[a(item) for a in args]))
+
+    raise ValueError(f"unsupported syntax '{type(node).__name__}' in expression '{source}'")
+
+
+def _guarded(fn: Compiled) -> Compiled:
+    def evaluate(item: Dict[str, Any]) -> Any:
+        try:
+            return fn(item)
+        except (TypeError, ValueError, ZeroDivisionError, AttributeError, OverflowError):
+            return None
+    return evaluate
+
+
+def compile_expression(source: str) -> Compiled:
+    """Compile an expression into a function item -> value. Raises ValueError on invalid input."""
+    if not isinstance(source, str) or not source.strip():
+        raise ValueError("expression must be a non-empty string")
+    if len(source) > MAX_EXPRESSION_LENGTH:
+        raise ValueError(f"expression longer than {MAX_EXPRESSION_LENGTH} characters")
+    try:
+        tree = ast.parse(source.strip(), mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"invalid expression '{source}': {e.msg}") from e
+    return _guarded(_compile_node(tree.body, source))
+
+
+def compile_template(source: str) -> Compiled:
+    """Compile a ``{field}`` template; placeholders are expressions, missing values render empty.
+
+    A rendered value longer than ``MAX_SEQUENCE_LENGTH`` becomes None, like a failing expression.
+    """
+    if not isinstance(source, str):
+        raise ValueError("template must be a string")
+    parts = []
+    try:
+        parsed = list(Formatter().parse(source))
+    except ValueError as e:
+        raise ValueError(f"invalid template '{source}': {e}") from e
+    for literal, field, _, _ in parsed:
+        if literal:
+            parts.append(literal)
+        if field is not None:
+            parts.append(compile_expression(field))
+
+    if all(isinstance(p, str) for p in parts):
+        constant = "".join(parts)
+        return lambda item: constant
+
+    def render(item: Dict[str, Any]) -> str:
+        out = []
+        for part in parts:
+            if isinstance(part, str):
+                out.append(part)
+            else:
+                value = part(item)
+                out.append("" if value is None else str(value))
+        rendered = "".join(out)
+        return None if len(rendered) > MAX_SEQUENCE_LENGTH else rendered
+    return render
@@ -1,78 +1,244 @@
-from typing import List, Dict, Any
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Sequence, Tuple
 
 from collectors.base_collector import BaseCollector
+from collectors.records import MISSING, CompactSection
+from collectors.shared_responses import SharedResponses
 from config.loader import Config, ConnectorConfig
 from gateway.client import ApiClient
+from gateway.latency import LatencyHistory
+from gateway.oauth import TokenProvider
+from gateway.rate_limit import RateLimiters
+from utils.deadline import Deadline, DeadlineExceeded
 from utils.logger import Logger as log
 
 
 class GenericCollector(BaseCollector):
     """Generic REST API collector. Fetches data from any REST endpoint configured in settings.yaml."""
 
-    def __init__(self, source: ConnectorConfig):
+    def __init__(
+        self,
+        source: ConnectorConfig,
+        shared: Optional[SharedResponses] = None,
+        upstream: Optional[Dict[str, Sequence[Dict[str, Any]]]] = None,
+        deadline: Optional[Deadline] = None,
+        latency: Optional[LatencyHistory] = None,
+        rate_limiters: Optional[RateLimiters] = None,
+        tokens: Optional[TokenProvider] = None,
+    ):
         super().__init__(source)
         cfg = Config()
-        self.client = ApiClient(source, verify=cfg.verify)
+        self.deadline = deadline or Deadline()
+        self.client = ApiClient(
+            source, verify=cfg.verify, deadline=self.deadline, latency=latency, rate_limiters=rate_limiters,
+            tokens=tokens,
+        )
+        self.shared = shared
+        self.shared_response = False
+        self.timed_out = False
+        self.upstream = upstream or {}
 
-    def collect(self) -> List[Dict[str, Any]]:
-        log.info("GenericCollector", f"Collecting from '{self.source.name}' -> {self.source.endpoint}")
+    def _fetch(self, endpoint: Optional[str] = None, body: Any = None) -> Any:
+        endpoint = endpoint or self.source.endpoint
+        method = self.source.method
+        if body is None:
+            body = self.source.body
 
-        try:
-            response = self.client.get(self.source.endpoint)
-        except Exception as e:
-            log.error("GenericCollector", f"Failed to collect from '{self.source.name}': {e}")
-            return []
+        def send() -> Any:
+            return self.client.post(endpoint, body) if method == "POST" else self.client.get(endpoint)
 
+        if self.shared is None:
+            return send()
+
+        params = {"body": json.dumps(body, sort_keys=True, default=str)} if body is not None else None
+        key = SharedResponses.request_key(
+            method, f"{self.client.base_url}{endpoint}", self.client.identity_headers, params, verify=self.client.verify,
+        )
+        response, shared = self.shared.fetch(key, send)
+        if shared:
+            self.shared_response = True
+            log.debug("GenericCollector", "'%s' reuses the response of an identical request", self.source.name)
+        return response
+
+    def _extract_items(self, response: Any, endpoint: str) -> Optional[Tuple[int, Iterable[Any]]]:
+        """Unwrap a decoded response into (count, items); None if it holds no usable data."""
         if response is None:
-            log.warn("GenericCollector", f"No data returned from '{self.source.name}'")
-            return []
+            log.warn("GenericCollector", f"No data returned from '{self.source.name}' ({endpoint})")
+            return None
 
-        response_type = type(response).__name__
+        wrapper_key = None
         if isinstance(response, list):
             data = response
         elif isinstance(response, dict):
-            wrapper_key = None
             for key in ["data", "items", "results", "records"]:
                 if key in response:
                     data = response[key]
                     wrapper_key = key
                     break
             else:
-                data = self._dict_to_list(response)
+                data = response
         else:
             log.warn("GenericCollector", f"Unexpected response type from '{self.source.name}': {type(response)}")
+            return None
+
+        log.debug("GenericCollector", "response_type=%s wrapper_key=%s", type(response).__name__, wrapper_key)
+
+        if not isinstance(data, (list, dict)):
+            data = [data]
+        return len(data), self._iter_dict_items(data) if isinstance(data, dict) else data
+
+    def _fetch_fan_out(self) -> List[Any]:
+        """Fetch every fan-out value (or batch of values) concurrently; items are concatenated in value order.
+
+        A failing sub-request fails the whole connector, so a partial section never
+        replaces complete output.
+        """
+        fan_out = self.source.fan_out
+        values = self._fan_out_values()
+        if not values:
+            log.warn("GenericCollector", f"'{self.source.name}': no fan-out values")
             return []
 
-        if not isinstance(data, list):
-            if isinstance(data, dict):
-                data = self._dict_to_list(data)
-            else:
-                data = [data]
+        def fetch_one(value: Any) -> List[Any]:
+            endpoint = fan_out.endpoint_for(self.source.endpoint, value)
+            body = fan_out.body_for(self.source.body, value) if self.source.body is not None else None
+            extracted = self._extract_items(self._fetch(endpoint, body), endpoint)
+            if extracted is None:
+                return []
+            items = extracted[1]
+            if fan_out.inject:
+                return [{**item, fan_out.inject: value} if isinstance(item, dict) else item for item in items]
+            return items if isinstance(items, list) else list(items)
 
-        log.info("GenericCollector", f"Collected {len(data)} items from '{self.source.name}'")
+        requests = fan_out.requests_for(values)
+        workers = min(fan_out.max_workers, len(requests))
         log.debug(
-            "GenericCollector",
-            f"response_type={response_type} wrapper_key={wrapper_key if isinstance(response, dict) else None}",
+            "GenericCollector", "'%s': fan-out over %d value(s) in %d request(s), %d worker(s)",
+            self.source.name, len(values), len(requests), workers,
+        )
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(fetch_one, requests))
+        return [item for part in parts for item in part]
+
+    def _fan_out_values(self) -> List[Any]:
+        """Static fan-out values followed by distinct values taken from the upstream connector's items."""
+        fan_out = self.source.fan_out
+        values = list(fan_out.values)
+        if not fan_out.values_from:
+            return values
+
+        items = self.upstream.get(fan_out.values_from["connector"]) or []
+        field = fan_out.values_from["field"]
+        if isinstance(items, CompactSection) and field in items.keys:
+            column: Iterable[Any] = items.column(field)
+        else:
+            column = (self._get_path(item, field) for item in items if isinstance(item, dict))
+
+        seen = set(values)
+        for value in column:
+            if isinstance(value, (str, int)) and not isinstance(value, bool) and value not in seen:
+                seen.add(value)
+                values.append(value)
+        return values
+
+    def collect(self) -> Sequence[Dict[str, Any]]:
+        log.info("GenericCollector", f"Collecting from '{self.source.name}' -> {self.source.endpoint}")
+
+        try:
+            if self.source.fan_out:
+                data = self._fetch_fan_out()
+                extracted = (len(data), data)
+            else:
+                extracted = self._extract_items(self._fetch(), self.source.endpoint)
+        except DeadlineExceeded as e:
+            self.timed_out = True
+            log.error("GenericCollector", f"'{self.source.name}' cancelled: {e}")
+            return []
+        except Exception as e:
+            # A request timeout capped by the run deadline counts as cancelled, not failed.
+            self.timed_out = self.deadline.expired
+            log.error("GenericCollector", f"Failed to collect from '{self.source.name}': {e}")
+            return []
+
+        if extracted is None:
+            return []
+        count, items = extracted
+
+        log.info("GenericCollector", f"Collected {count} items from '{self.source.name}'")
+
+        if self.source.mapping_fields and self.source.options.get("compact_records", True):
+            section = self._transform_compact(items)
+            log.debug("GenericCollector", "Applied mapping/defaults to %d items (compact)", len(section))
+            return section
+
+        if self.source.mapping_fields or self.source.defaults or self.source.preprocess:
+            owned = self.source.preprocess is not None
+            data = [self._transform(work, owned) for item in items for work in self._preprocess(item)]
+            log.debug("GenericCollector", "Applied mapping/defaults to %d items", len(data))
+            return data
+
+        return items if isinstance(items, list) else list(items)
+
+    def _transform_compact(self, items: Iterable[Dict[str, Any]]) -> CompactSection:
+        """Map items straight into value rows over a shared per-connector key schema.
+
+        Equivalent to ``_transform`` but without building an intermediate dict per item;
+        defaults are stored once on the section instead of in every item.
+        """
+        mapping_fields = self.source.mapping_fields
+        section = CompactSection(
+            [m["to"] for m in mapping_fields] + list(self.source.defaults),
+            self.source.defaults,
         )
+        plan = [
+            (m.get("from"), section.slot(m["to"]), "." in m.get("from", ""), m.get("compute"))
+            for m in mapping_fields
+        ]
+        width = len(section.keys)
+        get_path = self._get_path
+
+        preprocess = self._preprocess
 
-        if self.source.mapping_fields or self.source.defaults:
-            data = [self._transform(self._preprocess(item)) for item in data]
-            log.debug("GenericCollector", f"Applied mapping/defaults to {len(data)} items")
+        for raw in items:
+            for item in preprocess(raw):
+                row = [MISSING] * width
+                for api_field, slot, dotted, compute in plan:
+                    if compute is not None:
+                        value = compute(item)
+                        if value is not None:
+                            row[slot] = value
+                    elif dotted:
+                        value = get_path(item, api_field)
+                        if value is not None or api_field in item:
+                            row[slot] = value
+                    else:
+                        value = item.get(api_field, MISSING)
+                        if value is not MISSING:
+                            row[slot] = value
+                section.append_row(row)
 
-        return data
+        return section
 
-    def _transform(self, item: Dict[str, Any]) -> Dict[str, Any]:
+    def _transform(self, item: Dict[str, Any], owned: bool = False) -> Dict[str, Any]:
+        """Apply mapping and defaults. ``owned`` items (preprocessing copies) are reused without copying."""
         result = {}
 
         if self.source.mapping_fields:
             for mapping in self.source.mapping_fields:
-                api_field = mapping.get("from")
                 output_field = mapping.get("to")
+                compute = mapping.get("compute")
+                if compute is not None:
+                    value = compute(item)
+                    if value is not None:
+                        result[output_field] = value
+                    continue
+                api_field = mapping.get("from")
                 value = self._get_path(item, api_field)
                 if value is not None or api_field in item:
                     result[output_field] = value
         else:
-            result = dict(item)
+            result = item if owned else dict(item)
 
         for key, value in self.source.defaults.items():
             if key not in result:
@@ -80,38 +246,12 @@ class GenericCollector(BaseCollector):
 
         return result
 
-    def _preprocess(self, item: Dict[str, Any]) -> Dict[str, Any]:
-        if not self.source.options:
-            return item
-
-        if self.source.options.get("flatten_preferred_version") is True:
-            return self._flatten_preferred_version(item)
-
-        return item
-
-    @staticmethod
-    def _flatten_preferred_version(item: Dict[str, Any]) -> Dict[str, Any]:
-        preferred = item.get("preferred")
-        versions = item.get("versions", {})
-        if not preferred or not isinstance(versions, dict):
-            return item
-
-        preferred_entry = versions.get(preferred)
-        if not isinstance(preferred_entry, dict):
-            return item
-
-        info = preferred_entry.get("info", {})
-        out = dict(item)
-        out["preferred_info"] = info
-        out["preferred_spec"] = {
-            "swaggerUrl": preferred_entry.get("swaggerUrl"),
-            "swaggerYamlUrl": preferred_entry.get("swaggerYamlUrl"),
-            "openapiVer": preferred_entry.get("openapiVer"),
-            "link": preferred_entry.get("link"),
-            "updated": preferred_entry.get("updated"),
-            "added": preferred_entry.get("added"),
-        }
-        return out
+    def _preprocess(self, item: Dict[str, Any]) -> Sequence[Dict[str, Any]]:
+        """Run the connector's fused preprocessing pipeline; returns the resulting item(s)."""
+        pipeline = self.source.preprocess
+        if pipeline is None:
+            return (item,)
+        return pipeline(item)
 
     @staticmethod
     def _get_path(item: Dict[str, Any], path: str):
@@ -126,13 +266,16 @@ class GenericCollector(BaseCollector):
         return current
 
     @staticmethod
-    def _dict_to_list(data: Dict[str, Any]) -> List[Dict[str, Any]]:
-        out: List[Dict[str, Any]] = []
+    def _iter_dict_items(data: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """Yield a keyed response as items one at a time, so only one merged dict is alive."""
         for key, value in data.items():
             if isinstance(value, dict):
                 item = {"api_id": key}
                 item.update(value)
-                out.append(item)
+                yield item
             else:
-                out.append({"api_id": key, "value": value})
-        return out
+                yield {"api_id": key, "value": value}
+
+    @staticmethod
+    def _dict_to_list(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return list(GenericCollector._iter_dict_items(data))
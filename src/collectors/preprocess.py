@@ -0,0 +1,218 @@
+"""Named preprocessing steps, composed into one fused per-item pass.
+
+Connectors list steps under ``options.preprocess``::
+
+    options:
+      preprocess:
+        - flatten_preferred_version
+        - step: rename
+          fields: {title: name}
+        - step: explode
+          field: members
+          into: member_name
+
+Every step works in place on the pipeline's own working copy of an item, so a
+pipeline costs one shallow copy per item regardless of how many steps it has
+(``explode`` additionally copies once per produced item).
+"""
+
+from typing import Any, Callable, Dict, List, Optional
+
+# Step factory: takes the step's parameters, returns a function that modifies an item
+# in place (returns None) or, for expanding steps, returns the list of resulting items.
+StepFactory = Callable[[Dict[str, Any]], Callable[[Dict[str, Any]], Optional[List[Dict[str, Any]]]]]
+
+STEPS: Dict[str, StepFactory] = {}
+EXPANDING_STEPS = set()
+
+
+def step(name: str, expands: bool = False):
+    """Register a preprocessing step factory under ``name``."""
+    def register(factory: StepFactory) -> StepFactory:
+        STEPS[name] = factory
+        if expands:
+            EXPANDING_STEPS.add(name)
+        return factory
+    return register
+
+
+def _require(params: Dict[str, Any], key: str, kind, name: str):
+    value = params.get(key)
+    if not isinstance(value, kind) or not value:
+        raise ValueError(f"preprocess step '{name}': '{key}' is required")
+    return value
+
+
+@step("flatten_preferred_version")
+def _flatten_preferred_version(params):
+    def run(item):
+        preferred = item.get("preferred")
+        versions = item.get("versions", {})
+        if not preferred or not isinstance(versions, dict):
+            return None
+
+        preferred_entry = versions.get(preferred)
+        if not isinstance(preferred_entry, dict):
+            return None
+
+        item["preferred_info"] = preferred_entry.get("info", {})
+        item["preferred_spec"] = {
+            "swaggerUrl": preferred_entry.get("swaggerUrl"),
+            "swaggerYamlUrl": preferred_entry.get("swaggerYamlUrl"),
+            "openapiVer": preferred_entry.get("openapiVer"),
+            "link": preferred_entry.get("link"),
+            "updated": preferred_entry.get("updated"),
+            "added": preferred_entry.get("added"),
+        }
+        return None
+    return run
+
+
+@step("flatten")
+def _flatten(params):
+    """Merge a nested dict into the item: {field: info, prefix: "info_", keep: false}."""
+    field = _require(params, "field", str, "flatten")
+    prefix = params.get("prefix", "")
+    keep = bool(params.get("keep", False))
+
+    def run(item):
+        nested = item.get(field) if keep else item.pop(field, None)
+        if isinstance(nested, dict):
+            for key, value in nested.items():
+                item[f"{prefix}{key}"] = value
+        elif nested is not None and not keep:
+            item[field] = nested
+        return None
+    return run
+
+
+@step("rename")
+def _rename(params):
+    """Rename top-level fields: {fields: {old: new}}."""
+    renames = list(_require(params, "fields", dict, "rename").items())
+
+    def run(item):
+        for old, new in renames:
+            if old in item:
+                item[new] = item.pop(old)
+        return None
+    return run
+
+
+@step("drop")
+def _drop(params):
+    """Remove top-level fields: {fields: [a, b]}."""
+    fields = list(_require(params, "fields", list, "drop"))
+
+    def run(item):
+        for field in fields:
+            item.pop(field, None)
+        return None
+    return run
+
+
+_COERCIONS: Dict[str, Callable[[Any], Any]] = {
+    "str": str,
+    "int": int,
+    "float": float,
+    "bool": lambda v: v.strip().lower() in ("1", "true", "yes", "on") if isinstance(v, str) else bool(v),
+    "lower": lambda v: str(v).lower(),
+    "upper": lambda v: str(v).upper(),
+}
+
+
+@step("coerce")
+def _coerce(params):
+    """Convert field types: {fields: {port: int, enabled: bool}}. Values that fail to convert are kept."""
+    conversions = []
+    for field, kind in _require(params, "fields", dict, "coerce").items():
+        if kind not in _COERCIONS:
+            raise ValueError(f"preprocess step 'coerce': unknown type '{kind}' for '{field}' ({'|'.join(_COERCIONS)})")
+        conversions.append((field, _COERCIONS[kind]))
+
+    def run(item):
+        for field, convert in conversions:
+            value = item.get(field)
+            if value is not None:
+                try:
+                    item[field] = convert(value)
+                except (TypeError, ValueError):
+                    pass
+        return None
+    return run
+
+
+@step("explode", expands=True)
+def _explode(params):
+    """Turn each element of a list field into its own item: {field: members, into: member, merge: false}.
+
+    With ``merge: true`` dict elements are merged into the item instead of stored under ``into``.
+    Items whose field is missing or not a list pass through unchanged; an item whose
+    list is empty produces no items, i.e. it is dropped.
+    """
+    field = _require(params, "field", str, "explode")
+    into = params.get("into", field)
+    merge = bool(params.get("merge", False))
+
+    def run(item):
+        values = item.get(field)
+        if not isinstance(values, list):
+            return [item]
+        del item[field]
+        out = []
+        for value in values:
+            child = dict(item)
+            if merge and isinstance(value, dict):
+                child.update(value)
+            else:
+                child[into] = value
+            out.append(child)
+        return out
+    return run
+
+
+def parse_steps(options: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Normalize ``options`` into a list of {step: name, ...params}; legacy flags come first."""
+    specs: List[Dict[str, Any]] = []
+    if options.get("flatten_preferred_version") is True:
+        specs.append({"step": "flatten_preferred_version"})
+
+    raw = options.get("preprocess") or []
+    if not isinstance(raw, list):
+        raise ValueError("options.preprocess must be a list of steps")
+    for entry in raw:
+        if isinstance(entry, str):
+            entry = {"step": entry}
+        if not isinstance(entry, dict) or entry.get("step") not in STEPS:
+            raise ValueError(f"unknown preprocess step {entry!r}, expected one of {'|'.join(sorted(STEPS))}")
+        specs.append(entry)
+    return specs
+
+
+def compile_pipeline(specs: List[Dict[str, Any]]) -> Optional[Callable[[Dict[str, Any]], List[Dict[str, Any]]]]:
+    """Fuse steps into one function item -> list of preprocessed items (None if there are no steps)."""
+    if not specs:
+        return None
+
+    stages = [(STEPS[s["step"]](s), s["step"] in EXPANDING_STEPS) for s in specs]
+
+    if not any(expands for _, expands in stages):
+        fns = [fn for fn, _ in stages]
+
+        def run_simple(item: Dict[str, Any]) -> List[Dict[str, Any]]:
+            work = dict(item)
+            for fn in fns:
+                fn(work)
+            return [work]
+        return run_simple
+
+    def run(item: Dict[str, Any]) -> List[Dict[str, Any]]:
+        items = [dict(item)]
+        for fn, expands in stages:
+            if expands:
+                items = [out for work in items for out in fn(work)]
+            else:
+                for work in items:
+                    fn(work)
+        return items
+    return run
@@ -0,0 +1,107 @@
+"""Compact in-memory representation of mapped items."""
+
+from collections.abc import Sequence
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+class _Missing:
+    """Marker for absent values; pickles by reference so rows stay valid in other processes."""
+
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return "MISSING"
+
+    def __reduce__(self) -> str:
+        return "MISSING"
+
+
+MISSING = _Missing()
+
+
+class CompactSection(Sequence):
+    """Items of one section stored as value tuples over a shared key schema.
+
+    Every row is a tuple aligned with ``keys``; absent values are ``MISSING`` and fall
+    back to the connector defaults on materialization. String values are interned per
+    section, so repeated values (types, enum strings, org names) are stored once.
+    Items are only materialized as dicts when accessed, e.g. while writing output.
+    """
+
+    __slots__ = ("keys", "defaults", "rows", "_pool", "_index")
+
+    def __init__(self, keys: Iterable[str], defaults: Optional[Dict[str, Any]] = None):
+        self.keys: Tuple[str, ...] = tuple(dict.fromkeys(keys))
+        self.defaults: Dict[str, Any] = dict(defaults or {})
+        self.rows: List[Tuple[Any, ...]] = []
+        self._pool: Dict[str, str] = {}
+        self._index: Dict[str, int] = {k: i for i, k in enumerate(self.keys)}
+
+    def slot(self, key: str) -> int:
+        return self._index[key]
+
+    def _intern(self, value: Any) -> Any:
+        if type(value) is str:
+            return self._pool.setdefault(value, value)
+        if type(value) is list and value and all(type(v) is str for v in value):
+            pool = self._pool
+            return [pool.setdefault(v, v) for v in value]
+        return value
+
+    def append_row(self, values: List[Any]) -> None:
+        """Append a row of values aligned with ``keys`` (``MISSING`` for absent values)."""
+        intern = self._intern
+        self.rows.append(tuple(v if v is MISSING else intern(v) for v in values))
+
+    def _materialize(self, row: Tuple[Any, ...]) -> Dict[str, Any]:
+        # Same key order as the dict transform: present values first, then the defaults
+        # that are still missing, in defaults order (also for keys that are mapped as well).
+        item = {key: value for key, value in zip(self.keys, row) if value is not MISSING}
+        for key, value in self.defaults.items():
+            if key not in item:
+                item[key] = value
+        return item
+
+    def column(self, key: str) -> Iterator[Any]:
+        """Yield one field of every item without materializing the items (None if absent)."""
+        i = self._index[key]
+        default = self.defaults.get(key)
+        for row in self.rows:
+            value = row[i]
+            yield default if value is MISSING else value
+
+    def select_rows(self, keep: Iterable[bool]) -> "CompactSection":
+        """Return a section with only the rows whose flag in ``keep`` is true (schema and pool shared)."""
+        section = CompactSection.__new__(CompactSection)
+        section.keys, section.defaults, section._pool, section._index = self.keys, self.defaults, self._pool, self._index
+        section.rows = [row for row, k in zip(self.rows, keep) if k]
+        return section
+
+    def materialize(self) -> List[Dict[str, Any]]:
+        return [self._materialize(row) for row in self.rows]
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._materialize(row) for row in self.rows[index]]
+        return self._materialize(self.rows[index])
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        materialize = self._materialize
+        for row in self.rows:
+            yield materialize(row)
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, (CompactSection, list)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"CompactSection(keys={self.keys}, items={len(self.rows)})"
+
+
+def materialize(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Return data with every CompactSection replaced by a plain list of dicts."""
+    return {k: v.materialize() if isinstance(v, CompactSection) else v for k, v in data.items()}
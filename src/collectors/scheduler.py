@@ -0,0 +1,164 @@
+"""Dependency-aware, concurrent scheduling of connectors (``depends_on``)."""
+
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Sequence
+
+from utils.deadline import Deadline
+
+
+class ConnectorRun(NamedTuple):
+    """What one connector run produced: its items and per-run counters for the summary."""
+
+    items: Any
+    shared_response: bool = False
+    timed_out: bool = False
+    network_seconds: float = 0.0
+    rate_limit_wait_seconds: float = 0.0
+    wire_bytes: int = 0
+    decoded_bytes: int = 0
+
+
+class Outcome(NamedTuple):
+    """A finished connector: its result, or why it has none (skipped, or cut off by the deadline)."""
+
+    source: Any
+    result: Any
+    skipped: Optional[str] = None
+    timed_out: bool = False
+
+
+class ConnectorGraph:
+    """DAG of connectors built from their ``depends_on`` lists.
+
+    Construction validates the graph: dependencies must name exactly one configured
+    connector and must not form a cycle.
+    """
+
+    def __init__(self, sources: Sequence[Any]):
+        self.sources = list(sources)
+        by_name: Dict[str, List[int]] = {}
+        for i, source in enumerate(self.sources):
+            by_name.setdefault(source.name, []).append(i)
+
+        self.deps: List[List[int]] = []
+        self.dependents: List[List[int]] = [[] for _ in self.sources]
+        for i, source in enumerate(self.sources):
+            deps = []
+            for name in getattr(source, "depends_on", None) or []:
+                matches = by_name.get(name, [])
+                if not matches:
+                    raise ValueError(f"connector '{source.name}': depends_on '{name}' is not a configured connector")
+                if len(matches) > 1:
+                    raise ValueError(f"connector '{source.name}': depends_on '{name}' is ambiguous (duplicate name)")
+                if matches[0] not in deps:
+                    deps.append(matches[0])
+                    self.dependents[matches[0]].append(i)
+            self.deps.append(deps)
+
+        self._check_cycles()
+
+    def _check_cycles(self) -> None:
+        remaining = [len(d) for d in self.deps]
+        ready = [i for i, n in enumerate(remaining) if n == 0]
+        seen = 0
+        while ready:
+            i = ready.pop()
+            seen += 1
+            for j in self.dependents[i]:
+                remaining[j] -= 1
+                if remaining[j] == 0:
+                    ready.append(j)
+        if seen != len(self.sources):
+            cycle = sorted(self.sources[i].name for i, n in enumerate(remaining) if n > 0)
+            raise ValueError(f"connector dependency cycle between: {', '.join(cycle)}")
+
+    def components(self) -> List[List[int]]:
+        """Groups of connectors linked by ``depends_on`` (in configured order), e.g. for sharding."""
+        parent = list(range(len(self.sources)))
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        for i, deps in enumerate(self.deps):
+            for d in deps:
+                parent[find(i)] = find(d)
+        groups: Dict[int, List[int]] = {}
+        for i in range(len(self.sources)):
+            groups.setdefault(find(i), []).append(i)
+        return sorted(groups.values())
+
+    def run(
+        self,
+        execute: Callable[[Any, Dict[str, Any]], Any],
+        succeeded: Callable[[Any], bool],
+        max_workers: int,
+        deadline: Optional[Deadline] = None,
+    ) -> Iterator[Outcome]:
+        """Run enabled connectors on a pool as soon as their dependencies are done.
+
+        ``execute(source, upstream)`` receives the results of the connector's
+        dependencies by name. Outcomes are yielded on the caller's thread in completion
+        order. When a connector fails (``succeeded`` is false) or is disabled, its
+        transitive dependents are skipped; independent branches keep running.
+
+        Once ``deadline`` passes, nothing new is started and every connector that is
+        still running or waiting is reported with ``timed_out``. Running work is not
+        waited for; it is expected to stop on its own deadline checks.
+        """
+        deadline = deadline or Deadline()
+        waiting = {i: set(deps) for i, deps in enumerate(self.deps)}
+        results: Dict[int, Any] = {}
+
+        def skip_dependents(i: int, reason: str) -> Iterator[Outcome]:
+            for j in self.dependents[i]:
+                if j in waiting:
+                    del waiting[j]
+                    if self.sources[j].enabled:
+                        yield Outcome(self.sources[j], None, reason)
+                    yield from skip_dependents(j, reason)
+
+        for i, source in enumerate(self.sources):
+            if not source.enabled and i in waiting:
+                del waiting[i]
+                yield from skip_dependents(i, f"upstream '{source.name}' is disabled")
+
+        pool = ThreadPoolExecutor(max_workers=max_workers)
+        running = {}
+
+        def submit_ready() -> None:
+            if deadline.expired:
+                return
+            for i in [i for i, deps in waiting.items() if not deps]:
+                del waiting[i]
+                upstream = {self.sources[d].name: results[d] for d in self.deps[i]}
+                running[pool.submit(execute, self.sources[i], upstream)] = i
+
+        try:
+            submit_ready()
+            while running:
+                done, _ = wait(running, timeout=deadline.remaining(), return_when=FIRST_COMPLETED)
+                if not done:
+                    break
+                for future in done:
+                    i = running.pop(future)
+                    result = future.result()
+                    yield Outcome(self.sources[i], result)
+                    if succeeded(result):
+                        results[i] = result
+                        for j in self.dependents[i]:
+                            if j in waiting:
+                                waiting[j].discard(i)
+                    else:
+                        yield from skip_dependents(i, f"upstream '{self.sources[i].name}' failed")
+                submit_ready()
+
+            for i in sorted(running.values()):
+                yield Outcome(self.sources[i], None, "still running at the run deadline", timed_out=True)
+            for i in sorted(waiting):
+                if self.sources[i].enabled:
+                    yield Outcome(self.sources[i], None, "not started before the run deadline", timed_out=True)
+        finally:
+            pool.shutdown(wait=not deadline.expired, cancel_futures=True)
@@ -0,0 +1,295 @@
+"""Splitting the connectors of one run across several seeder replicas."""
+
+import json
+import os
+import pickle
+import re
+import shutil
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from collectors.scheduler import ConnectorGraph, Outcome
+from config.defaults import DEFAULT_LEASE_SECONDS
+from utils.deadline import Deadline
+from utils.logger import Logger as log
+
+MERGE_UNIT = "merge"
+
+
+class Lease(NamedTuple):
+    """Ownership of one unit of work; a higher ``generation`` means it was taken over."""
+
+    unit: str
+    generation: int
+
+
+class Coordinator(ABC):
+    """Hands out units of work (connector groups, the merge) to replicas of one run.
+
+    A lease is held until it expires; the holder renews it while working. An expired
+    lease can be claimed by any replica, which is how work of a dead replica is
+    reassigned. Results are write-once: the first completed result of a unit wins.
+    """
+
+    owner: str
+
+    @abstractmethod
+    def claim(self, unit: str) -> Optional[Lease]:
+        """Take the unit if it is unclaimed or its lease expired; None if it is held or done."""
+
+    @abstractmethod
+    def renew(self, lease: Lease) -> bool:
+        """Extend a held lease; False if another replica took it over."""
+
+    @abstractmethod
+    def complete(self, unit: str, result: Any) -> bool:
+        """Store the unit's result; False if another replica already stored one."""
+
+    @abstractmethod
+    def result(self, unit: str) -> Optional[Any]:
+        """The stored result of a unit, or None."""
+
+    @abstractmethod
+    def is_done(self) -> bool:
+        """True once the run was merged."""
+
+    @abstractmethod
+    def finish(self) -> None:
+        """Mark the run as merged and drop the partial results."""
+
+
+class FileCoordinator(Coordinator):
+    """Coordinator on a shared directory, usable by replicas on different hosts.
+
+    Layout below ``<root>/<run_id>``: ``leases/<unit>.<generation>`` (JSON with owner
+    and expiry), ``results/<unit>.pickle`` and a ``done`` marker. Every file is written
+    to a temp file and linked into place, so creating a lease or result is atomic and
+    fails if it already exists; two replicas can never hold the same generation.
+    Expiry uses wall-clock time, so replica clocks must be roughly in sync.
+    """
+
+    def __init__(self, root: Path, run_id: str, owner: str, lease_seconds: float = DEFAULT_LEASE_SECONDS):
+        self.dir = Path(root) / run_id
+        self.owner = owner
+        self.lease_seconds = lease_seconds
+        (self.dir / "leases").mkdir(parents=True, exist_ok=True)
+        (self.dir / "results").mkdir(parents=True, exist_ok=True)
+
+    def _create(self, path: Path, data: bytes) -> bool:
+        tmp = path.with_name(f".{path.name}.{self.owner}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        try:
+            os.link(tmp, path)
+            return True
+        except FileExistsError:
+            return False
+        finally:
+            tmp.unlink(missing_ok=True)
+
+    def _lease_data(self) -> bytes:
+        return json.dumps({"owner": self.owner, "expires": time.time() + self.lease_seconds}).encode()
+
+    def _generations(self, unit: str) -> List[int]:
+        prefix = f"{unit}."
+        return [
+            int(name[len(prefix):]) for name in os.listdir(self.dir / "leases")
+            if name.startswith(prefix) and name[len(prefix):].isdigit()
+        ]
+
+    def _read_lease(self, unit: str, generation: int) -> Dict[str, Any]:
+        try:
+            return json.loads((self.dir / "leases" / f"{unit}.{generation}").read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def claim(self, unit: str) -> Optional[Lease]:
+        if self.result(unit) is not None:
+            return None
+        generations = self._generations(unit)
+        generation = 0
+        if generations:
+            current = max(generations)
+            lease = self._read_lease(unit, current)
+            if lease.get("expires", 0) > time.time():
+                return None
+            generation = current + 1
+        if not self._create(self.dir / "leases" / f"{unit}.{generation}", self._lease_data()):
+            return None
+        if generation:
+            log.warn("Sharding", f"Took over expired lease on '{unit}' from '{lease.get('owner', '?')}'")
+        return Lease(unit, generation)
+
+    def renew(self, lease: Lease) -> bool:
+        if max(self._generations(lease.unit), default=lease.generation) > lease.generation:
+            return False
+        path = self.dir / "leases" / f"{lease.unit}.{lease.generation}"
+        tmp = path.with_name(f".{path.name}.renew.tmp")
+        tmp.write_bytes(self._lease_data())
+        os.replace(tmp, path)
+        return True
+
+    def complete(self, unit: str, result: Any) -> bool:
+        return self._create(self.dir / "results" / f"{unit}.pickle", pickle.dumps(result, pickle.HIGHEST_PROTOCOL))
+
+    def result(self, unit: str) -> Optional[Any]:
+        try:
+            return pickle.loads((self.dir / "results" / f"{unit}.pickle").read_bytes())
+        except FileNotFoundError:
+            return None
+
+    def is_done(self) -> bool:
+        return (self.dir / "done").exists()
+
+    def finish(self) -> None:
+        self._create(self.dir / "done", self.owner.encode())
+        shutil.rmtree(self.dir / "results", ignore_errors=True)
+        shutil.rmtree(self.dir / "leases", ignore_errors=True)
+
+
+class _Heartbeat:
+    """Renews the held leases every third of the lease time in a daemon thread."""
+
+    def __init__(self, coordinator: Coordinator, interval: float):
+        self.coordinator = coordinator
+        self.interval = interval
+        self.leases: List[Lease] = []
+        self.lost: List[str] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="shard-heartbeat", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                leases = list(self.leases)
+            for lease in leases:
+                if not self.coordinator.renew(lease):
+                    log.warn("Sharding", f"Lease on '{lease.unit}' was taken over by another replica")
+                    with self._lock:
+                        if lease in self.leases:
+                            self.leases.remove(lease)
+                        self.lost.append(lease.unit)
+
+    def hold(self, lease: Lease) -> None:
+        with self._lock:
+            self.leases.append(lease)
+
+    def drop(self, lease: Lease) -> None:
+        with self._lock:
+            if lease in self.leases:
+                self.leases.remove(lease)
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+def _unit_id(index: int, name: str) -> str:
+    return f"{index:04d}-{re.sub(r'[^A-Za-z0-9_.-]', '_', name)}"
+
+
+class ShardWorker:
+    """Runs this replica's share of the connectors and, if it holds the merge lease, collects all results.
+
+    Units of work are the groups of connectors linked by ``depends_on``, so upstream
+    results never cross replicas. Every replica claims units until none is left; the
+    merging replica then keeps claiming units whose lease expired (dead replicas)
+    until every unit has a result or the run deadline passes.
+    """
+
+    def __init__(self, coordinator: Coordinator, graph: ConnectorGraph, poll_interval: float = 0.5):
+        self.coordinator = coordinator
+        self.graph = graph
+        self.poll_interval = poll_interval
+        self.units: List[Tuple[str, List[int]]] = [
+            (_unit_id(group[0], graph.sources[group[0]].name), group)
+            for group in graph.components()
+            if any(graph.sources[i].enabled for i in group)
+        ]
+
+    def _run_unit(self, group: List[int], execute, succeeded, max_workers: int, deadline: Deadline) -> List[Outcome]:
+        sub = ConnectorGraph([self.graph.sources[i] for i in group])
+        return list(sub.run(execute, succeeded, max_workers, deadline))
+
+    def _stored(self, outcomes: List[Outcome]) -> List[Tuple[int, Any, Optional[str], bool]]:
+        index = {id(source): i for i, source in enumerate(self.graph.sources)}
+        return [(index[id(o.source)], o.result, o.skipped, o.timed_out) for o in outcomes]
+
+    def run(
+        self,
+        execute: Callable[[Any, Dict[str, Any]], Any],
+        succeeded: Callable[[Any], bool],
+        max_workers: int,
+        deadline: Optional[Deadline] = None,
+    ) -> Tuple[bool, List[Outcome]]:
+        """Returns (merging, outcomes): all outcomes of the run when merging, else only this replica's."""
+        deadline = deadline or Deadline()
+        coordinator = self.coordinator
+        if coordinator.is_done():
+            log.info("Sharding", "Run is already merged, nothing to do")
+            return False, []
+
+        heartbeat = _Heartbeat(coordinator, getattr(coordinator, "lease_seconds", DEFAULT_LEASE_SECONDS) / 3)
+        own: List[Outcome] = []
+        try:
+            merge_lease = self._claim_merge(heartbeat)
+            while not deadline.expired:
+                pending = [(unit, group) for unit, group in self.units if coordinator.result(unit) is None]
+                if not pending:
+                    break
+                progressed = False
+                for unit, group in pending:
+                    if deadline.expired:
+                        break
+                    lease = coordinator.claim(unit)
+                    if lease is None:
+                        continue
+                    heartbeat.hold(lease)
+                    try:
+                        outcomes = self._run_unit(group, execute, succeeded, max_workers, deadline)
+                    finally:
+                        heartbeat.drop(lease)
+                    own.extend(outcomes)
+                    if not coordinator.complete(unit, self._stored(outcomes)):
+                        log.info("Sharding", f"'{unit}' was completed by another replica first")
+                    progressed = True
+                if not progressed:
+                    if not merge_lease:
+                        merge_lease = self._claim_merge(heartbeat)
+                        if not merge_lease:
+                            break  # everything left is held by live replicas, one of which merges
+                    time.sleep(self.poll_interval)
+
+            if not merge_lease:
+                merge_lease = self._claim_merge(heartbeat)  # the merging replica may have died meanwhile
+            if not merge_lease or MERGE_UNIT in heartbeat.lost:
+                return False, own
+            return True, self._merged()
+        finally:
+            heartbeat.stop()
+
+    def _claim_merge(self, heartbeat: _Heartbeat) -> Optional[Lease]:
+        lease = self.coordinator.claim(MERGE_UNIT)
+        if lease:
+            heartbeat.hold(lease)
+            log.info("Sharding", f"Replica '{self.coordinator.owner}' merges this run")
+        return lease
+
+    def _merged(self) -> List[Outcome]:
+        outcomes: List[Outcome] = []
+        sources = self.graph.sources
+        for unit, group in self.units:
+            stored = self.coordinator.result(unit)
+            if stored is None:
+                outcomes.extend(
+                    Outcome(sources[i], None, "no replica finished it before the run deadline", timed_out=True)
+                    for i in group if sources[i].enabled
+                )
+            else:
+                outcomes.extend(Outcome(sources[i], result, skipped, timed_out)
+                                for i, result, skipped, timed_out in stored)
+        return outcomes
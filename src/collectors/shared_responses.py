@@ -0,0 +1,89 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from utils.logger import Logger as log
+
+DEFAULT_MAX_ENTRIES = 32
+
+
+class _Pending:
+    """A response that is being (or has been) fetched by the first requester."""
+
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SharedResponses:
+    """Coalesces identical requests across connectors within one run.
+
+    The first connector to request a key performs the fetch; every other connector
+    asking for the same key (concurrently or later) gets the same decoded response.
+    Consumers must treat the shared response as read-only.
+
+    Finished responses are kept for later requesters up to ``max_entries``; beyond that the
+    least recently used one is dropped. Requests still in flight are never dropped.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, _Pending]" = OrderedDict()
+        self.max_entries = max_entries
+        self.requests = 0
+        self.coalesced = 0
+
+    @staticmethod
+    def request_key(
+        method: str,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        params: Optional[Dict[str, Any]] = None,
+        verify: Any = True,
+    ) -> Tuple[Any, ...]:
+        """Key identifying a request by method, URL, auth/headers, params and TLS settings."""
+        header_digest = hashlib.sha256(repr(sorted((headers or {}).items())).encode("utf-8")).hexdigest()
+        param_items = tuple(sorted((str(k), repr(v)) for k, v in (params or {}).items()))
+        return (method.upper(), url, header_digest, param_items, repr(verify))
+
+    def fetch(self, key: Hashable, fetch_fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Return (response, shared). ``shared`` is True if an identical request was reused."""
+        with self._lock:
+            pending = self._entries.get(key)
+            owner = pending is None
+            if owner:
+                pending = _Pending()
+                self._entries[key] = pending
+                self.requests += 1
+            else:
+                self._entries.move_to_end(key)
+                self.coalesced += 1
+
+        if owner:
+            try:
+                pending.value = fetch_fn()
+            except BaseException as e:
+                pending.error = e
+                raise
+            finally:
+                pending.done.set()
+                self._evict()
+            return pending.value, False
+
+        log.debug("SharedResponses", "Reusing response for %s %s", key[0], key[1])
+        pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
+        return pending.value, True
+
+    def _evict(self) -> None:
+        """Drop the least recently used finished responses beyond ``max_entries``."""
+        with self._lock:
+            excess = len(self._entries) - self.max_entries
+            for key in [k for k, p in self._entries.items() if p.done.is_set()][:max(excess, 0)]:
+                del self._entries[key]
+                log.debug("SharedResponses", "Dropped cached response for %s %s", key[0], key[1])
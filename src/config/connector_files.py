@@ -0,0 +1,151 @@
+"""Loading of split connector definitions (e.g. ``connectors.d/*.yaml``) with an on-disk cache."""
+
+import glob
+import hashlib
+import os
+import pickle
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Iterable, List, Optional, Tuple, TypeVar
+
+import yaml
+from utils.logger import Logger as log
+
+CACHE_VERSION = 1
+MAX_WORKERS = 8
+
+_Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+T = TypeVar("T")
+
+
+def expand_includes(patterns: Iterable[str], base_dir: Path) -> List[Path]:
+    """Expand glob patterns relative to ``base_dir`` into a sorted, de-duplicated file list."""
+    files: List[Path] = []
+    seen = set()
+    for pattern in patterns:
+        matches = sorted(glob.glob(os.path.join(str(base_dir), pattern)))
+        if not matches:
+            log.warn("Config", f"connector_includes pattern '{pattern}' matched no files")
+        for match in matches:
+            path = Path(match).resolve()
+            if path.is_file() and path not in seen:
+                seen.add(path)
+                files.append(path)
+    return files
+
+
+def _raw_connectors(data: Any, path: Path) -> List[dict]:
+    """A connector file holds either a list of connectors or a mapping with a `connectors` list."""
+    if data is None:
+        return []
+    if isinstance(data, dict):
+        data = data.get("connectors", [])
+    if not isinstance(data, list):
+        raise ValueError(f"{path}: expected a list of connectors")
+    return data
+
+
+class ConnectorFileCache:
+    """Pickled raw connector definitions per file, keyed by mtime/size and content hash.
+
+    A file is only re-parsed when its content changes; a touched but unchanged file
+    is recognised by its hash and only the stored mtime is refreshed. The cache skips
+    the YAML parse only: definitions are validated (and their expressions compiled)
+    on every load, since compiled connectors hold closures that cannot be pickled.
+    Only definitions that validated are stored.
+    """
+
+    def __init__(self, cache_dir: Optional[Path]):
+        self.cache_dir = cache_dir / "connectors" if cache_dir else None
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _count(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def _entry_path(self, path: Path) -> Path:
+        return self.cache_dir / f"{hashlib.sha256(str(path).encode('utf-8')).hexdigest()[:32]}.pickle"
+
+    def _read(self, path: Path) -> Optional[dict]:
+        if self.cache_dir is None:
+            return None
+        try:
+            with open(self._entry_path(path), "rb") as f:
+                entry = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            return None
+        return entry if isinstance(entry, dict) and entry.get("version") == CACHE_VERSION else None
+
+    def _store(self, path: Path, entry: dict) -> None:
+        if self.cache_dir is None:
+            return
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            target = self._entry_path(path)
+            tmp = target.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp, "wb") as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, target)
+        except OSError as e:
+            log.warn("Config", f"Could not write connector cache for {path}: {e}")
+
+    def load(self, path: Path, build: Callable[[List[dict], str], List[T]]) -> List[T]:
+        """Return ``build(raw_connectors, file_name)`` for ``path``, parsing the file only on change.
+
+        ``build`` validates the definitions; it raises for invalid ones, in which case
+        nothing is cached.
+        """
+        st = path.stat()
+        entry = self._read(path)
+
+        if entry and entry["mtime_ns"] == st.st_mtime_ns and entry["size"] == st.st_size:
+            self._count(hit=True)
+            return build(entry["connectors"], path.name)
+
+        content = path.read_bytes()
+        digest = hashlib.sha256(content).hexdigest()
+        if entry and entry["sha256"] == digest:
+            self._count(hit=True)
+            entry.update(mtime_ns=st.st_mtime_ns, size=st.st_size)
+            self._store(path, entry)
+            return build(entry["connectors"], path.name)
+
+        self._count(hit=False)
+        try:
+            raw = _raw_connectors(yaml.load(content, Loader=_Loader), path)
+        except yaml.YAMLError as e:
+            raise ValueError(f"Invalid YAML in connector file {path}: {e}") from e
+
+        built = build(raw, path.name)
+        self._store(path, {
+            "version": CACHE_VERSION,
+            "mtime_ns": st.st_mtime_ns,
+            "size": st.st_size,
+            "sha256": digest,
+            "connectors": raw,
+        })
+        return built
+
+
+def load_connector_files(
+    files: List[Path],
+    cache_dir: Optional[Path],
+    build: Callable[[List[dict], str], List[T]],
+) -> List[Tuple[Path, List[T]]]:
+    """Load and build connector files in parallel, preserving file order."""
+    cache = ConnectorFileCache(cache_dir)
+    if not files:
+        return []
+
+    with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(files))) as pool:
+        results = list(pool.map(lambda p: (p, cache.load(p, build)), files))
+
+    log.debug("Config", "Connector files: %d (cache hits: %d, parsed: %d)", len(files), cache.hits, cache.misses)
+    return results
@@ -0,0 +1,12 @@
+"""Defaults shared by the settings loader and the modules it configures.
+
+Kept free of imports, so reading settings.yaml does not load the history store, the
+shard coordinator or the sort machinery of features that may be off.
+"""
+
+DEFAULT_MAX_PARALLEL = 4
+DEFAULT_ADAPTIVE_TIMEOUT_MAX = 300.0
+# Sections larger than this are sorted in sorted runs spilled to temp files and merged.
+DEFAULT_MAX_IN_MEMORY = 200_000
+DEFAULT_HISTORY_KEEP = 1000
+DEFAULT_LEASE_SECONDS = 60.0
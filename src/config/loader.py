@@ -1,10 +1,122 @@
 import os
+import re
+import socket
 from pathlib import Path
-from typing import Optional, List, Dict, Any, Iterable
+from urllib.parse import quote
+from typing import TYPE_CHECKING, Optional, List, Dict, Any, Iterable, Tuple
 
 import yaml
+from collectors.expressions import compile_expression, compile_template
+from collectors.preprocess import compile_pipeline, parse_steps
+from config.defaults import (
+    DEFAULT_ADAPTIVE_TIMEOUT_MAX,
+    DEFAULT_HISTORY_KEEP,
+    DEFAULT_LEASE_SECONDS,
+    DEFAULT_MAX_IN_MEMORY,
+    DEFAULT_MAX_PARALLEL,
+)
+from output.diff import IdentityKeys, normalize_identity_keys
+from utils.frozen import freeze
 from utils.logger import Logger as log
 
+# Modules of optional features (OAuth2, connector includes, integrity, ordering, sharding) are
+# imported where their settings are parsed, so a plain config does not load them.
+if TYPE_CHECKING:
+    from gateway.oauth import OAuth2Settings
+    from output.ordering import OrderBy
+
+
+class FanOut:
+    """One templated endpoint fetched once per parameter value.
+
+    ``endpoint: /api/v1/organization/{org}/teams`` with ``fan_out: {param: org, values: [a, b]}``
+    requests both organizations concurrently (at most ``max_workers`` at a time) and
+    concatenates the items in value order. With ``inject`` the value is added to every
+    item under that field name (``inject: true`` uses the parameter name).
+    ``values_from: {connector: quay-orgs, field: name}`` takes further values from the
+    items of an upstream connector, which then becomes a dependency.
+
+    The placeholder may also appear in the request ``body``. With ``batch_size`` each
+    request carries up to that many values: a body string that is exactly ``{param}``
+    becomes the list of values, ``{param}`` inside a string or the endpoint becomes
+    the comma-separated values.
+    """
+
+    DEFAULT_MAX_WORKERS = 4
+
+    def __init__(self, data: dict, endpoint: str, body: Any = None):
+        self.param: str = data.get("param", "")
+        self.values: List[Any] = list(data.get("values") or [])
+        self.max_workers: int = int(data.get("max_workers", self.DEFAULT_MAX_WORKERS))
+        self.batch_size: int = int(data.get("batch_size", 1))
+        inject = data.get("inject", False)
+        self.inject: Optional[str] = self.param if inject is True else (inject or None)
+        values_from = data.get("values_from") or {}
+        self.values_from: Optional[Dict[str, str]] = None
+        if values_from:
+            if not isinstance(values_from, dict) or not values_from.get("connector"):
+                raise ValueError("fan_out.values_from.connector is required")
+            self.values_from = {"connector": values_from["connector"], "field": values_from.get("field", "name")}
+
+        if not self.param:
+            raise ValueError("fan_out.param is required")
+        if self.placeholder not in endpoint and not _mentions(body, self.placeholder):
+            raise ValueError(f"fan_out.param '{self.param}' does not appear in endpoint '{endpoint}' or the body")
+        if self.batch_size < 1:
+            raise ValueError("fan_out.batch_size must be at least 1")
+        if self.batch_size > 1 and self.inject:
+            raise ValueError("fan_out.inject cannot be combined with batch_size (items of a batch share one request)")
+        if not all(isinstance(v, (str, int)) and not isinstance(v, bool) for v in self.values):
+            raise ValueError("fan_out.values must be a list of strings or numbers")
+        if self.max_workers < 1:
+            raise ValueError("fan_out.max_workers must be at least 1")
+
+    @property
+    def placeholder(self) -> str:
+        return "{" + self.param + "}"
+
+    def requests_for(self, values: List[Any]) -> List[Any]:
+        """One entry per request: the values themselves, or lists of up to ``batch_size`` values."""
+        if self.batch_size == 1:
+            return values
+        return [values[i:i + self.batch_size] for i in range(0, len(values), self.batch_size)]
+
+    def endpoint_for(self, endpoint: str, value: Any) -> str:
+        if isinstance(value, list):
+            return endpoint.replace(self.placeholder, ",".join(quote(str(v), safe="") for v in value))
+        return endpoint.replace(self.placeholder, quote(str(value), safe=""))
+
+    def body_for(self, body: Any, value: Any) -> Any:
+        """A copy of the body template with the placeholder replaced by the value (or batch)."""
+        if isinstance(body, str):
+            if body == self.placeholder:
+                return list(value) if isinstance(value, list) else value
+            if self.placeholder in body:
+                joined = ",".join(str(v) for v in value) if isinstance(value, list) else str(value)
+                return body.replace(self.placeholder, joined)
+            return body
+        if isinstance(body, dict):
+            return {k: self.body_for(v, value) for k, v in body.items()}
+        if isinstance(body, list):
+            return [self.body_for(v, value) for v in body]
+        return body
+
+    def __repr__(self):
+        return (
+            f"FanOut(param={self.param}, values={len(self.values)}, max_workers={self.max_workers}, "
+            f"batch_size={self.batch_size})"
+        )
+
+
+def _mentions(body: Any, placeholder: str) -> bool:
+    if isinstance(body, str):
+        return placeholder in body
+    if isinstance(body, dict):
+        return any(_mentions(v, placeholder) for v in body.values())
+    if isinstance(body, list):
+        return any(_mentions(v, placeholder) for v in body)
+    return False
+
 
 class ConnectorConfig:
     """Configuration for a single connector."""
@@ -19,12 +131,33 @@ class ConnectorConfig:
         self.host: str = conn.get("host", "").rstrip("/")
         self.auth_type: str = conn.get("auth_type", "bearer")
         self.token_env: str = conn.get("token_env", "")
+        self.oauth2: Optional["OAuth2Settings"] = None
+        if self.auth_type.lower() == "oauth2_client_credentials":
+            from gateway.oauth import parse_oauth2
+
+            try:
+                self.oauth2 = parse_oauth2(conn.get("oauth2"))
+            except ValueError as e:
+                raise ValueError(f"connector '{data['name']}': {e}") from e
         self.endpoint: str = conn.get("endpoint", "/")
+        self.method: str = str(conn.get("method", "GET")).upper()
+        # JSON body template for POST; fan-out values are filled in per request.
+        self.body: Any = conn.get("body")
+        self.connect_timeout, self.read_timeout = self._parse_timeout(conn.get("timeout"))
+        self.adaptive_timeout: Optional[Dict[str, float]] = self._parse_adaptive_timeout(conn.get("adaptive_timeout"))
+        hedge = conn.get("hedge", False)
+        self.hedge_quantile: Optional[float] = 0.95 if hedge is True else (
+            float(hedge.get("quantile", 0.95)) if isinstance(hedge, dict) else None
+        )
 
         raw_mapping = data.get("mapping", {})
         self.mapping_replace_object: Optional[str] = None
-        self.mapping_fields: List[Dict[str, str]] = self._parse_mapping(raw_mapping)
+        self.mapping_fields: List[Dict[str, Any]] = self._parse_mapping(raw_mapping)
         self.options: Dict[str, Any] = data.get("options", {})
+        try:
+            self.preprocess = compile_pipeline(parse_steps(self.options))
+        except ValueError as e:
+            raise ValueError(f"connector '{self.name}': {e}") from e
 
         if not self.target_key and self.mapping_replace_object:
             self.target_key = self.mapping_replace_object
@@ -37,7 +170,23 @@ class ConnectorConfig:
         if not self.target_key:
             raise KeyError("target_key is required (or mapping.replace_object must be set)")
 
-        self.defaults: Dict[str, Any] = data.get("defaults", {})
+        # Defaults are shared by reference by every item of the connector, so they are read-only.
+        self.defaults: Dict[str, Any] = freeze(data.get("defaults") or {})
+
+        self.fan_out: Optional[FanOut] = None
+        if data.get("fan_out"):
+            try:
+                self.fan_out = FanOut(data["fan_out"], self.endpoint, self.body)
+            except ValueError as e:
+                raise ValueError(f"connector '{self.name}': {e}") from e
+            inject = self.fan_out.inject
+            if inject and self.mapping_fields and not any(m.get("from") == inject for m in self.mapping_fields):
+                self.mapping_fields.append({"from": inject, "to": inject})
+
+        depends_on = data.get("depends_on") or []
+        self.depends_on: List[str] = [depends_on] if isinstance(depends_on, str) else list(depends_on)
+        if self.fan_out and self.fan_out.values_from and self.fan_out.values_from["connector"] not in self.depends_on:
+            self.depends_on.append(self.fan_out.values_from["connector"])
         self._validate()
 
     def __repr__(self):
@@ -51,9 +200,16 @@ class ConnectorConfig:
         if not self.endpoint:
             raise ValueError(f"connector '{self.name}': connection.endpoint is required")
 
+        if self.method not in {"GET", "POST"}:
+            raise ValueError(f"connector '{self.name}': connection.method must be GET|POST")
+        if self.body is not None and self.method != "POST":
+            raise ValueError(f"connector '{self.name}': connection.body requires method POST")
+
         auth = (self.auth_type or "").lower()
-        if auth not in {"bearer", "basic", "apikey", "none"}:
-            raise ValueError(f"connector '{self.name}': auth_type must be bearer|basic|apikey|none")
+        if auth not in {"bearer", "basic", "apikey", "oauth2_client_credentials", "none"}:
+            raise ValueError(
+                f"connector '{self.name}': auth_type must be bearer|basic|apikey|oauth2_client_credentials|none"
+            )
         if auth in {"bearer", "basic", "apikey"} and not self.token_env:
             raise ValueError(f"connector '{self.name}': token_env is required for auth_type '{auth}'")
 
@@ -61,32 +217,155 @@ class ConnectorConfig:
             raise ValueError(f"connector '{self.name}': mapping.replace_object is required")
         if self.mapping_replace_object and not self.mapping_fields:
             raise ValueError(f"connector '{self.name}': mapping.fields must not be empty")
-
-    def _parse_mapping(self, raw_mapping: Any) -> List[Dict[str, str]]:
-        """Normalize mapping to a list of {'from': ..., 'to': ...}."""
+        if self.hedge_quantile is not None and not 0 < self.hedge_quantile < 1:
+            raise ValueError(f"connector '{self.name}': hedge.quantile must be between 0 and 1")
+        if not all(isinstance(d, str) and d for d in self.depends_on):
+            raise ValueError(f"connector '{self.name}': depends_on must be a list of connector names")
+
+    def _parse_timeout(self, raw: Any) -> Tuple[Optional[float], Optional[float]]:
+        """``timeout: 10`` sets connect and read timeout, ``timeout: {connect: 5, read: 60}`` each one."""
+        if raw is None:
+            return None, None
+        if isinstance(raw, dict):
+            connect, read = raw.get("connect"), raw.get("read")
+        else:
+            connect = read = raw
+        try:
+            connect = float(connect) if connect is not None else None
+            read = float(read) if read is not None else None
+        except (TypeError, ValueError):
+            raise ValueError(f"connector '{self.name}': connection.timeout must be seconds or {{connect, read}}")
+        if (connect is not None and connect <= 0) or (read is not None and read <= 0):
+            raise ValueError(f"connector '{self.name}': connection.timeout must be positive")
+        return connect, read
+
+    def _parse_adaptive_timeout(self, raw: Any) -> Optional[Dict[str, float]]:
+        """``adaptive_timeout: true`` or ``{quantile: 0.99, multiplier: 3, min: 1, max: 300}``."""
+        if not raw:
+            return None
+        settings = {"quantile": 0.99, "multiplier": 3.0, "min": 1.0, "max": DEFAULT_ADAPTIVE_TIMEOUT_MAX}
+        if isinstance(raw, dict):
+            try:
+                settings.update({k: float(v) for k, v in raw.items() if k in settings})
+            except (TypeError, ValueError):
+                raise ValueError(f"connector '{self.name}': adaptive_timeout values must be numbers")
+        if not 0 < settings["quantile"] < 1 or settings["multiplier"] < 1:
+            raise ValueError(f"connector '{self.name}': adaptive_timeout needs 0 < quantile < 1 and multiplier >= 1")
+        if settings["min"] > settings["max"]:
+            raise ValueError(f"connector '{self.name}': adaptive_timeout needs min <= max")
+        return settings
+
+    def _parse_mapping(self, raw_mapping: Any) -> List[Dict[str, Any]]:
+        """Normalize mapping to a list of {'from': ..., 'to': ...} or computed {'to', 'expr'|'template', 'compute'}."""
         if not raw_mapping:
             return []
 
         if isinstance(raw_mapping, dict) and "fields" in raw_mapping:
             self.mapping_replace_object = raw_mapping.get("replace_object")
             fields = raw_mapping.get("fields", [])
-            return self._normalize_mapping_fields(fields)
+            try:
+                return self._normalize_mapping_fields(fields)
+            except ValueError as e:
+                raise ValueError(f"connector '{self.name}': {e}") from e
 
         return []
 
     @staticmethod
-    def _normalize_mapping_fields(fields: Iterable[Any]) -> List[Dict[str, str]]:
-        normalized: List[Dict[str, str]] = []
+    def _normalize_mapping_fields(fields: Iterable[Any]) -> List[Dict[str, Any]]:
+        normalized: List[Dict[str, Any]] = []
         for item in fields:
             if not isinstance(item, dict):
                 continue
             api_field = item.get("from")
             out_field = item.get("to")
-            if api_field and out_field:
+            if out_field and "expr" in item:
+                try:
+                    compute = compile_expression(item["expr"])
+                except ValueError as e:
+                    raise ValueError(f"mapping field '{out_field}': {e}") from e
+                normalized.append({"to": out_field, "expr": item["expr"], "compute": compute})
+            elif out_field and "template" in item:
+                try:
+                    compute = compile_template(item["template"])
+                except ValueError as e:
+                    raise ValueError(f"mapping field '{out_field}': {e}") from e
+                normalized.append({"to": out_field, "template": item["template"], "compute": compute})
+            elif api_field and out_field:
                 normalized.append({"from": api_field, "to": out_field})
         return normalized
 
 
+class OutputTarget:
+    """Configuration for a single output file and the sections routed to it."""
+
+    def __init__(
+        self,
+        data: dict,
+        defaults: Optional[dict] = None,
+        file_override: Optional[str] = None,
+        format_override: Optional[str] = None,
+    ):
+        defaults = defaults or {}
+        base_dir = Path(__file__).resolve().parent.parent
+
+        self.name: str = data.get("name", "default")
+        self.file = Path(file_override or data.get("file") or str(base_dir / "output" / "inputs.yaml"))
+        if not self.file.is_absolute():
+            project_root = base_dir.parent
+            self.file = (project_root / self.file).resolve()
+
+        self.format: str = (format_override or data.get("format") or defaults.get("format") or "yaml").lower()
+        self.target_keys: List[str] = list(data.get("target_keys") or [])
+        self.shared_structure: bool = bool(data.get("shared_structure", defaults.get("shared_structure", False)))
+
+        self.identity_keys: IdentityKeys = {
+            **normalize_identity_keys(defaults.get("identity_keys")),
+            **normalize_identity_keys(data.get("identity_keys")),
+        }
+        self.order_by: "OrderBy" = {}
+        if defaults.get("order_by") or data.get("order_by"):
+            from output.ordering import normalize_order_by
+
+            self.order_by = {
+                **normalize_order_by(defaults.get("order_by"), self.identity_keys),
+                **normalize_order_by(data.get("order_by"), self.identity_keys),
+            }
+        self.sort_max_in_memory = int(
+            data.get("sort_max_in_memory", defaults.get("sort_max_in_memory", DEFAULT_MAX_IN_MEMORY))
+        )
+        self.integrity_mode, self.references = "off", ()
+        integrity = data.get("integrity", defaults.get("integrity"))
+        if integrity:
+            from output.integrity import normalize_integrity
+
+            try:
+                self.integrity_mode, self.references = normalize_integrity(integrity)
+            except ValueError as e:
+                raise ValueError(f"output '{self.name}': {e}") from e
+        self._validate()
+
+    def __repr__(self):
+        return f"OutputTarget(name={self.name}, file={self.file}, format={self.format}, target_keys={self.target_keys})"
+
+    def _validate(self) -> None:
+        from output.writers import SHARED_STRUCTURE_WRITERS, WRITERS
+
+        if self.format not in WRITERS:
+            raise ValueError(f"output '{self.name}': format must be one of {'|'.join(WRITERS)}, got '{self.format}'")
+        if self.shared_structure and self.format not in SHARED_STRUCTURE_WRITERS:
+            log.warn("Config", f"output '{self.name}': shared_structure is not supported for format '{self.format}'")
+        if not all(isinstance(k, str) and k for k in self.target_keys):
+            raise ValueError(f"output '{self.name}': target_keys must be a list of section names")
+
+    def accepts(self, target_key: str) -> bool:
+        """An output without target_keys receives every section."""
+        return not self.target_keys or target_key in self.target_keys
+
+    def select(self, collected: Dict[str, Any]) -> Dict[str, Any]:
+        """Return the collected sections routed to this output."""
+        return {k: v for k, v in collected.items() if self.accepts(k)}
+
+
 class Config:
     """Configuration singleton."""
 
@@ -119,24 +398,47 @@ class Config:
 
         debug_cfg = data.get("debug", {})
         self.debug = os.getenv("DEBUG_ENABLED", str(debug_cfg.get("enabled", "false"))).lower() == "true"
-        log.configure(self.debug)
+        log_cfg = data.get("logging") or {}
+        log.configure(self.debug, fmt=os.getenv("LOG_FORMAT", log_cfg.get("format", "text")))
 
         app_cfg = data.get("app", {})
         self.version = os.getenv("APP_VERSION", app_cfg.get("version", "unknown"))
 
+        cache_cfg = data.get("cache") or {}
+        project_root = Path(__file__).resolve().parent.parent.parent
+        cache_dir = os.getenv("SEEDER_CACHE_DIR", cache_cfg.get("dir", str(project_root / ".seeder_cache")))
+        self.cache_dir: Optional[Path] = Path(cache_dir) if cache_dir else None
+
         connectors_cfg = data.get("connectors")
-        if connectors_cfg is None:
-            raise ValueError("connectors must be defined in settings.yaml")
-        self.sources: List[ConnectorConfig] = self._load_connectors(connectors_cfg)
-
-        output_cfg = data.get("output", {})
-        BASE_DIR = Path(__file__).resolve().parent.parent
-        self.output_file = Path(
-            os.getenv("OUTPUT_FILE", output_cfg.get("file", str(BASE_DIR / "output" / "inputs.yaml")))
-        )
-        if not self.output_file.is_absolute():
-            project_root = BASE_DIR.parent
-            self.output_file = (project_root / self.output_file).resolve()
+        includes = data.get("connector_includes") or []
+        if isinstance(includes, str):
+            includes = [includes]
+        if connectors_cfg is None and not includes:
+            raise ValueError("connectors (or connector_includes) must be defined in settings.yaml")
+        self.sources: List[ConnectorConfig] = self._load_connectors(connectors_cfg or [])
+        if includes:
+            from config.connector_files import expand_includes, load_connector_files
+
+            files = expand_includes(includes, config_file.resolve().parent)
+            for _, sources in load_connector_files(files, self.cache_dir, self._load_connectors):
+                self.sources.extend(sources)
+
+        if any(source.depends_on for source in self.sources):
+            from collectors.scheduler import ConnectorGraph
+
+            ConnectorGraph(self.sources)  # validates depends_on (unknown names, cycles)
+
+        run_cfg = data.get("run") or {}
+        self.max_parallel = int(os.getenv("MAX_PARALLEL_CONNECTORS", run_cfg.get("max_parallel", DEFAULT_MAX_PARALLEL)))
+        if self.max_parallel < 1:
+            raise ValueError("run.max_parallel must be at least 1")
+        # Overall time limit for collecting; 0 or unset means no limit.
+        self.run_deadline = float(os.getenv("RUN_DEADLINE", run_cfg.get("deadline") or 0))
+
+        self.rate_limits: Dict[str, Dict[str, float]] = self._load_rate_limits(data.get("rate_limits"))
+        self.history_path, self.history_keep = self._load_history(data.get("history"))
+        self._load_shard(data.get("shard") or {})
+        self.outputs: List[OutputTarget] = self._load_outputs(data)
 
         disable_verify = os.getenv("DISABLE_TLS_VERIFY", "false").lower() == "true"
         ca_bundle = os.getenv("CA_BUNDLE", "")
@@ -150,8 +452,19 @@ class Config:
         if self.debug:
             log.debug("Config", f"Version: {self.version}")
             log.debug("Config", f"Connectors: {len(self.sources)}")
-            log.debug("Config", f"Output file: {self.output_file}")
             log.debug("Config", f"TLS verify: {self.verify}")
+            log.debug("Config", f"Max parallel connectors: {self.max_parallel}")
+            log.debug("Config", f"Run deadline: {self.run_deadline or 'none'}")
+            log.debug("Config", f"Rate limits: {self.rate_limits or 'none'}")
+            log.debug("Config", f"History: {self.history_path or 'disabled'} (keep {self.history_keep})")
+            if self.shard_dir:
+                log.debug("Config", f"Sharding: {self.shard_dir}/{self.shard_run_id} as '{self.shard_replica}'")
+            for o in self.outputs:
+                log.debug(
+                    "Config",
+                    f"Output '{o.name}': file={o.file} format={o.format} "
+                    f"target_keys={o.target_keys or 'all'} identity_keys={o.identity_keys} order_by={o.order_by}",
+                )
             for c in self.sources:
                 log.debug(
                     "Config",
@@ -165,13 +478,119 @@ class Config:
                 )
 
     @staticmethod
+    def _load_rate_limits(raw: Any) -> Dict[str, Dict[str, float]]:
+        """``rate_limits``: host (or `default`) -> {rate: requests per second, burst: bucket size}.
+
+        Hosts are normalized like the client's (lower case, port dropped), so ``API.example.com:443``
+        configures ``api.example.com``.
+        """
+        if not raw:
+            return {}
+        from gateway.rate_limit import host_key
+
+        if not isinstance(raw, dict):
+            raise ValueError("rate_limits must map host names to {rate, burst}")
+        limits: Dict[str, Dict[str, float]] = {}
+        for configured, settings in raw.items():
+            host = host_key(str(configured))
+            if host in limits:
+                raise ValueError(f"rate_limits.{configured}: host '{host}' is configured more than once")
+            if not isinstance(settings, dict):
+                raise ValueError(f"rate_limits.{host} must be a mapping with rate and optional burst")
+            try:
+                rate = float(settings["rate"])
+                burst = float(settings.get("burst", max(rate, 1.0)))
+            except (KeyError, TypeError, ValueError):
+                raise ValueError(f"rate_limits.{host}: rate (requests per second) is required")
+            if rate <= 0 or burst < 1:
+                raise ValueError(f"rate_limits.{host}: rate must be positive and burst at least 1")
+            limits[host] = {"rate": rate, "burst": burst}
+        return limits
+
+    def _load_history(self, raw: Any) -> Tuple[Optional[Path], int]:
+        """``history: {enabled, path, keep}``; the store defaults to ``<cache_dir>/history.sqlite``."""
+        raw = raw or {}
+        if not isinstance(raw, dict):
+            raise ValueError("history must be a mapping with enabled, path and keep")
+        keep = int(raw.get("keep", DEFAULT_HISTORY_KEEP))
+        if keep < 1:
+            raise ValueError("history.keep must be at least 1")
+        enabled = os.getenv("HISTORY_ENABLED", str(raw.get("enabled", False))).lower() == "true"
+        if not enabled:
+            return None, keep
+        path = raw.get("path") or (self.cache_dir / "history.sqlite" if self.cache_dir else None)
+        if path is None:
+            raise ValueError("history.path is required when the cache is disabled")
+        return Path(path), keep
+
+    def _load_shard(self, raw: dict) -> None:
+        """``shard: {dir, run_id, lease_seconds}``: split connectors across replicas sharing ``dir``."""
+        if not isinstance(raw, dict):
+            raise ValueError("shard must be a mapping with dir, run_id and lease_seconds")
+        shard_dir = os.getenv("SHARD_DIR", raw.get("dir") or "")
+        self.shard_dir: Optional[Path] = Path(shard_dir) if shard_dir else None
+        self.shard_run_id: str = os.getenv("SHARD_RUN_ID", str(raw.get("run_id") or ""))
+        self.shard_replica: str = os.getenv("SHARD_REPLICA_ID") or f"{socket.gethostname()}-{os.getpid()}"
+        self.shard_lease_seconds = float(raw.get("lease_seconds", DEFAULT_LEASE_SECONDS))
+        if not self.shard_dir:
+            return
+        # Replicas of one run must agree on the run id; reusing one would reuse its results.
+        if not re.fullmatch(r"[A-Za-z0-9_.-]+", self.shard_run_id):
+            raise ValueError(
+                "shard.run_id (or SHARD_RUN_ID) is required when sharding and may only contain [A-Za-z0-9_.-]"
+            )
+        if self.shard_lease_seconds <= 0:
+            raise ValueError("shard.lease_seconds must be positive")
+
+    def _load_outputs(self, data: dict) -> List[OutputTarget]:
+        """Load output targets from `outputs` (list) or the single legacy `output` block."""
+        output_cfg = data.get("output") or {}
+        outputs_cfg = data.get("outputs")
+
+        if outputs_cfg is None:
+            return [OutputTarget(
+                output_cfg, file_override=os.getenv("OUTPUT_FILE"), format_override=os.getenv("OUTPUT_FORMAT"),
+            )]
+
+        if not isinstance(outputs_cfg, list) or not outputs_cfg:
+            raise ValueError("outputs must be a non-empty list")
+        for env in ("OUTPUT_FILE", "OUTPUT_FORMAT"):
+            if os.getenv(env) and len(outputs_cfg) > 1:
+                log.warn("Config", f"{env} is ignored when several outputs are configured")
+
+        single = len(outputs_cfg) == 1
+        file_override = os.getenv("OUTPUT_FILE") if single else None
+        format_override = os.getenv("OUTPUT_FORMAT") if single else None
+        outputs: List[OutputTarget] = []
+        for i, raw in enumerate(outputs_cfg, 1):
+            if not isinstance(raw, dict):
+                raise ValueError(f"Invalid output at index {i}")
+            raw.setdefault("name", f"output-{i}")
+            outputs.append(OutputTarget(
+                raw, defaults=output_cfg, file_override=file_override, format_override=format_override,
+            ))
+
+        names = [o.name for o in outputs]
+        files = [o.file for o in outputs]
+        if len(set(names)) != len(names):
+            raise ValueError("output names must be unique")
+        if len(set(files)) != len(files):
+            raise ValueError("output files must be unique")
+
+        routed = {k for o in outputs for k in o.target_keys}
+        catch_all = any(not o.target_keys for o in outputs)
+        for source in self.sources:
+            if source.enabled and not catch_all and source.target_key not in routed:
+                log.warn("Config", f"Connector '{source.name}': target_key '{source.target_key}' is not routed to any output")
+        return outputs
+
     @staticmethod
-    def _load_connectors(connectors_cfg: Any) -> List[ConnectorConfig]:
-        """Load connectors from a list in the main settings YAML."""
+    def _load_connectors(connectors_cfg: Any, source_file: str = "settings.yaml") -> List[ConnectorConfig]:
+        """Load connectors from a list in the main settings YAML or an included connector file."""
         sources: List[ConnectorConfig] = []
 
         if not isinstance(connectors_cfg, list):
-            log.error("Config", "connectors must be a list")
+            log.error("Config", f"connectors must be a list ({source_file})")
             return sources
 
         for i, raw in enumerate(connectors_cfg, 1):
@@ -179,11 +598,11 @@ class Config:
                 log.warn("Config", f"Invalid connector at index {i}")
                 continue
             try:
-                source = ConnectorConfig(raw, source_file="settings.yaml")
+                source = ConnectorConfig(raw, source_file=source_file)
                 sources.append(source)
-                log.debug("Config", f"Loaded connector: {source.name}")
+                log.debug("Config", "Loaded connector: %s", source.name)
             except (KeyError, TypeError) as e:
-                log.error("Config", f"Failed to load connector at index {i}: {e}")
+                log.error("Config", f"Failed to load connector at index {i} ({source_file}): {e}")
 
         return sources
 
@@ -1,26 +1,70 @@
+import json
 import os
-from typing import Any, Dict, Optional
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
+from urllib.parse import urlparse
 
-import requests
 from config.loader import ConnectorConfig
+from gateway.encoding import ACCEPT_ENCODING, StreamDecoder
+from gateway.latency import LatencyHistory
+from gateway.oauth import TokenProvider
+from gateway.rate_limit import RateLimiters
+from utils.deadline import Deadline
 from utils.logger import Logger as log
 
+if TYPE_CHECKING:
+    import requests
+
 SENSITIVE_HEADERS = {"authorization", "x-api-key", "cookie", "set-cookie"}
 DEFAULT_TIMEOUT = 30
+READ_CHUNK_SIZE = 64 * 1024
+MAX_RATE_LIMIT_RETRIES = 3
+
+
+class _Abandoned(Exception):
+    """The losing attempt of a hedged request stops reading once the other one has won."""
 
 
 class ApiClient:
     """HTTP client for a specific source. Each source gets its own client instance."""
 
-    def __init__(self, source: ConnectorConfig, verify=True):
+    def __init__(
+        self,
+        source: ConnectorConfig,
+        verify=True,
+        deadline: Optional[Deadline] = None,
+        latency: Optional[LatencyHistory] = None,
+        rate_limiters: Optional[RateLimiters] = None,
+        tokens: Optional[TokenProvider] = None,
+    ):
         self.source = source
-        self.timeout = int(os.getenv("API_TIMEOUT", DEFAULT_TIMEOUT))
+        default_timeout = float(os.getenv("API_TIMEOUT", DEFAULT_TIMEOUT))
+        self.connect_timeout: float = source.connect_timeout or default_timeout
+        self.read_timeout: float = source.read_timeout or default_timeout
+        self.deadline = deadline or Deadline()
+        self.latency = latency
+        self.rate_limiters = rate_limiters
         self.verify = verify
+        # Time spent on the wire vs. waiting for the rate limiter, summed over all requests.
+        self.network_seconds = 0.0
+        self.rate_limit_wait_seconds = 0.0
+        # Body bytes as transferred (possibly compressed) vs. after decompression.
+        self.wire_bytes = 0
+        self.decoded_bytes = 0
+        self._stats_lock = threading.Lock()
 
         self.base_url = source.host.rstrip("/")
+        # Fan-out requests share one history per connector endpoint template.
+        self.latency_key = f"{self.base_url}{source.endpoint}"
+        # Rate limits apply per host name, whatever port or credentials the URL carries.
+        parsed = urlparse(self.base_url)
+        self.host = parsed.hostname or parsed.netloc
         self.headers: Dict[str, str] = {
             "Content-Type": "application/json",
             "X-Requested-With": "XMLHttpRequest",
+            "Accept-Encoding": ACCEPT_ENCODING,
         }
 
         token = None
@@ -37,16 +81,44 @@ class ApiClient:
             elif source.auth_type.lower() == "apikey":
                 self.headers["X-API-Key"] = token
 
-        self._session: Optional[requests.Session] = None
+        # OAuth2 tokens come from the run-wide provider per request, since they are refreshed mid-run.
+        self.oauth2 = source.oauth2
+        self.tokens = tokens if tokens is not None or self.oauth2 is None else TokenProvider()
+
+        self._session: Optional["requests.Session"] = None
 
-        log.debug("ApiClient", f"Initialized for '{source.name}' -> {self.base_url}")
+        log.debug("ApiClient", "Initialized for '%s' -> %s", source.name, self.base_url)
 
     @property
-    def session(self) -> requests.Session:
+    def session(self) -> "requests.Session":
+        # requests is only imported once a connector actually goes to the network.
+        import requests
+
         if self._session is None:
             self._session = requests.Session()
         return self._session
 
+    @staticmethod
+    def _new_session() -> "requests.Session":
+        """A session of its own, e.g. for a hedged attempt running next to the first one."""
+        import requests
+
+        return requests.Session()
+
+    @property
+    def identity_headers(self) -> Dict[str, str]:
+        """Headers that tell requests of different credentials apart (e.g. for response sharing)."""
+        if self.oauth2 is None:
+            return self.headers
+        return {**self.headers, "Authorization": f"oauth2 {self.oauth2.key}"}
+
+    def _authorize(self) -> Tuple[Dict[str, str], Optional[str]]:
+        """Headers for the next request and the OAuth2 access token in them (None without OAuth2)."""
+        if self.oauth2 is None:
+            return self.headers, None
+        token = self.tokens.token(self.oauth2, verify=self.verify, timeout=self.timeout, deadline=self.deadline)
+        return {**self.headers, "Authorization": f"Bearer {token}"}, token
+
     def _mask_sensitive_headers(self, headers: Dict[str, str]) -> Dict[str, str]:
         masked = {}
         for key, value in headers.items():
@@ -56,20 +128,171 @@ class ApiClient:
                 masked[key] = value
         return masked
 
+    @property
+    def timeout(self):
+        """(connect, read) timeouts for the next request, capped to the time left before the deadline.
+
+        With ``adaptive_timeout`` the read timeout is derived from the endpoint's latency
+        history (quantile x multiplier, between ``min`` and ``max``), so it can also exceed
+        the configured one, which only applies while there is no history.
+        """
+        read = self.read_timeout
+        adaptive = self.source.adaptive_timeout
+        if adaptive and self.latency is not None:
+            observed = self.latency.quantile(self.latency_key, adaptive["quantile"])
+            if observed is not None:
+                read = min(adaptive["max"], max(adaptive["min"], observed * adaptive["multiplier"]))
+        return self.deadline.cap(self.connect_timeout), self.deadline.cap(read)
+
+    def _hedge_delay(self) -> Optional[float]:
+        """Seconds after which a second attempt is sent, or None if hedging is off or unprimed."""
+        if self.source.hedge_quantile is None or self.latency is None:
+            return None
+        return self.latency.quantile(self.latency_key, self.source.hedge_quantile)
+
+    def _read_body(self, response: "requests.Response", url: str, cancel: Optional[threading.Event] = None) -> bytes:
+        """Read the body in chunks so a slow transfer is abandoned once the run deadline passes.
+
+        The raw (still encoded) stream is decompressed here chunk by chunk, so the bytes on
+        the wire and the decoded bytes can both be counted.
+        """
+        decoder = StreamDecoder(response.headers.get("Content-Encoding", ""))
+        chunks = []
+        wire = 0
+        for chunk in response.raw.stream(READ_CHUNK_SIZE, decode_content=False):
+            self.deadline.check(f"while reading {url}")
+            if cancel is not None and cancel.is_set():
+                raise _Abandoned(url)
+            wire += len(chunk)
+            chunks.append(decoder.decompress(chunk))
+        chunks.append(decoder.flush())
+        body = b"".join(chunks)
+        with self._stats_lock:
+            self.wire_bytes += wire
+            self.decoded_bytes += len(body)
+        log.debug("ApiClient", "%s: %d byte(s) on the wire, %d decoded (%s)", url, wire, len(body), decoder.encoding)
+        return body
+
+    def _wait_for_rate_limit(self) -> None:
+        if self.rate_limiters is None:
+            return
+        delay = self.rate_limiters.bucket(self.host).reserve()
+        if delay <= 0:
+            return
+        remaining = self.deadline.remaining()
+        if remaining is not None and delay > remaining:
+            time.sleep(remaining)
+            self.deadline.check(f"waiting for the rate limit of {self.host}")
+        time.sleep(delay)
+        self.rate_limiters.record_wait(self.host, delay)
+        with self._stats_lock:
+            self.rate_limit_wait_seconds += delay
+
+    def _send(
+        self, url: str, timeout, cancel: Optional[threading.Event] = None, method: str = "GET",
+        headers: Optional[Dict[str, str]] = None, session: Optional["requests.Session"] = None, **kwargs,
+    ) -> Tuple["requests.Response", bytes]:
+        self._wait_for_rate_limit()
+        start = time.monotonic()
+        response = getattr(session or self.session, method.lower())(
+            url=url,
+            headers=self.headers if headers is None else headers,
+            verify=self.verify,
+            timeout=timeout,
+            stream=True,
+            **kwargs,
+        )
+        with response:
+            if self.rate_limiters is not None:
+                self.rate_limiters.bucket(self.host).observe(response.status_code, response.headers)
+            body = self._read_body(response, url, cancel)
+        elapsed = time.monotonic() - start
+        with self._stats_lock:
+            self.network_seconds += elapsed
+        if self.latency is not None and response.status_code != 429:
+            self.latency.record(self.latency_key, elapsed)
+        return response, body
+
+    def _send_on_own_session(self, *args, **kwargs) -> Tuple["requests.Response", bytes]:
+        session = self._new_session()
+        try:
+            return self._send(*args, session=session, **kwargs)
+        finally:
+            session.close()
+
+    def _send_hedged(self, url: str, timeout, delay: float, **kwargs) -> Tuple["requests.Response", bytes]:
+        """Send a GET; if it has not finished after ``delay``, send a second one and take the first answer.
+
+        The second attempt runs on a session of its own (closed once it is done), since the
+        first one may still be using the client's session.
+        """
+        cancel = threading.Event()
+        pool = ThreadPoolExecutor(max_workers=2)
+        try:
+            first = pool.submit(self._send, url, timeout, cancel, **kwargs)
+            done, _ = wait([first], timeout=self.deadline.cap(delay))
+            if done:
+                return first.result()
+
+            log.debug("ApiClient", "GET %s slower than %.2fs, sending hedged request", url, delay)
+            self.latency.count_hedge()
+            second = pool.submit(self._send_on_own_session, url, timeout, cancel, **kwargs)
+            pending, error = {first, second}, None
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future.exception() is None:
+                        if future is second:
+                            self.latency.count_hedge(won=True)
+                        return future.result()
+                    error = error or future.exception()
+            raise error
+        finally:
+            cancel.set()
+            pool.shutdown(wait=False)
+
     def get(self, endpoint: str, **kwargs) -> Any:
+        return self.request("GET", endpoint, **kwargs)
+
+    def post(self, endpoint: str, body: Any = None, **kwargs) -> Any:
+        """POST a JSON body (e.g. a batch of IDs for a bulk or GraphQL endpoint)."""
+        return self.request("POST", endpoint, json=body, **kwargs)
+
+    def request(self, method: str, endpoint: str, **kwargs) -> Any:
+        """Send a request and return the decoded JSON response.
+
+        Only GETs are hedged: a duplicate POST is not guaranteed to be harmless. With
+        OAuth2, a 401 drops the cached token and the request is retried once with a new one.
+        """
+        import requests
+
+        method = method.upper()
         url = f"{self.base_url}{endpoint}"
-        log.debug("ApiClient", f"GET {url}")
-        log.debug("ApiClient", f"timeout={self.timeout}s verify={self.verify}")
-        log.debug("ApiClient", f"headers={self._mask_sensitive_headers(self.headers)}")
+        self.deadline.check(f"before {method} {url}")
+        timeout = self.timeout
+        log.debug("ApiClient", "%s %s", method, url)
+        log.debug("ApiClient", "timeout=%s verify=%s", timeout, self.verify)
+        log.debug("ApiClient", lambda: f"headers={self._mask_sensitive_headers(self.identity_headers)}")
 
         try:
-            response = self.session.get(
-                url=url,
-                headers=self.headers,
-                verify=self.verify,
-                timeout=self.timeout,
-                **kwargs,
-            )
+            headers, token = self._authorize()
+            reauthorized = False
+            for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+                hedge_delay = self._hedge_delay() if method == "GET" else None
+                if hedge_delay is None:
+                    response, body = self._send(url, timeout, method=method, headers=headers, **kwargs)
+                else:
+                    response, body = self._send_hedged(url, timeout, hedge_delay, headers=headers, **kwargs)
+                if response.status_code == 401 and token is not None and not reauthorized:
+                    log.warn("ApiClient", f"HTTP 401 on {method} {url}, fetching a new OAuth2 token")
+                    self.tokens.invalidate(self.oauth2, token)
+                    headers, token = self._authorize()
+                    reauthorized = True
+                    continue
+                if response.status_code != 429 or attempt == MAX_RATE_LIMIT_RETRIES:
+                    break
+                log.warn("ApiClient", f"HTTP 429 on {method} {url}, retrying after the server's rate-limit pause")
+                timeout = self.timeout
         except requests.ConnectionError as e:
             log.error("ApiClient", f"Connection refused: {url}: {e}")
             raise
@@ -80,22 +303,24 @@ class ApiClient:
             log.error("ApiClient", f"Request error: {url}: {e}")
             raise
 
+        text = body.decode(response.encoding or "utf-8", errors="replace")
         try:
             response.raise_for_status()
         except requests.HTTPError:
-            log.error("ApiClient", f"HTTP {response.status_code} on GET {url} body={response.text}")
+            log.error("ApiClient", f"HTTP {response.status_code} on {method} {url} body={text}")
             raise
 
         log.debug(
             "ApiClient",
-            f"status={response.status_code} content_type={response.headers.get('Content-Type')} length={len(response.text)}",
+            lambda: f"status={response.status_code} content_type={response.headers.get('Content-Type')} "
+                    f"length={len(body)}",
         )
 
-        if not response.text or not response.text.strip():
+        if not text.strip():
             return {}
 
         try:
-            return response.json()
+            return json.loads(text if response.encoding else body)
         except ValueError:
             log.debug("ApiClient", "Non-JSON response received")
-            return {"raw": response.text}
+            return {"raw": text}
@@ -0,0 +1,110 @@
+"""Content-Encoding negotiation and streaming decompression of response bodies."""
+
+import zlib
+from importlib.util import find_spec
+from typing import Callable, List
+
+# zstd and br are only offered when their (optional) libraries are installed.
+_ZSTD = find_spec("zstandard") is not None
+_BROTLI_MODULE = next((m for m in ("brotli", "brotlicffi") if find_spec(m) is not None), None)
+
+ACCEPT_ENCODING = ", ".join(
+    ["gzip", "deflate"] + (["zstd"] if _ZSTD else []) + (["br"] if _BROTLI_MODULE else [])
+)
+
+
+class _Identity:
+    def decompress(self, data: bytes) -> bytes:
+        return data
+
+    def flush(self) -> bytes:
+        return b""
+
+
+class _Zlib:
+    """gzip, or deflate with or without the zlib header (servers send both)."""
+
+    def __init__(self, gzip: bool):
+        self._gzip = gzip
+        self._obj = zlib.decompressobj(16 + zlib.MAX_WBITS if gzip else zlib.MAX_WBITS)
+        self._started = False
+
+    def decompress(self, data: bytes) -> bytes:
+        if not data:
+            return b""
+        if not self._started and not self._gzip:
+            self._started = True
+            try:
+                return self._obj.decompress(data)
+            except zlib.error:
+                self._obj = zlib.decompressobj(-zlib.MAX_WBITS)
+        self._started = True
+        return self._obj.decompress(data)
+
+    def flush(self) -> bytes:
+        return self._obj.flush()
+
+
+class _Zstd:
+    def __init__(self):
+        import zstandard
+
+        self._obj = zstandard.ZstdDecompressor().decompressobj()
+
+    def decompress(self, data: bytes) -> bytes:
+        return self._obj.decompress(data) if data else b""
+
+    def flush(self) -> bytes:
+        return b""
+
+
+class _Brotli:
+    def __init__(self):
+        import importlib
+
+        self._obj = importlib.import_module(_BROTLI_MODULE).Decompressor()
+
+    def decompress(self, data: bytes) -> bytes:
+        if not data:
+            return b""
+        return self._obj.process(data) if hasattr(self._obj, "process") else self._obj.decompress(data)
+
+    def flush(self) -> bytes:
+        return b""
+
+
+_DECODERS: dict = {
+    "identity": _Identity,
+    "gzip": lambda: _Zlib(gzip=True),
+    "x-gzip": lambda: _Zlib(gzip=True),
+    "deflate": lambda: _Zlib(gzip=False),
+    "zstd": _Zstd,
+    "br": _Brotli,
+}
+
+
+class StreamDecoder:
+    """Decodes a body chunk by chunk for a ``Content-Encoding`` such as ``gzip`` or ``gzip, br``.
+
+    Encodings are listed in the order they were applied, so they are undone in reverse.
+    """
+
+    def __init__(self, content_encoding: str):
+        names = [e.strip().lower() for e in (content_encoding or "").split(",") if e.strip()]
+        unknown = [n for n in names if n not in _DECODERS]
+        if unknown:
+            raise ValueError(f"unsupported Content-Encoding: {', '.join(unknown)}")
+        factories: List[Callable] = [_DECODERS[n] for n in reversed(names) if n != "identity"]
+        self._decoders = [factory() for factory in factories]
+        self.encoding = ", ".join(names) or "identity"
+
+    def decompress(self, data: bytes) -> bytes:
+        for decoder in self._decoders:
+            data = decoder.decompress(data)
+        return data
+
+    def flush(self) -> bytes:
+        data = b""
+        for decoder in self._decoders:
+            data = decoder.decompress(data) + decoder.flush()
+        return data
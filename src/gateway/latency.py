@@ -0,0 +1,106 @@
+"""Persisted per-endpoint latency histograms used for adaptive timeouts and hedging."""
+
+import json
+import os
+import threading
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from utils.logger import Logger as log
+
+HISTORY_VERSION = 1
+MIN_SAMPLES = 20
+MAX_SAMPLES = 2000  # counts are halved above this, so old runs fade out
+
+
+def _bucket_bounds() -> List[float]:
+    """Upper bucket bounds in seconds: 10ms .. ~10min, 25% apart."""
+    bounds, value = [], 0.01
+    while value < 600:
+        bounds.append(round(value, 4))
+        value *= 1.25
+    return bounds
+
+
+BUCKETS = _bucket_bounds()
+
+
+class LatencyHistory:
+    """Latency histogram per endpoint key (``https://host/path``), shared by all clients of a run.
+
+    Quantiles are only reported once an endpoint has ``MIN_SAMPLES`` samples; they
+    are the upper bound of the matching bucket, i.e. at most 25% pessimistic.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._counts: Dict[str, List[int]] = {}
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    @classmethod
+    def load(cls, path: Optional[Path]) -> "LatencyHistory":
+        history = cls(path)
+        if path is None or not path.exists():
+            return history
+        try:
+            data = json.loads(path.read_text())
+        except (OSError, ValueError) as e:
+            log.warn("LatencyHistory", f"Ignoring unreadable latency history {path}: {e}")
+            return history
+        if data.get("version") == HISTORY_VERSION and data.get("buckets") == BUCKETS:
+            history._counts = {
+                k: v for k, v in data.get("endpoints", {}).items()
+                if isinstance(v, list) and len(v) == len(BUCKETS)
+            }
+        return history
+
+    def record(self, key: str, seconds: float) -> None:
+        i = min(bisect_left(BUCKETS, seconds), len(BUCKETS) - 1)
+        with self._lock:
+            counts = self._counts.setdefault(key, [0] * len(BUCKETS))
+            counts[i] += 1
+            if sum(counts) > MAX_SAMPLES:
+                self._counts[key] = [c // 2 for c in counts]
+
+    def samples(self, key: str) -> int:
+        with self._lock:
+            return sum(self._counts.get(key, ()))
+
+    def quantile(self, key: str, q: float) -> Optional[float]:
+        """Latency below which a fraction ``q`` of requests finished, or None with too little history."""
+        with self._lock:
+            counts = list(self._counts.get(key, ()))
+        total = sum(counts)
+        if total < MIN_SAMPLES:
+            return None
+        threshold = q * total
+        seen = 0
+        for bound, count in zip(BUCKETS, counts):
+            seen += count
+            if seen >= threshold:
+                return bound
+        return BUCKETS[-1]
+
+    def count_hedge(self, won: bool = False) -> None:
+        with self._lock:
+            if won:
+                self.hedge_wins += 1
+            else:
+                self.hedged += 1
+
+    def save(self) -> None:
+        if self.path is None or not self._counts:
+            return
+        with self._lock:
+            data = {"version": HISTORY_VERSION, "buckets": BUCKETS, "endpoints": self._counts}
+            text = json.dumps(data, separators=(",", ":"))
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(text)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            log.warn("LatencyHistory", f"Could not write latency history {self.path}: {e}")
@@ -0,0 +1,185 @@
+"""OAuth2 client-credentials tokens, shared by all connectors of a client and cached until shortly before expiry."""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+from utils.deadline import Deadline
+from utils.logger import Logger as log
+
+DEFAULT_EXPIRES_IN = 3600
+REFRESH_MARGIN = 60.0  # refresh this long before expiry (at most half the token lifetime)
+AUTH_METHODS = ("client_secret_basic", "client_secret_post")
+
+
+class OAuth2Settings(NamedTuple):
+    """``connection.oauth2`` of a connector with ``auth_type: oauth2_client_credentials``."""
+
+    token_url: str
+    client_id: str
+    client_secret_env: str
+    scope: str = ""
+    audience: str = ""
+    auth_method: str = "client_secret_basic"
+
+    @property
+    def key(self) -> str:
+        """Identifies the token: connectors with the same client and scope share it."""
+        raw = "\n".join((self.token_url, self.client_id, self.scope, self.audience))
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+
+def parse_oauth2(raw: Any) -> OAuth2Settings:
+    """Validate ``{token_url, client_id | client_id_env, client_secret_env, scope, audience, auth_method}``."""
+    if not isinstance(raw, dict):
+        raise ValueError("connection.oauth2 is required for auth_type 'oauth2_client_credentials'")
+    client_id = raw.get("client_id") or (os.getenv(raw["client_id_env"], "") if raw.get("client_id_env") else "")
+    scope = raw.get("scope", "")
+    settings = OAuth2Settings(
+        token_url=str(raw.get("token_url") or ""),
+        client_id=str(client_id),
+        client_secret_env=str(raw.get("client_secret_env") or ""),
+        scope=" ".join(scope) if isinstance(scope, list) else str(scope),
+        audience=str(raw.get("audience") or ""),
+        auth_method=str(raw.get("auth_method", "client_secret_basic")),
+    )
+    if not settings.token_url.startswith(("https://", "http://")):
+        raise ValueError("connection.oauth2.token_url must be an http(s) URL")
+    if not raw.get("client_id") and not raw.get("client_id_env"):
+        raise ValueError("connection.oauth2.client_id (or client_id_env) is required")
+    if not settings.client_secret_env:
+        raise ValueError("connection.oauth2.client_secret_env is required")
+    if settings.auth_method not in AUTH_METHODS:
+        raise ValueError(f"connection.oauth2.auth_method must be one of {'|'.join(AUTH_METHODS)}")
+    return settings
+
+
+class _Token(NamedTuple):
+    access_token: str
+    refresh_at: float  # wall-clock time after which the token is renewed
+    expires_at: float
+
+
+class TokenProvider:
+    """Hands out access tokens per client, shared by every connector (and client) of a run.
+
+    Tokens live in memory and, with a ``path``, in a JSON file (mode 0600) so the next
+    run can reuse a still-valid token. Each client has its own lock: when several
+    connectors need a token at once, one fetches it and the others wait for it.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = path
+        self._tokens: Dict[str, _Token] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._loaded = False
+        self.fetches = 0
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text())
+            self._tokens.update({k: _Token(*v) for k, v in data.items()})
+        except (OSError, ValueError, TypeError) as e:
+            log.warn("TokenProvider", f"Ignoring unreadable token cache {self.path}: {e}")
+
+    def _save(self) -> None:
+        if self.path is None:
+            return
+        now = time.time()
+        with self._lock:
+            data = {k: list(t) for k, t in self._tokens.items() if t.expires_at > now}
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w") as f:
+                json.dump(data, f)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            log.warn("TokenProvider", f"Could not write token cache {self.path}: {e}")
+
+    @staticmethod
+    def _cache_key(settings: OAuth2Settings) -> str:
+        """``settings.key`` combined with the current client secret, so a rotated secret gets a new token."""
+        secret = os.getenv(settings.client_secret_env, "")
+        return hashlib.sha256(f"{settings.key}\n{secret}".encode("utf-8")).hexdigest()[:32]
+
+    def _client_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            self._load()
+            return self._locks.setdefault(key, threading.Lock())
+
+    def token(self, settings: OAuth2Settings, verify: Any = True, timeout: Any = 30,
+              deadline: Optional[Deadline] = None) -> str:
+        """A valid access token for the client, fetched only if the cached one is due for refresh."""
+        key = self._cache_key(settings)
+        with self._client_lock(key):
+            cached = self._tokens.get(key)
+            if cached is not None and time.time() < cached.refresh_at:
+                return cached.access_token
+            token = self._fetch(settings, verify, timeout, deadline or Deadline())
+            with self._lock:
+                self._tokens[key] = token
+            self._save()
+            return token.access_token
+
+    def invalidate(self, settings: OAuth2Settings, access_token: str) -> None:
+        """Forget a token the API rejected (unless another thread already replaced it), also on disk."""
+        key = self._cache_key(settings)
+        with self._lock:
+            self._load()
+            cached = self._tokens.get(key)
+            if cached is None or cached.access_token != access_token:
+                return
+            del self._tokens[key]
+        self._save()
+
+    def _fetch(self, settings: OAuth2Settings, verify: Any, timeout: Any, deadline: Deadline) -> _Token:
+        import requests
+
+        secret = os.getenv(settings.client_secret_env, "")
+        if not secret:
+            raise ValueError(f"OAuth2 client secret env var '{settings.client_secret_env}' is not set")
+        form = {"grant_type": "client_credentials"}
+        if settings.scope:
+            form["scope"] = settings.scope
+        if settings.audience:
+            form["audience"] = settings.audience
+        auth: Optional[Tuple[str, str]] = None
+        if settings.auth_method == "client_secret_basic":
+            auth = (settings.client_id, secret)
+        else:
+            form.update(client_id=settings.client_id, client_secret=secret)
+
+        deadline.check(f"before fetching an OAuth2 token from {settings.token_url}")
+        log.debug("TokenProvider", "Fetching OAuth2 token for client '%s' from %s", settings.client_id,
+                  settings.token_url)
+        response = requests.post(
+            settings.token_url, data=form, auth=auth, verify=verify, timeout=timeout,
+            headers={"Accept": "application/json"},
+        )
+        if response.status_code != 200:
+            # The body of a token error is safe to log (RFC 6749 error codes), the request is not.
+            log.error("TokenProvider", f"Token request to {settings.token_url} failed: "
+                                       f"HTTP {response.status_code} {response.text[:200]}")
+            response.raise_for_status()
+            raise requests.HTTPError(f"HTTP {response.status_code} from {settings.token_url}")
+        payload = response.json()
+        if not payload.get("access_token"):
+            raise ValueError(f"Token response from {settings.token_url} has no access_token")
+
+        self.fetches += 1
+        lifetime = float(payload.get("expires_in") or DEFAULT_EXPIRES_IN)
+        now = time.time()
+        log.info("TokenProvider", f"Fetched OAuth2 token for client '{settings.client_id}' (valid {lifetime:.0f}s)")
+        return _Token(payload["access_token"], now + lifetime - min(REFRESH_MARGIN, lifetime / 2), now + lifetime)
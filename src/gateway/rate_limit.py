@@ -0,0 +1,155 @@
+"""Client-side per-host rate limiting that follows the server's rate-limit headers."""
+
+import email.utils
+import threading
+import time
+from typing import Any, Dict, Mapping, Optional
+from urllib.parse import urlsplit
+
+from utils.logger import Logger as log
+
+DEFAULT_429_PAUSE = 1.0
+EPOCH_THRESHOLD = 1_000_000_000  # X-RateLimit-Reset above this is a unix timestamp, below it a delay
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After is either delay-seconds or an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(email.utils.parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse_reset(value: Optional[str]) -> Optional[float]:
+    """Seconds until the rate-limit window resets."""
+    if not value:
+        return None
+    try:
+        reset = float(value)
+    except ValueError:
+        return None
+    if reset > EPOCH_THRESHOLD:
+        reset -= time.time()
+    return max(reset, 0.0)
+
+
+def host_key(host: str) -> str:
+    """Lower-cased host name without port or credentials, e.g. ``API.example.com:8443`` -> ``api.example.com``."""
+    if host == "default":
+        return host
+    return urlsplit(host if "//" in host else f"//{host}").hostname or host.lower()
+
+
+class TokenBucket:
+    """Token bucket with reservations, adjusted by what the server reports.
+
+    ``reserve()`` takes a token and returns how long the caller has to wait before
+    sending; tokens may go negative, so concurrent callers queue up fairly instead of
+    polling. Without a configured rate the bucket only enforces server pauses.
+    Server hints (remaining budget until reset) lower the rate until the window resets.
+    A server pause stops the refill and leaves a single token, so callers queued behind
+    it resume one by one at the rate instead of all at once.
+    """
+
+    def __init__(self, rate: Optional[float] = None, burst: Optional[float] = None):
+        self.rate = rate
+        self.burst = burst or (max(rate, 1.0) if rate else 1.0)
+        self.tokens = self.burst
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._server_rate: Optional[float] = None
+        self._server_until = 0.0
+        self._lock = threading.Lock()
+
+    def _effective_rate(self, now: float) -> Optional[float]:
+        if self._server_rate is not None and now < self._server_until:
+            return min(self.rate, self._server_rate) if self.rate else self._server_rate
+        return self.rate
+
+    def _refill(self, now: float, rate: Optional[float]) -> None:
+        # No refill before ``_updated``, which is moved to the end of a server pause.
+        if rate and now > self._updated:
+            self.tokens = min(self.burst, self.tokens + (now - self._updated) * rate)
+        self._updated = max(self._updated, now)
+
+    def reserve(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            pause = max(self._paused_until - now, 0.0)
+            rate = self._effective_rate(now)
+            self._refill(now, rate)
+            if not rate:
+                return pause
+            self.tokens -= 1
+            # The debt is paid off at the rate once the pause is over, not during it.
+            return pause + max(-self.tokens / rate, 0.0)
+
+    def pause(self, seconds: float) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now, self._effective_rate(now))
+            self._paused_until = max(self._paused_until, now + seconds)
+            self._updated = max(self._updated, self._paused_until)
+            self.tokens = min(self.tokens, 1.0)
+
+    def observe(self, status: int, headers: Mapping[str, str]) -> None:
+        """Adjust to a response's Retry-After / X-RateLimit-Remaining / X-RateLimit-Reset headers."""
+        retry_after = _parse_retry_after(headers.get("Retry-After"))
+        reset = _parse_reset(headers.get("X-RateLimit-Reset"))
+        try:
+            remaining = int(headers.get("X-RateLimit-Remaining", ""))
+        except ValueError:
+            remaining = None
+
+        if retry_after is not None:
+            self.pause(retry_after)
+        elif remaining is not None and remaining <= 0 and reset is not None:
+            self.pause(reset)
+        elif status == 429:
+            self.pause(reset if reset is not None else DEFAULT_429_PAUSE)
+
+        if remaining is not None and reset is not None and remaining > 0:
+            with self._lock:
+                now = time.monotonic()
+                self._server_rate = remaining / max(reset, 1.0)
+                self._server_until = now + reset
+                self.tokens = min(self.tokens, float(remaining))
+
+
+class RateLimiters:
+    """One ``TokenBucket`` per host, configured from ``rate_limits`` in settings.yaml.
+
+    ``rate_limits: {quay.example.com: {rate: 10, burst: 20}, default: {rate: 50}}``; hosts
+    without an entry (and no default) are only paused when the server asks for it.
+    Hosts are matched by ``host_key``: case-insensitive, ignoring ports.
+    Total time spent waiting is tracked per host.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.config = {host_key(host): settings for host, settings in (config or {}).items()}
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+        self.waited: Dict[str, float] = {}
+
+    def bucket(self, host: str) -> TokenBucket:
+        host = host_key(host)
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                settings = self.config.get(host) or self.config.get("default") or {}
+                bucket = TokenBucket(settings.get("rate"), settings.get("burst"))
+                self._buckets[host] = bucket
+            return bucket
+
+    def record_wait(self, host: str, seconds: float) -> None:
+        if seconds <= 0:
+            return
+        with self._lock:
+            self.waited[host] = self.waited.get(host, 0.0) + seconds
+        log.debug("RateLimiters", "Waited %.2fs for %s", seconds, host)
@@ -6,15 +6,37 @@ src_dir = os.path.dirname(os.path.abspath(__file__))
 if src_dir not in sys.path:
     sys.path.insert(0, src_dir)
 
-from config.loader import Config
-from collectors.generic_collector import GenericCollector
-from output.yaml_writer import YamlWriter
-from utils.display import Display, SeederStats, ConnectorResult
-from utils.logger import Logger as log
 
+PROFILE_SUMMARY_PHASES = 5
+
+
+def main(argv=None):
+    # Heavy modules (yaml, requests, the collector/output stack) are imported on first use
+    # so short runs and `import main` stay cheap; see tests/test_import_time.py.
+    from contextlib import nullcontext
+    from config.loader import Config
+    from collectors.scheduler import ConnectorGraph
+    from collectors.shared_responses import SharedResponses
+    from gateway.latency import LatencyHistory
+    from gateway.oauth import TokenProvider
+    from gateway.rate_limit import RateLimiters
+    from utils.deadline import Deadline
+    from utils.display import Display, SeederStats, ConnectorResult
+    from utils.logger import Logger as log
 
-def main():
     config = Config()
+    deadline = Deadline(config.run_deadline)
+
+    profiler = None
+    profile_dir = _profile_dir(argv or [], config.cache_dir)
+    if profile_dir:
+        from utils.profiling import Profiler
+
+        profiler = Profiler(profile_dir)
+        profiler.start()
+
+    def profiled(phase):
+        return profiler.phase(phase) if profiler else nullcontext()
 
     Display.banner(config.version, config.debug)
 
@@ -36,20 +58,98 @@ def main():
         Display.summary(stats, duration)
         sys.exit(0)
 
-    collected_data = {}
+    shared = SharedResponses()
+    latency = LatencyHistory.load(config.cache_dir / "latency.json" if config.cache_dir else None)
+    rate_limiters = RateLimiters(config.rate_limits)
+    # One token per OAuth2 client for all connectors; still-valid tokens are reused across runs.
+    tokens = TokenProvider(config.cache_dir / "oauth_tokens.json" if config.cache_dir else None)
+
+    # Existing outputs are parsed and indexed while connectors fetch, and every section is
+    # diffed as soon as its connector is done, so writing only has to emit the files.
+    # A replica of a sharded run rarely merges, so it loads nothing it may not need. Sharded
+    # outputs are skipped too: their writer only reads the shards whose fingerprint changed.
+    existing_outputs = {}
+    if not config.shard_dir:
+        from output.existing import ExistingOutput
+        from output.sharded_writer import ShardedWriter
+        from output.writers import get_writer
+
+        for output in config.outputs:
+            writer = get_writer(output.format, output.shared_structure)
+            if writer is not ShardedWriter:
+                existing_outputs[output.name] = ExistingOutput(writer, output.file, output.identity_keys)
+
+    def section_ready(source, items):
+        for output in config.outputs:
+            if output.name in existing_outputs and output.accepts(source.target_key):
+                existing_outputs[output.name].section_ready(source.target_key, items)
+
+    run_connector = connector_runner(
+        shared, deadline, latency, rate_limiters, tokens, profiled=profiled, on_items=section_ready,
+    )
+
+    # Independent connectors run concurrently; dependents start once their upstreams are done.
+    collected = {}
+    timed_out_keys = []
+    graph = ConnectorGraph(config.sources)
+
+    def succeeded(run):
+        return bool(run.items)
 
-    for i, source in enumerate(enabled_connectors, 1):
+    coordinator = None
+    if config.shard_dir:
+        # Replicas split the connector groups; the one holding the merge lease writes the outputs.
+        from collectors.sharding import FileCoordinator, ShardWorker
+
+        coordinator = FileCoordinator(
+            config.shard_dir, config.shard_run_id, config.shard_replica, config.shard_lease_seconds,
+        )
+        merging, outcomes = ShardWorker(coordinator, graph).run(
+            run_connector, succeeded, config.max_parallel, deadline,
+        )
+    else:
+        merging, outcomes = True, graph.run(run_connector, succeeded, config.max_parallel, deadline)
+    for i, outcome in enumerate(outcomes, 1):
+        source = outcome.source
         Display.source_start(i, len(enabled_connectors), source.name)
 
-        collector = GenericCollector(source)
-        items = collector.collect()
+        timed_out = outcome.timed_out or (outcome.result is not None and outcome.result.timed_out)
+        if timed_out:
+            reason = outcome.skipped or "cancelled at the run deadline"
+            timed_out_keys.append(source.target_key)
+            Display.source_result(success=False, message=f"Deadline: {reason}")
+            stats.add_result(ConnectorResult(
+                name=source.name, target_key=source.target_key,
+                items_collected=0, success=False,
+                message=reason, timed_out=True,
+            ))
+            continue
+
+        if outcome.skipped:
+            Display.source_result(success=False, message=f"Skipped: {outcome.skipped}")
+            stats.add_result(ConnectorResult(
+                name=source.name, target_key=source.target_key,
+                items_collected=0, success=False,
+                message=outcome.skipped, skipped=True,
+            ))
+            continue
 
+        run = outcome.result
+        items = run.items
+        timing = dict(
+            network_seconds=run.network_seconds, rate_limit_wait_seconds=run.rate_limit_wait_seconds,
+            wire_bytes=run.wire_bytes, decoded_bytes=run.decoded_bytes,
+        )
         if items:
-            collected_data[source.target_key] = items
-            Display.source_result(success=True, items=len(items))
+            collected[source.name] = items
+            Display.source_result(
+                success=True, items=len(items), shared=run.shared_response,
+                wire_bytes=run.wire_bytes, decoded_bytes=run.decoded_bytes,
+            )
             stats.add_result(ConnectorResult(
                 name=source.name, target_key=source.target_key,
                 items_collected=len(items), success=True,
+                shared_response=run.shared_response, **timing,
             ))
         else:
             Display.source_result(success=False, message=f"No data from {source.name}")
@@ -57,13 +157,68 @@ def main():
                 name=source.name, target_key=source.target_key,
                 items_collected=0, success=False,
                 message=f"No data returned",
+                shared_response=run.shared_response, **timing,
             ))
 
-    if collected_data:
-        updated = YamlWriter.write(config.output_file, collected_data)
-        stats.output_updated = updated
+    # Sections keep the configured connector order regardless of completion order.
+    section_order = list(dict.fromkeys(s.target_key for s in enabled_connectors))
+    collected_data = {}
+    for source in enabled_connectors:
+        if source.name in collected:
+            collected_data[source.target_key] = collected[source.name]
+
+    log.debug("Main", "HTTP requests: %d, coalesced: %d", shared.requests, shared.coalesced)
+    latency.save()
+    stats.hedged_requests, stats.hedge_wins = latency.hedged, latency.hedge_wins
+    if timed_out_keys:
+        log.warn("Main", f"Run deadline of {config.run_deadline:g}s hit, keeping last-good data for: {timed_out_keys}")
+
+    if not merging:
+        log.info("Main", "Partial results stored; another replica merges and writes the outputs")
+    elif collected_data or timed_out_keys:
+        from output.history import HistoryStore
+        from output.integrity import check_integrity
+        from output.writers import get_writer
+
+        history = HistoryStore(config.history_path, config.history_keep) if config.history_path else None
+        for output in config.outputs:
+            writer = get_writer(output.format, output.shared_structure)
+            existing_output = existing_outputs.get(output.name)
+            output_data = output.select(collected_data)
+            carry_over = [k for k in timed_out_keys if output.accepts(k) and k not in output_data]
+            if carry_over:
+                existing = existing_output.existing() if existing_output else writer.load_existing(output.file)
+                output_data = _with_last_good(existing, output.file, output_data, carry_over, section_order)
+            if not output_data:
+                log.warn("Main", f"No data collected for output '{output.name}', skipping")
+                continue
+            if output.integrity_mode != "off":
+                output_data, issues = check_integrity(
+                    output_data, output.references, drop=output.integrity_mode == "drop",
+                )
+                stats.integrity_issues.extend(f"{output.name}: {issue}" for issue in issues)
+            with profiled(f"write-{output.name}"):
+                updated = writer.write(
+                    output.file, output_data, output.identity_keys,
+                    output.order_by, output.sort_max_in_memory, existing_output,
+                )
+            stats.outputs[output.name] = updated
+            stats.output_updated = stats.output_updated or updated
+            # Unchanged outputs are identical to the last recorded run, so only changes are recorded.
+            if history and (updated or not history.runs(output.name, limit=1)):
+                history.record(output.name, output_data)
+        if history:
+            history.close()
     else:
         log.warn("Main", "No data collected from any source, skipping output")
+    for existing_output in existing_outputs.values():
+        existing_output.close()
+    if merging and coordinator:
+        coordinator.finish()
+
+    if profiler:
+        profiler.stop()
+        stats.profile, stats.profile_dir = profiler.worst(PROFILE_SUMMARY_PHASES), str(profiler.directory)
 
     duration = (datetime.now() - start_ts).total_seconds()
     Display.summary(stats, duration)
@@ -72,5 +227,132 @@ def main():
         sys.exit(1)
 
 
+def connector_runner(shared=None, deadline=None, latency=None, rate_limiters=None, tokens=None,
+                     profiled=None, on_items=None):
+    """The ``execute(source, upstream)`` callback for ``ConnectorGraph.run`` and ``ShardWorker.run``.
+
+    ``upstream`` maps connector names to their ``ConnectorRun``; collectors (e.g. ``values_from``)
+    only see the items. ``on_items(source, items)`` is called for every connector that returned items.
+    """
+    from contextlib import nullcontext
+    from collectors.generic_collector import GenericCollector
+    from collectors.scheduler import ConnectorRun
+
+    def run_connector(source, upstream):
+        collector = GenericCollector(
+            source, shared=shared, upstream={name: run.items for name, run in upstream.items()}, deadline=deadline,
+            latency=latency, rate_limiters=rate_limiters, tokens=tokens,
+        )
+        with profiled(f"connector-{source.name}") if profiled else nullcontext():
+            items = collector.collect()
+        if items and on_items:
+            on_items(source, items)
+        return ConnectorRun(
+            items, collector.shared_response, collector.timed_out,
+            collector.client.network_seconds, collector.client.rate_limit_wait_seconds,
+            collector.client.wire_bytes, collector.client.decoded_bytes,
+        )
+
+    return run_connector
+
+
+def _profile_dir(argv, cache_dir):
+    """Report directory from ``--profile [DIR]`` or ``SEEDER_PROFILE_DIR``; None if profiling is off.
+
+    Without an explicit directory, reports go to ``<cache dir>/profiles/<timestamp>``.
+    """
+    from pathlib import Path
+
+    requested = os.getenv("SEEDER_PROFILE_DIR") or None
+    if argv:
+        import argparse
+
+        parser = argparse.ArgumentParser(prog="main.py", description="Collect connector data and write the outputs")
+        parser.add_argument(
+            "--profile", nargs="?", const="", metavar="DIR",
+            help="profile every connector and writer (cProfile + tracemalloc) into DIR",
+        )
+        args = parser.parse_args(argv)
+        if args.profile is not None:
+            requested = args.profile
+    if requested is None:
+        return None
+    if requested:
+        return Path(requested)
+    return Path(cache_dir or ".seeder_cache") / "profiles" / datetime.now().strftime("%Y%m%d-%H%M%S")
+
+
+def _with_last_good(existing, output_file, data, keys, section_order):
+    """Add the sections ``keys`` from the existing output (last-good data) to ``data``."""
+    from utils.logger import Logger as log
+
+    existing = existing or {}
+    merged = dict(data)
+    for key in keys:
+        if key in existing:
+            merged[key] = existing[key]
+            log.info("Main", f"Keeping last-good '{key}' ({len(existing[key])} item(s)) from {output_file}")
+        else:
+            log.warn("Main", f"No last-good data for '{key}' in {output_file}")
+    return {k: merged[k] for k in section_order if k in merged}
+
+
+def history_main(argv):
+    """``main.py history list|diff|restore``: inspect recorded runs and restore one without calling any API."""
+    import argparse
+
+    from config.loader import Config
+    from output.history import HistoryStore
+    from output.writers import get_writer
+    from utils.logger import Logger as log
+
+    parser = argparse.ArgumentParser(prog="main.py history", description="Inspect and restore recorded runs")
+    commands = parser.add_subparsers(dest="command", required=True)
+    list_cmd = commands.add_parser("list", help="list recorded runs, newest first")
+    list_cmd.add_argument("--output", help="only runs of this output")
+    list_cmd.add_argument("--limit", type=int, default=20)
+    diff_cmd = commands.add_parser("diff", help="show changes between two runs")
+    diff_cmd.add_argument("old", type=int)
+    diff_cmd.add_argument("new", type=int)
+    restore_cmd = commands.add_parser("restore", help="rewrite an output from a recorded run")
+    restore_cmd.add_argument("run", type=int)
+    args = parser.parse_args(argv)
+
+    config = Config()
+    if not config.history_path or not config.history_path.exists():
+        log.error("History", "No history recorded (enable it with history.enabled in settings.yaml)")
+        return 1
+
+    outputs = {o.name: o for o in config.outputs}
+    with HistoryStore(config.history_path, config.history_keep) as history:
+        try:
+            if args.command == "list":
+                for run in history.runs(args.output, args.limit):
+                    print(f"{run.id:>6}  {run.created}  {run.output:<20} {run.items:>8} item(s)  "
+                          f"{', '.join(run.sections)}")
+            elif args.command == "diff":
+                output = outputs.get(history.run(args.new).output)
+                changes = history.diff(args.old, args.new, output.identity_keys if output else None)
+                print("\n".join(changes) if changes else "No changes")
+            else:
+                run = history.run(args.run)
+                output = outputs.get(run.output)
+                if output is None:
+                    log.error("History", f"Output '{run.output}' of run {run.id} is no longer configured")
+                    return 1
+                writer = get_writer(output.format, output.shared_structure)
+                writer.write(
+                    output.file, history.load(run.id), output.identity_keys,
+                    output.order_by, output.sort_max_in_memory,
+                )
+                log.info("History", f"Restored run {run.id} ({run.created}) to {output.file}")
+        except KeyError as e:
+            log.error("History", str(e.args[0]))
+            return 1
+    return 0
+
+
 if __name__ == "__main__":
-    main()
+    if sys.argv[1:2] == ["history"]:
+        sys.exit(history_main(sys.argv[2:]))
+    main(sys.argv[1:])
@@ -0,0 +1,202 @@
+import hashlib
+import os
+import stat
+import tempfile
+from collections.abc import Iterator
+from functools import lru_cache
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, IO, List, Optional, Tuple
+
+from collectors.records import CompactSection
+from output.diff import IdentityKeys, diff
+from output.ordering import DEFAULT_MAX_IN_MEMORY, OrderBy, canonical_order
+from utils.logger import Logger as log
+
+if TYPE_CHECKING:
+    from output.existing import ExistingOutput
+
+
+class _HashingWriter:
+    """Text stream wrapper that hashes everything written through it."""
+
+    def __init__(self, stream: IO[str]):
+        self.stream = stream
+        self.hash = hashlib.sha256()
+
+    def write(self, text: str) -> None:
+        self.stream.write(text)
+        self.hash.update(text.encode("utf-8"))
+
+
+def file_hash(path: Path) -> Optional[str]:
+    """Return the sha256 of a file's bytes, or None if it does not exist."""
+    if not path.exists():
+        return None
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def apply_order(
+    data: Dict[str, Any],
+    order_by: Optional[OrderBy],
+    max_in_memory: int = DEFAULT_MAX_IN_MEMORY,
+) -> Dict[str, Any]:
+    """Return data with the sections listed in ``order_by`` in canonical order.
+
+    Ordered sections become one-shot iterators that emitters consume item by item, so a
+    section above ``max_in_memory`` items is never materialized as a whole (the external
+    sort keeps at most one run of items in memory). Other sections, including compact
+    ones, are passed through unchanged.
+    """
+    if not order_by:
+        return data
+    return {
+        key: canonical_order(items, order_by[key], max_in_memory)
+        if key in order_by and isinstance(items, (list, CompactSection)) else items
+        for key, items in data.items()
+    }
+
+
+def is_section(items: Any) -> bool:
+    """True for item sequences and the ordered iterators of ``apply_order``."""
+    return isinstance(items, (list, CompactSection, Iterator))
+
+
+@lru_cache(maxsize=None)
+def _new_file_mode() -> int:
+    """Mode of a newly created file under the process umask (read without changing it where possible)."""
+    try:
+        with open("/proc/self/status") as f:
+            umask = next(int(line.split()[1], 8) for line in f if line.startswith("Umask:"))
+    except (OSError, StopIteration, ValueError):
+        umask = os.umask(0o022)
+        os.umask(umask)
+    return 0o666 & ~umask
+
+
+class BaseWriter(ABC):
+    """Abstract base class for output writers.
+
+    Subclasses define how a file is parsed and rendered; rendering to a temp file,
+    the byte-level unchanged check, diffing and the atomic replace are shared.
+    """
+
+    name = ""
+
+    @classmethod
+    @abstractmethod
+    def load_existing(cls, output_path: Path) -> Optional[Dict[str, Any]]:
+        """Load the existing output if it exists and is parseable."""
+
+    @classmethod
+    @abstractmethod
+    def emit(
+        cls,
+        stream: IO[str],
+        data: Dict[str, List[Dict[str, Any]]],
+        order_by: Optional[OrderBy] = None,
+        max_in_memory: int = DEFAULT_MAX_IN_MEMORY,
+    ) -> None:
+        """Render data to a text stream. Sections listed in ``order_by`` are emitted in canonical order."""
+
+    @staticmethod
+    def diff(
+        existing: Dict[str, Any],
+        new_data: Dict[str, Any],
+        identity_keys: Optional[IdentityKeys] = None,
+    ) -> List[str]:
+        """Compare existing and new data, return list of change descriptions.
+
+        Items are matched by their per-section identity key (default: ``name``) and
+        compared by content fingerprint.
+        """
+        return diff(existing, new_data, identity_keys)
+
+    @classmethod
+    def render_to_temp(cls, output_path: Path, emit_fn: Callable[[IO[str]], None]) -> Tuple[Path, str]:
+        """Render via ``emit_fn(stream)`` into a temp file next to ``output_path``.
+
+        Returns (temp path, sha256 of the rendered bytes). The temp file gets the mode of
+        the existing output (or the umask default), since ``os.replace`` keeps the temp
+        file's mode and ``mkstemp`` creates it as 0600.
+        """
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(prefix=f".{output_path.name}.", suffix=".tmp", dir=output_path.parent)
+        tmp_path = Path(tmp_name)
+        try:
+            try:
+                mode = stat.S_IMODE(output_path.stat().st_mode)
+            except FileNotFoundError:
+                mode = _new_file_mode()
+            os.fchmod(fd, mode)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                writer = _HashingWriter(f)
+                emit_fn(writer)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        return tmp_path, writer.hash.hexdigest()
+
+    @classmethod
+    def write(
+        cls,
+        output_path: Path,
+        data: Dict[str, List[Dict[str, Any]]],
+        identity_keys: Optional[IdentityKeys] = None,
+        order_by: Optional[OrderBy] = None,
+        max_in_memory: int = DEFAULT_MAX_IN_MEMORY,
+        existing_output: Optional["ExistingOutput"] = None,
+    ) -> bool:
+        """Write data to the output file. Returns True if the file was updated, False if unchanged.
+
+        The new content is rendered to a temp file next to the output first. If it is
+        byte-identical to the existing file, parsing and diffing are skipped entirely.
+        With ``existing_output`` the file was parsed and its sections diffed in the
+        background during collection, so only the remaining sections are diffed here.
+
+        Args:
+            output_path: Path to the output file.
+            data: Dictionary with target_keys as keys and lists of dicts as values.
+            identity_keys: Optional per-section identity fields used for diffing.
+            order_by: Optional per-section sort fields for canonical output order.
+            max_in_memory: Section size above which canonical ordering spills to disk.
+            existing_output: Optional background-loaded view of ``output_path``.
+        """
+        writer_name = cls.__name__
+        tmp_path, new_hash = cls.render_to_temp(
+            output_path, lambda stream: cls.emit(stream, data, order_by, max_in_memory)
+        )
+        try:
+            if new_hash == file_hash(output_path):
+                log.info(writer_name, f"No changes detected, {output_path} is byte-identical")
+                return False
+
+            if existing_output is not None:
+                changes = existing_output.diff(data)
+            else:
+                existing = cls.load_existing(output_path)
+                changes = None if existing is None else cls.diff(existing, data, identity_keys)
+
+            if changes is not None:
+                if not changes:
+                    log.info(writer_name, f"No changes detected, {output_path} is up to date")
+                    return False
+
+                log.info(writer_name, f"Changes detected in {output_path}:")
+                for change in changes:
+                    log.info(writer_name, change)
+            else:
+                log.info(writer_name, f"Creating new file: {output_path}")
+
+            total_items = sum(len(v) for v in data.values())
+            log.info(writer_name, f"Writing {total_items} item(s) to {output_path}")
+
+            os.replace(tmp_path, output_path)
+            log.info(writer_name, f"Successfully wrote {output_path}")
+            return True
+        finally:
+            tmp_path.unlink(missing_ok=True)
@@ -0,0 +1,219 @@
+"""Identity- and fingerprint-based diffing of output sections."""
+
+import hashlib
+import json
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from utils.logger import Logger as log
+
+DEFAULT_IDENTITY: Tuple[str, ...] = ("name",)
+
+IdentityKeys = Dict[str, Tuple[str, ...]]
+
+_CANONICAL_JSON = json.JSONEncoder(sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def normalize_identity_keys(raw: Any) -> IdentityKeys:
+    """Normalize {section: "field" | [fields]} into {section: (fields...)}."""
+    if not raw:
+        return {}
+    if not isinstance(raw, dict):
+        raise ValueError("identity_keys must be a mapping of section -> field(s)")
+
+    normalized: IdentityKeys = {}
+    for section, fields in raw.items():
+        if isinstance(fields, str):
+            fields = [fields]
+        if not isinstance(fields, (list, tuple)) or not fields or not all(isinstance(f, str) for f in fields):
+            raise ValueError(f"identity_keys.{section} must be a field name or a non-empty list of field names")
+        normalized[str(section)] = tuple(fields)
+    return normalized
+
+
+def canonical_json(item: Any) -> str:
+    """Return a compact JSON rendering of an item with sorted keys."""
+    return _CANONICAL_JSON.encode(item)
+
+
+def fingerprint(item: Any) -> str:
+    """Return a canonical content hash of an item, independent of dict key order."""
+    return hashlib.blake2b(canonical_json(item).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def section_fingerprint(items: Iterable[Any]) -> str:
+    """Return a content hash over a whole section, built incrementally item by item."""
+    h = hashlib.blake2b(digest_size=16)
+    for item in items:
+        h.update(canonical_json(item).encode("utf-8"))
+        h.update(b"\n")
+    return h.hexdigest()
+
+
+def identity_of(item: Any, key_fields: Sequence[str], index: int) -> Union[str, Tuple[Any, ...]]:
+    """Return the identity of an item, falling back to its list index."""
+    if isinstance(item, dict):
+        if len(key_fields) == 1:
+            value = item.get(key_fields[0])
+            if value is not None:
+                return value
+        else:
+            values = tuple(item.get(f) for f in key_fields)
+            if all(v is not None for v in values):
+                return values
+    return f"__idx_{index}"
+
+
+class DuplicateIdentity:
+    """Identity of the n-th occurrence (n >= 2) of an already seen identity.
+
+    Not a tuple: it must never compare equal to a composite identity of the same shape.
+    """
+
+    __slots__ = ("identity", "occurrence")
+
+    def __init__(self, identity: Any, occurrence: int):
+        self.identity = identity
+        self.occurrence = occurrence
+
+    def __eq__(self, other: Any) -> bool:
+        return type(other) is DuplicateIdentity and (self.identity, self.occurrence) == (
+            other.identity, other.occurrence,
+        )
+
+    def __hash__(self) -> int:
+        return hash((DuplicateIdentity, self.identity, self.occurrence))
+
+    def __getstate__(self) -> Tuple[Any, int]:
+        return self.identity, self.occurrence
+
+    def __setstate__(self, state: Tuple[Any, int]) -> None:
+        self.identity, self.occurrence = state
+
+    def __repr__(self) -> str:
+        return f"DuplicateIdentity({self.identity!r}, {self.occurrence})"
+
+
+def format_identity(identity: Any) -> str:
+    if isinstance(identity, DuplicateIdentity):
+        return f"{format_identity(identity.identity)}#{identity.occurrence}"
+    if isinstance(identity, tuple):
+        return "/".join(str(v) for v in identity)
+    return str(identity)
+
+
+class SectionIndex:
+    """Identity -> (fingerprint, position) index over one output section, built in a single pass.
+
+    Items are not retained by the index; changed items are fetched from the section
+    by position only when their changed fields are reported.
+    """
+
+    __slots__ = ("items", "entries", "duplicates")
+
+    def __init__(self, items: Sequence[Any], key_fields: Sequence[str] = DEFAULT_IDENTITY):
+        self.items = items
+        self.entries: Dict[Any, Tuple[str, int]] = {}
+        self.duplicates: Dict[Any, int] = {}
+
+        for i, item in enumerate(items):
+            identity = identity_of(item, key_fields, i)
+            if identity in self.entries:
+                count = self.duplicates.get(identity, 1) + 1
+                self.duplicates[identity] = count
+                identity = DuplicateIdentity(identity, count)
+            self.entries[identity] = (fingerprint(item), i)
+
+    def item(self, position: int) -> Any:
+        return self.items[position]
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+def _changed_fields(old_item: Any, new_item: Any) -> List[str]:
+    if not isinstance(old_item, dict) or not isinstance(new_item, dict):
+        return []
+    fields = []
+    for field in sorted(set(old_item) | set(new_item), key=str):
+        if old_item.get(field) != new_item.get(field):
+            fields.append(str(field))
+    return fields
+
+
+def diff_section(key: str, old: SectionIndex, new: SectionIndex) -> List[str]:
+    """Return change descriptions between two indexed versions of a section."""
+    changes: List[Tuple[str, str]] = []
+    old_entries = old.entries
+    new_entries = new.entries
+
+    for identity, (new_fp, new_pos) in new_entries.items():
+        old_entry = old_entries.get(identity)
+        label = format_identity(identity)
+        if old_entry is None:
+            changes.append((label, f"  + [{key}] added: {label}"))
+        elif old_entry[0] != new_fp:
+            old_item, new_item = old.item(old_entry[1]), new.item(new_pos)
+            fields = _changed_fields(old_item, new_item)
+            if not fields and isinstance(old_item, dict) and isinstance(new_item, dict):
+                # Only the JSON rendering differs (e.g. 1 vs 1.0); the values are equal.
+                continue
+            changes.append((label, f"  ~ [{key}] changed: {label} ({', '.join(fields)})"))
+
+    for identity in old_entries:
+        if identity not in new_entries:
+            label = format_identity(identity)
+            changes.append((label, f"  - [{key}] removed: {label}"))
+
+    # Only the (usually few) changes are sorted, keeping the diff linear in section size.
+    changes.sort(key=lambda c: c[0])
+    return [text for _, text in changes]
+
+
+def as_items(value: Any) -> Sequence[Any]:
+    """The items of a section value; scalars and strings count as an empty section."""
+    if isinstance(value, (str, bytes)) or not isinstance(value, Sequence):
+        return []
+    return value
+
+
+def section_changes(key: str, old: SectionIndex, new_items: Sequence[Any], key_fields: Sequence[str]) -> List[str]:
+    """Index the new items of a section present in both versions and diff them against ``old``."""
+    new_index = SectionIndex(new_items, key_fields)
+    for identity, count in new_index.duplicates.items():
+        log.warn("Diff", f"[{key}] duplicate identity '{format_identity(identity)}' ({count} items)")
+    return diff_section(key, old, new_index)
+
+
+def diff(
+    existing: Dict[str, Any],
+    new_data: Dict[str, Any],
+    identity_keys: Optional[IdentityKeys] = None,
+    changed_section: Optional[Callable[[str, Sequence[Any]], List[str]]] = None,
+) -> List[str]:
+    """Compare existing and new data section by section, return list of change descriptions.
+
+    ``changed_section(key, new_items)`` can supply the changes of a section present in
+    both versions (e.g. diffed ahead of time); by default both versions are indexed here.
+    """
+    identity_keys = identity_keys or {}
+    changes: List[str] = []
+
+    for key in sorted(set(existing) | set(new_data)):
+        old_items = as_items(existing.get(key, []))
+        new_items = as_items(new_data.get(key, []))
+
+        if key not in existing:
+            changes.append(f"  + [{key}] new section with {len(new_items)} item(s)")
+            continue
+
+        if key not in new_data:
+            changes.append(f"  - [{key}] section removed ({len(old_items)} item(s))")
+            continue
+
+        if changed_section is not None:
+            changes.extend(changed_section(key, new_items))
+            continue
+        key_fields = identity_keys.get(key, DEFAULT_IDENTITY)
+        changes.extend(section_changes(key, SectionIndex(old_items, key_fields), new_items, key_fields))
+
+    return changes
@@ -0,0 +1,102 @@
+"""Loading, indexing and diffing an existing output in the background while connectors still run."""
+
+import queue
+import threading
+from concurrent.futures import Future, wait
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Type
+
+from output.base_writer import BaseWriter
+from output.diff import DEFAULT_IDENTITY, IdentityKeys, SectionIndex, as_items, diff, section_changes
+from utils.logger import Logger as log
+
+_Loaded = Tuple[Optional[Dict[str, Any]], Dict[str, SectionIndex]]
+
+
+class ExistingOutput:
+    """The current content of one output file, parsed and indexed off the critical path.
+
+    Created when the run starts, a worker thread parses the file and builds the identity
+    index of every section. Each section handed to ``section_ready`` (as soon as its
+    connector finished) is indexed and diffed on the same thread, in order. At write
+    time ``diff`` reuses these results for every section that is still the same object;
+    sections replaced since (e.g. by integrity ``drop``) are diffed then.
+    """
+
+    def __init__(self, writer: Type[BaseWriter], path: Path, identity_keys: Optional[IdentityKeys] = None):
+        self.writer = writer
+        self.path = Path(path)
+        self.identity_keys = identity_keys or {}
+        self._loaded: "Future[_Loaded]" = Future()
+        self._sections: Dict[str, Tuple[Sequence[Any], "Future[Optional[List[str]]]"]] = {}
+        self._lock = threading.Lock()
+        self._tasks: "queue.Queue[Optional[Callable[[], None]]]" = queue.Queue()
+        self._tasks.put(lambda: self._run_into(self._loaded, self._load))
+        threading.Thread(target=self._work, name=f"existing-{self.path.name}", daemon=True).start()
+
+    def _work(self) -> None:
+        for task in iter(self._tasks.get, None):
+            task()
+
+    @staticmethod
+    def _run_into(future: Future, fn: Callable[[], Any]) -> None:
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(fn())
+        except BaseException as e:
+            future.set_exception(e)
+
+    def _key_fields(self, key: str) -> Sequence[str]:
+        return self.identity_keys.get(key, DEFAULT_IDENTITY)
+
+    def _load(self) -> _Loaded:
+        existing = self.writer.load_existing(self.path)
+        if existing is None:
+            return None, {}
+        indexes = {key: SectionIndex(as_items(items), self._key_fields(key)) for key, items in existing.items()}
+        log.debug("ExistingOutput", "Loaded and indexed %d section(s) of %s", len(indexes), self.path)
+        return existing, indexes
+
+    def existing(self) -> Optional[Dict[str, Any]]:
+        """The parsed output (None if it does not exist); waits for the background load."""
+        return self._loaded.result()[0]
+
+    def section_ready(self, key: str, items: Sequence[Any]) -> None:
+        """Queue the final items of a section for diffing against the existing output."""
+        future: "Future[Optional[List[str]]]" = Future()
+        with self._lock:
+            self._sections[key] = (items, future)
+        self._tasks.put(lambda: self._run_into(future, lambda: self._section_changes(key, items)))
+
+    def _section_changes(self, key: str, items: Sequence[Any]) -> Optional[List[str]]:
+        """Changes of a section that also exists in the output; None if it does not."""
+        index = self._loaded.result()[1].get(key)
+        if index is None:
+            return None
+        return section_changes(key, index, as_items(items), self._key_fields(key))
+
+    def section_diff(self, key: str, items: Sequence[Any]) -> List[str]:
+        """Changes of a section present in both versions, diffed ahead of time if ``items`` is unchanged."""
+        with self._lock:
+            ready = self._sections.get(key)
+        if ready is not None and ready[0] is items:
+            changes = ready[1].result()
+            if changes is not None:
+                return changes
+        elif ready is not None:
+            # The superseded diff is already queued; let it finish so it does not run after this one.
+            wait([ready[1]])
+        log.debug("ExistingOutput", "[%s] was not diffed ahead of time", key)
+        return self._section_changes(key, items) or []
+
+    def diff(self, data: Dict[str, Any]) -> Optional[List[str]]:
+        """Change descriptions from the existing output to ``data``; None if there is no output yet."""
+        existing = self.existing()
+        if existing is None:
+            return None
+        return diff(existing, data, self.identity_keys, changed_section=self.section_diff)
+
+    def close(self) -> None:
+        """Stop the worker once the queued work is done."""
+        self._tasks.put(None)
@@ -0,0 +1,270 @@
+"""Local, content-addressed history of written outputs (list / diff / restore past runs)."""
+
+import hashlib
+import json
+import sqlite3
+import zlib
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from config.defaults import DEFAULT_HISTORY_KEEP
+from output.diff import IdentityKeys, canonical_json, diff
+from utils.logger import Logger as log
+
+DEFAULT_KEEP = DEFAULT_HISTORY_KEEP
+DIGEST_SIZE = 16
+_PRUNE_SLACK = 0.1  # prune once a tenth over ``keep``, so garbage collection is amortized
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (hash BLOB PRIMARY KEY, data BLOB NOT NULL) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS sections (hash BLOB PRIMARY KEY, data BLOB NOT NULL) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    output TEXT NOT NULL,
+    created TEXT NOT NULL,
+    items INTEGER NOT NULL,
+    manifest BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_output ON runs (output, id);
+"""
+
+_ITEM_JSON = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+class RunInfo(NamedTuple):
+    """One recorded run of an output; ``sections`` maps section name -> section hash."""
+
+    id: int
+    output: str
+    created: str
+    items: int
+    sections: Dict[str, str]
+
+
+def _digest(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=DIGEST_SIZE).digest()
+
+
+class HistoryStore:
+    """Past runs stored as manifests over content-addressed items (sqlite, zlib-compressed).
+
+    Three levels, each stored once by content hash:
+
+    - ``objects``: one item (hash of its canonical JSON; stored in its original key order)
+    - ``sections``: the item hashes of one section, in output order
+    - ``runs``: output name, timestamp and a manifest of section name -> section hash
+
+    A run that changes one item of one section adds that item, one section list and a
+    small manifest; unchanged sections and items are shared with earlier runs.
+    """
+
+    def __init__(self, path: Path, keep: int = DEFAULT_KEEP):
+        self.path = Path(path)
+        self.keep = keep
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.path))
+        self._db.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._db.close()
+
+    def __enter__(self) -> "HistoryStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # -- recording -----------------------------------------------------------------------
+
+    def _missing(self, table: str, hashes: Iterable[bytes]) -> set:
+        db = self._db
+        db.execute("CREATE TEMP TABLE IF NOT EXISTS candidates (hash BLOB PRIMARY KEY) WITHOUT ROWID")
+        db.execute("DELETE FROM candidates")
+        db.executemany("INSERT OR IGNORE INTO candidates VALUES (?)", ((h,) for h in hashes))
+        rows = db.execute(
+            f"SELECT c.hash FROM candidates c LEFT JOIN {table} t ON t.hash = c.hash WHERE t.hash IS NULL"
+        )
+        return {row[0] for row in rows}
+
+    def record(self, output: str, data: Dict[str, Any]) -> int:
+        """Store the sections of one written output and return the new run id."""
+        manifest: Dict[str, str] = {}
+        section_rows: Dict[bytes, bytes] = {}
+        item_hashes: Dict[bytes, Any] = {}
+        total = 0
+
+        for key, items in data.items():
+            digests = []
+            for item in items:
+                h = _digest(canonical_json(item))
+                digests.append(h)
+                item_hashes.setdefault(h, item)
+            packed = b"".join(digests)
+            section_hash = hashlib.blake2b(packed, digest_size=DIGEST_SIZE).digest()
+            section_rows[section_hash] = packed
+            manifest[key] = section_hash.hex()
+            total += len(digests)
+
+        with self._db:
+            new_items = self._missing("objects", item_hashes)
+            self._db.executemany(
+                "INSERT INTO objects VALUES (?, ?)",
+                ((h, zlib.compress(_ITEM_JSON.encode(item_hashes[h]).encode("utf-8"))) for h in new_items),
+            )
+            new_sections = self._missing("sections", section_rows)
+            self._db.executemany(
+                "INSERT INTO sections VALUES (?, ?)",
+                ((h, zlib.compress(section_rows[h])) for h in new_sections),
+            )
+            cursor = self._db.execute(
+                "INSERT INTO runs (output, created, items, manifest) VALUES (?, ?, ?, ?)",
+                (output, datetime.now().isoformat(timespec="seconds"), total,
+                 zlib.compress(json.dumps(manifest).encode("utf-8"))),
+            )
+        run_id = cursor.lastrowid
+        log.info(
+            "HistoryStore",
+            f"Recorded run {run_id} of '{output}': {total} item(s), {len(new_items)} new, "
+            f"{len(new_sections)} new section(s)",
+        )
+        self.prune()
+        return run_id
+
+    # -- reading -------------------------------------------------------------------------
+
+    @staticmethod
+    def _run_info(row: Tuple[Any, ...]) -> RunInfo:
+        run_id, output, created, items, manifest = row
+        return RunInfo(run_id, output, created, items, json.loads(zlib.decompress(manifest)))
+
+    def runs(self, output: Optional[str] = None, limit: Optional[int] = None) -> List[RunInfo]:
+        """Recorded runs, newest first."""
+        query = "SELECT id, output, created, items, manifest FROM runs"
+        params: List[Any] = []
+        if output is not None:
+            query += " WHERE output = ?"
+            params.append(output)
+        query += " ORDER BY id DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        return [self._run_info(row) for row in self._db.execute(query, params)]
+
+    def run(self, run_id: int) -> RunInfo:
+        row = self._db.execute(
+            "SELECT id, output, created, items, manifest FROM runs WHERE id = ?", (run_id,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(f"run {run_id} is not in the history")
+        return self._run_info(row)
+
+    def _section_digests(self, section_hash: str) -> List[bytes]:
+        row = self._db.execute("SELECT data FROM sections WHERE hash = ?", (bytes.fromhex(section_hash),)).fetchone()
+        packed = zlib.decompress(row[0])
+        return [packed[i:i + DIGEST_SIZE] for i in range(0, len(packed), DIGEST_SIZE)]
+
+    def _objects(self, hashes: Iterable[bytes]) -> Dict[bytes, Any]:
+        wanted = list(dict.fromkeys(hashes))
+        found: Dict[bytes, Any] = {}
+        for start in range(0, len(wanted), 500):
+            chunk = wanted[start:start + 500]
+            rows = self._db.execute(
+                f"SELECT hash, data FROM objects WHERE hash IN ({','.join('?' * len(chunk))})", chunk
+            )
+            for h, blob in rows:
+                found[h] = json.loads(zlib.decompress(blob))
+        return found
+
+    def load(self, run_id: int) -> Dict[str, List[Any]]:
+        """Rebuild the sections written by a run, in their original order."""
+        info = self.run(run_id)
+        sections = {key: self._section_digests(h) for key, h in info.sections.items()}
+        objects = self._objects(h for digests in sections.values() for h in digests)
+        return {key: [objects[h] for h in digests] for key, digests in sections.items()}
+
+    def diff(self, old_id: int, new_id: int, identity_keys: Optional[IdentityKeys] = None) -> List[str]:
+        """Change descriptions from run ``old_id`` to run ``new_id``.
+
+        Sections with the same hash are skipped without reading them; for the others,
+        only items whose hash occurs in just one of the runs are loaded and diffed.
+        """
+        old, new = self.run(old_id), self.run(new_id)
+        old_data: Dict[str, List[bytes]] = {}
+        new_data: Dict[str, List[bytes]] = {}
+        for key in list(old.sections) + [k for k in new.sections if k not in old.sections]:
+            old_hash, new_hash = old.sections.get(key), new.sections.get(key)
+            if old_hash == new_hash:
+                continue
+            old_digests = self._section_digests(old_hash) if old_hash else []
+            new_digests = self._section_digests(new_hash) if new_hash else []
+            if old_hash and new_hash:
+                shared = Counter(old_digests) & Counter(new_digests)
+                old_digests = _without(old_digests, shared)
+                new_digests = _without(new_digests, shared)
+            if old_hash:
+                old_data[key] = old_digests
+            if new_hash:
+                new_data[key] = new_digests
+
+        objects = self._objects([h for d in old_data.values() for h in d] + [h for d in new_data.values() for h in d])
+        return diff(
+            {k: [objects[h] for h in d] for k, d in old_data.items()},
+            {k: [objects[h] for h in d] for k, d in new_data.items()},
+            identity_keys,
+        )
+
+    # -- retention -----------------------------------------------------------------------
+
+    def prune(self) -> int:
+        """Drop the oldest runs of outputs with more than ``keep`` runs, then unreferenced data."""
+        if not self.keep:
+            return 0
+        limit = self.keep + int(self.keep * _PRUNE_SLACK)
+        dropped = 0
+        with self._db:
+            for output, count in self._db.execute("SELECT output, COUNT(*) FROM runs GROUP BY output").fetchall():
+                if count <= limit:
+                    continue
+                cursor = self._db.execute(
+                    "DELETE FROM runs WHERE output = ? AND id NOT IN "
+                    "(SELECT id FROM runs WHERE output = ? ORDER BY id DESC LIMIT ?)",
+                    (output, output, self.keep),
+                )
+                dropped += cursor.rowcount
+            if dropped:
+                self._collect_garbage()
+        if dropped:
+            log.info("HistoryStore", f"Pruned {dropped} run(s) beyond the last {self.keep} per output")
+        return dropped
+
+    def _collect_garbage(self) -> None:
+        live_sections = set()
+        for (manifest,) in self._db.execute("SELECT manifest FROM runs"):
+            live_sections.update(bytes.fromhex(h) for h in json.loads(zlib.decompress(manifest)).values())
+        db = self._db
+        db.execute("CREATE TEMP TABLE IF NOT EXISTS live (hash BLOB PRIMARY KEY) WITHOUT ROWID")
+        db.execute("DELETE FROM live")
+        db.executemany("INSERT INTO live VALUES (?)", ((h,) for h in live_sections))
+        db.execute("DELETE FROM sections WHERE hash NOT IN (SELECT hash FROM live)")
+
+        db.execute("DELETE FROM live")
+        for (blob,) in db.execute("SELECT data FROM sections").fetchall():
+            packed = zlib.decompress(blob)
+            db.executemany(
+                "INSERT OR IGNORE INTO live VALUES (?)",
+                ((packed[i:i + DIGEST_SIZE],) for i in range(0, len(packed), DIGEST_SIZE)),
+            )
+        db.execute("DELETE FROM objects WHERE hash NOT IN (SELECT hash FROM live)")
+
+
+def _without(digests: List[bytes], remove: Counter) -> List[bytes]:
+    remove = Counter(remove)
+    kept = []
+    for h in digests:
+        if remove[h] > 0:
+            remove[h] -= 1
+        else:
+            kept.append(h)
+    return kept
@@ -0,0 +1,191 @@
+"""Referential-integrity checks between output sections (e.g. team members -> teams -> organizations)."""
+
+from typing import Any, Dict, Iterator, List, NamedTuple, Sequence, Set, Tuple
+
+from collectors.records import CompactSection
+from utils.logger import Logger as log
+
+INTEGRITY_MODES = ("off", "report", "drop")
+MAX_EXAMPLES = 5
+
+
+class Reference(NamedTuple):
+    """Items of ``section`` must match an item of ``target`` on ``fields`` == ``target_fields``."""
+
+    section: str
+    fields: Tuple[str, ...]
+    target: str
+    target_fields: Tuple[str, ...]
+
+
+class IntegrityIssue(NamedTuple):
+    """Dangling references found for one rule."""
+
+    reference: Reference
+    count: int
+    examples: List[Tuple[Any, ...]]
+    dropped: bool = False
+
+    def __str__(self) -> str:
+        ref = self.reference
+        shown = ", ".join(repr(e[0] if len(e) == 1 else e) for e in self.examples)
+        more = ", ..." if self.count > len(self.examples) else ""
+        action = "dropped" if self.dropped else "kept"
+        return (
+            f"{ref.section}: {self.count} item(s) reference a missing {ref.target} "
+            f"({', '.join(ref.fields)}) [{action}]: {shown}{more}"
+        )
+
+
+_ORG = (("organization",), "organizations", ("name",))
+_TEAM = (("organization", "team_name"), "teams", ("organization", "team_name"))
+
+# Sections of QuayInputs (models/quay_inputs.py) and what they point at. The *_to_remove
+# sections are not checked: they usually name teams that are no longer part of the input.
+QUAY_REFERENCES: Tuple[Reference, ...] = tuple(
+    Reference(section, *rule) for section, rule in (
+        ("robot_accounts", _ORG),
+        ("teams", _ORG),
+        ("default_repo_permissions", _ORG),
+        ("team_members", _TEAM),
+        ("team_repo_permissions", _TEAM),
+        ("team_ldap_sync", _TEAM),
+        ("team_sync_status", _TEAM),
+        ("team_member_invites", _TEAM),
+    )
+)
+
+PRESETS: Dict[str, Tuple[Reference, ...]] = {"quay": QUAY_REFERENCES}
+
+
+def _fields(value: Any, where: str) -> Tuple[str, ...]:
+    if isinstance(value, str):
+        value = [value]
+    if not isinstance(value, (list, tuple)) or not value or not all(isinstance(f, str) and f for f in value):
+        raise ValueError(f"{where} must be a field name or a non-empty list of field names")
+    return tuple(value)
+
+
+def normalize_integrity(raw: Any) -> Tuple[str, Tuple[Reference, ...]]:
+    """Normalize ``integrity: {mode, preset, references}`` into (mode, references)."""
+    if not raw:
+        return "off", ()
+    if not isinstance(raw, dict):
+        raise ValueError("integrity must be a mapping with mode, preset and/or references")
+
+    mode = str(raw.get("mode", "report")).lower()
+    if mode not in INTEGRITY_MODES:
+        raise ValueError(f"integrity.mode must be one of {'|'.join(INTEGRITY_MODES)}, got '{mode}'")
+
+    references: List[Reference] = []
+    preset = raw.get("preset")
+    if preset is not None:
+        if preset not in PRESETS:
+            raise ValueError(f"integrity.preset must be one of {'|'.join(PRESETS)}, got '{preset}'")
+        references.extend(PRESETS[preset])
+
+    for i, spec in enumerate(raw.get("references") or []):
+        where = f"integrity.references[{i}]"
+        if not isinstance(spec, dict) or not spec.get("section") or not spec.get("target"):
+            raise ValueError(f"{where} needs 'section', 'fields' and 'target'")
+        fields = _fields(spec.get("fields"), f"{where}.fields")
+        target_fields = _fields(spec.get("target_fields", fields), f"{where}.target_fields")
+        if len(fields) != len(target_fields):
+            raise ValueError(f"{where}: fields and target_fields must have the same length")
+        references.append(Reference(str(spec["section"]), fields, str(spec["target"]), target_fields))
+
+    if mode != "off" and not references:
+        raise ValueError("integrity needs a preset or a list of references")
+    return mode, _ordered(references)
+
+
+def _ordered(references: Sequence[Reference]) -> Tuple[Reference, ...]:
+    """Order rules so a section is checked before the sections that reference it.
+
+    With ``drop``, removing a team must also remove its members; checking ``teams``
+    against ``organizations`` first makes that cascade fall out of a single pass.
+    Rules on a reference cycle keep their configured order.
+    """
+    pending = list(references)
+    ordered: List[Reference] = []
+    while pending:
+        checked_later = {r.section for r in pending}
+        ready = [r for r in pending if r.target not in checked_later or r.target == r.section]
+        if not ready:
+            ready = pending[:1]
+        ordered.extend(ready)
+        pending = [r for r in pending if r not in ready]
+    return tuple(ordered)
+
+
+def _keys(section: Any, fields: Sequence[str]) -> Iterator[Tuple[Any, ...]]:
+    """Yield the ``fields`` of every item as a tuple, reading CompactSection columns directly."""
+    if isinstance(section, CompactSection):
+        columns = []
+        for f in fields:
+            if f in section.keys:
+                columns.append(section.column(f))
+            else:
+                columns.append([section.defaults.get(f)] * len(section))
+        return zip(*columns)
+    if len(fields) == 1:
+        f = fields[0]
+        return ((item.get(f) if isinstance(item, dict) else None,) for item in section)
+    return (
+        tuple(item.get(f) for f in fields) if isinstance(item, dict) else (None,) * len(fields)
+        for item in section
+    )
+
+
+def check_integrity(
+    data: Dict[str, Any],
+    references: Sequence[Reference],
+    drop: bool = False,
+) -> Tuple[Dict[str, Any], List[IntegrityIssue]]:
+    """Check every reference against a hash index of its target section.
+
+    Each rule costs one pass to index the target and one pass over the referencing
+    section, so the whole check is linear in the number of items. Rules whose section
+    or target is not part of ``data`` are skipped. With ``drop``, dangling items are
+    removed from the returned data; ``data`` itself is never modified.
+    """
+    data = dict(data)
+    issues: List[IntegrityIssue] = []
+    indexes: Dict[Tuple[str, Tuple[str, ...]], Set[Tuple[Any, ...]]] = {}
+
+    for ref in references:
+        section, target = data.get(ref.section), data.get(ref.target)
+        if section is None or target is None:
+            log.debug("Integrity", "Skipping %s -> %s: section not in output", ref.section, ref.target)
+            continue
+
+        index_key = (ref.target, ref.target_fields)
+        index = indexes.get(index_key)
+        if index is None:
+            index = indexes[index_key] = set(_keys(target, ref.target_fields))
+
+        keep = [key in index for key in _keys(section, ref.fields)]
+        count = len(keep) - sum(keep)
+        if not count:
+            continue
+
+        examples: List[Tuple[Any, ...]] = []
+        for key, ok in zip(_keys(section, ref.fields), keep):
+            if not ok and key not in examples:
+                examples.append(key)
+                if len(examples) == MAX_EXAMPLES:
+                    break
+        issue = IntegrityIssue(ref, count, examples, dropped=drop)
+        issues.append(issue)
+        log.warn("Integrity", str(issue))
+
+        if drop:
+            if isinstance(section, CompactSection):
+                data[ref.section] = section.select_rows(keep)
+            else:
+                data[ref.section] = [item for item, ok in zip(section, keep) if ok]
+            # Indexes over the shrunk section are stale for later rules that target it.
+            for key in [k for k in indexes if k[0] == ref.section]:
+                del indexes[key]
+
+    return data, issues
@@ -0,0 +1,57 @@
+import json
+from pathlib import Path
+from typing import Dict, List, Any, Optional, IO
+
+from output.base_writer import BaseWriter, apply_order, is_section
+from output.ordering import DEFAULT_MAX_IN_MEMORY, OrderBy
+from utils.logger import Logger as log
+
+# Without indent the C encoder is used; items are laid out one per line instead.
+_ITEM_ENCODER = json.JSONEncoder(ensure_ascii=False)
+
+
+class JsonWriter(BaseWriter):
+    """Writes collected data to an inputs.json file with diff detection."""
+
+    name = "json"
+
+    @classmethod
+    def load_existing(cls, output_path: Path) -> Optional[Dict[str, Any]]:
+        """Load existing inputs.json if it exists."""
+        if not output_path.exists():
+            return None
+
+        try:
+            with open(output_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if data else None
+        except ValueError as e:
+            log.warn("JsonWriter", f"Failed to parse existing {output_path}: {e}")
+            return None
+
+    @classmethod
+    def emit(
+        cls,
+        stream: IO[str],
+        data: Dict[str, List[Dict[str, Any]]],
+        order_by: Optional[OrderBy] = None,
+        max_in_memory: int = DEFAULT_MAX_IN_MEMORY,
+    ) -> None:
+        """Render data as JSON with one item per line."""
+        encode = _ITEM_ENCODER.encode
+        data = apply_order(data, order_by, max_in_memory)
+
+        stream.write("{")
+        for s, (key, items) in enumerate(data.items()):
+            stream.write(",\n" if s else "\n")
+            stream.write(f"  {encode(key)}: ")
+            if not is_section(items):
+                stream.write(encode(items))
+                continue
+            empty = True
+            for item in items:
+                stream.write("[\n    " if empty else ",\n    ")
+                stream.write(encode(item))
+                empty = False
+            stream.write("[]" if empty else "\n  ]")
+        stream.write("\n}\n" if data else "}\n")
@@ -0,0 +1,124 @@
+"""Canonical (order-stable) ordering of output sections."""
+
+import heapq
+import itertools
+import pickle
+import tempfile
+from typing import Any, Callable, Dict, IO, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from config.defaults import DEFAULT_MAX_IN_MEMORY
+from output.diff import DEFAULT_IDENTITY, IdentityKeys, canonical_json
+from utils.logger import Logger as log
+
+OrderBy = Dict[str, Tuple[str, ...]]
+
+IDENTITY_ORDER = "identity"
+
+_END = object()
+
+
+def normalize_order_by(raw: Any, identity_keys: Optional[IdentityKeys] = None) -> OrderBy:
+    """Normalize {section: "identity" | "field" | [fields]} into {section: (fields...)}."""
+    if not raw:
+        return {}
+    if not isinstance(raw, dict):
+        raise ValueError("order_by must be a mapping of section -> 'identity' | field(s)")
+
+    identity_keys = identity_keys or {}
+    normalized: OrderBy = {}
+    for section, fields in raw.items():
+        section = str(section)
+        if fields == IDENTITY_ORDER:
+            fields = identity_keys.get(section, DEFAULT_IDENTITY)
+        elif isinstance(fields, str):
+            fields = [fields]
+        if not isinstance(fields, (list, tuple)) or not fields or not all(isinstance(f, str) for f in fields):
+            raise ValueError(f"order_by.{section} must be 'identity', a field name or a non-empty list of field names")
+        normalized[section] = tuple(fields)
+    return normalized
+
+
+def _value_key(value: Any) -> Tuple[int, Any]:
+    # Rank by type first so mixed-type fields never raise TypeError on comparison.
+    if value is None:
+        return (0, 0)
+    if isinstance(value, (bool, int, float)):
+        return (1, value)
+    if isinstance(value, str):
+        return (2, value)
+    return (3, canonical_json(value))
+
+
+def sort_key(fields: Sequence[str]) -> Callable[[Any], Tuple[Any, ...]]:
+    """Build a total-order sort key over the given item fields."""
+    fields = tuple(fields)
+
+    def key(item: Any) -> Tuple[Any, ...]:
+        if not isinstance(item, dict):
+            return ((4, canonical_json(item)),)
+        return tuple(_value_key(item.get(f)) for f in fields) + ((3, canonical_json(item)),)
+
+    return key
+
+
+def _spill(run: List[Tuple[Any, int, Any]]) -> IO[bytes]:
+    f = tempfile.TemporaryFile(prefix="seeder-sort-")
+    for record in run:
+        pickle.dump(record, f, protocol=pickle.HIGHEST_PROTOCOL)
+    f.seek(0)
+    return f
+
+
+def _read_run(f: IO[bytes]) -> Iterator[Tuple[Any, int, Any]]:
+    try:
+        while True:
+            try:
+                yield pickle.load(f)
+            except EOFError:
+                return
+    finally:
+        f.close()
+
+
+def canonical_order(
+    items: Iterable[Any],
+    fields: Sequence[str],
+    max_in_memory: int = DEFAULT_MAX_IN_MEMORY,
+) -> Iterator[Any]:
+    """Yield items in canonical order.
+
+    Ties on ``fields`` are broken by the item's canonical JSON, so identical data always
+    comes out in the same order. Inputs larger than ``max_in_memory`` are sorted with an
+    external merge sort.
+    """
+    key = sort_key(fields)
+    source = iter(items)
+
+    first = list(itertools.islice(source, max_in_memory))
+    rest = next(source, _END)
+    if rest is _END:
+        first.sort(key=key)
+        yield from first
+        return
+
+    runs: List[IO[bytes]] = []
+    seq = itertools.count()
+    chunk = itertools.chain(first, [rest])
+    del first
+    try:
+        while True:
+            run = [(key(item), next(seq), item) for item in chunk]
+            if not run:
+                break
+            run.sort(key=lambda r: (r[0], r[1]))
+            runs.append(_spill(run))
+            del run
+            chunk = itertools.islice(source, max_in_memory)
+
+        log.debug("Ordering", "External merge sort over %d run(s) for fields %s", len(runs), list(fields))
+        for _, _, item in heapq.merge(*(_read_run(f) for f in runs), key=lambda r: (r[0], r[1])):
+            yield item
+    finally:
+        for f in runs:
+            f.close()
+
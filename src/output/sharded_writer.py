@@ -0,0 +1,181 @@
+import hashlib
+import os
+import re
+from pathlib import Path
+from typing import TYPE_CHECKING, AbstractSet, Dict, List, Any, Optional, IO
+
+from output.base_writer import BaseWriter, apply_order, file_hash
+from output.diff import IdentityKeys, section_fingerprint
+from output.ordering import DEFAULT_MAX_IN_MEMORY, OrderBy
+from output.yaml_writer import YamlWriter
+from utils.logger import Logger as log
+
+if TYPE_CHECKING:
+    from output.existing import ExistingOutput
+
+_UNSAFE_CHARS = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+class ShardedWriter(BaseWriter):
+    """Writes one YAML file per section plus an index file.
+
+    The index records a content fingerprint per section, so sections whose data did not
+    change are neither serialized nor parsed again. ``output_path`` is the index file;
+    section files live next to it.
+    """
+
+    name = "sharded"
+    shard_writer = YamlWriter
+
+    @staticmethod
+    def shard_name(key: str, taken: AbstractSet[str] = frozenset()) -> str:
+        """File name for a section, unique among ``taken`` (which includes the index file).
+
+        Keys that are not safe file names, or whose name is taken, get a short hash of the
+        key as suffix, so e.g. ``a b`` and ``a_b`` or a section named like the index never share a file.
+        """
+        safe = _UNSAFE_CHARS.sub("_", key)
+        name = f"{safe}.yaml"
+        if safe != key or name in taken:
+            name = f"{safe}-{hashlib.sha1(key.encode('utf-8')).hexdigest()[:8]}.yaml"
+        return name
+
+    @classmethod
+    def load_index(cls, output_path: Path) -> Dict[str, Dict[str, Any]]:
+        index = YamlWriter.load_existing(output_path) or {}
+        sections = index.get("sections") if isinstance(index, dict) else None
+        return sections if isinstance(sections, dict) else {}
+
+    @classmethod
+    def load_existing(cls, output_path: Path) -> Optional[Dict[str, Any]]:
+        """Load the index and all section files into one dict."""
+        sections = cls.load_index(output_path)
+        if not sections:
+            return None
+
+        data: Dict[str, Any] = {}
+        for key, entry in sections.items():
+            shard = cls.shard_writer.load_existing(output_path.parent / entry.get("file", cls.shard_name(key)))
+            data[key] = (shard or {}).get(key, [])
+        return data
+
+    @classmethod
+    def emit(
+        cls,
+        stream: IO[str],
+        data: Dict[str, List[Dict[str, Any]]],
+        order_by: Optional[OrderBy] = None,
+        max_in_memory: int = DEFAULT_MAX_IN_MEMORY,
+    ) -> None:
+        """Render the combined (unsharded) view of data."""
+        cls.shard_writer.emit(stream, data, order_by, max_in_memory)
+
+    @classmethod
+    def _write_section(
+        cls,
+        shard_path: Path,
+        key: str,
+        items: List[Any],
+        identity_keys: Optional[IdentityKeys],
+        existing_output: Optional["ExistingOutput"] = None,
+        order_by: Optional[OrderBy] = None,
+        max_in_memory: int = DEFAULT_MAX_IN_MEMORY,
+    ) -> Optional[List[str]]:
+        """Write one section file. Returns its changes, or None if the file was kept.
+
+        ``items`` is the section as collected: it is ordered while emitting, and the diff
+        is order-independent, so a section diffed ahead of time by ``existing_output`` is reused.
+        """
+        tmp_path, new_hash = cls.render_to_temp(
+            shard_path, lambda stream: cls.shard_writer.emit(stream, {key: items}, order_by, max_in_memory),
+        )
+        try:
+            if new_hash == file_hash(shard_path):
+                return None
+
+            if existing_output is not None and key in (existing_output.existing() or {}):
+                changes = existing_output.section_diff(key, items)
+            else:
+                existing = cls.shard_writer.load_existing(shard_path)
+                changes = None if existing is None else cls.diff(
+                    {key: existing.get(key, [])}, {key: items}, identity_keys,
+                )
+            if changes is None:
+                changes = [f"  + [{key}] new section with {len(items)} item(s)"]
+            elif not changes:
+                return None
+
+            os.replace(tmp_path, shard_path)
+            return changes
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+    @classmethod
+    def write(
+        cls,
+        output_path: Path,
+        data: Dict[str, List[Dict[str, Any]]],
+        identity_keys: Optional[IdentityKeys] = None,
+        order_by: Optional[OrderBy] = None,
+        max_in_memory: int = DEFAULT_MAX_IN_MEMORY,
+        existing_output: Optional["ExistingOutput"] = None,
+    ) -> bool:
+        """Write changed sections and the index. Returns True if any file was updated."""
+        output_dir = output_path.parent
+        old_sections = cls.load_index(output_path)
+        new_sections: Dict[str, Dict[str, Any]] = {}
+        changes: List[str] = []
+        taken = {output_path.name}
+
+        for key, items in data.items():
+            shard_file = cls.shard_name(key, taken)
+            taken.add(shard_file)
+            shard_path = output_dir / shard_file
+            # Ordered sections are streamed twice (fingerprint, then emit) rather than held sorted in memory.
+            fp = section_fingerprint(apply_order({key: items}, order_by, max_in_memory)[key])
+            old_entry = old_sections.get(key)
+
+            if old_entry and old_entry.get("file") == shard_file and old_entry.get("fingerprint") == fp \
+                    and shard_path.exists():
+                new_sections[key] = old_entry
+                continue
+
+            section_changes = cls._write_section(
+                shard_path, key, items, identity_keys, existing_output, order_by, max_in_memory,
+            )
+            if section_changes is None:
+                log.debug("ShardedWriter", "[%s] unchanged", key)
+                if old_entry and old_entry.get("file") == shard_file and old_entry.get("fingerprint") != fp:
+                    # Same data in a different order: keep the file and its recorded fingerprint.
+                    new_sections[key] = old_entry
+                    continue
+            else:
+                changes.extend(section_changes)
+            new_sections[key] = {"file": shard_file, "items": len(items), "fingerprint": fp}
+
+        for key, entry in old_sections.items():
+            if key not in new_sections:
+                changes.append(f"  - [{key}] section removed ({entry.get('items', 0)} item(s))")
+            old_file = entry.get("file", cls.shard_name(key))
+            if old_file not in taken:
+                (output_dir / old_file).unlink(missing_ok=True)
+
+        tmp_path, index_hash = cls.render_to_temp(
+            output_path, lambda stream: YamlWriter.emit(stream, {"sections": new_sections})
+        )
+        try:
+            index_updated = index_hash != file_hash(output_path)
+            if index_updated:
+                os.replace(tmp_path, output_path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+        if not changes:
+            log.info("ShardedWriter", f"No changes detected, {output_path} is up to date")
+            return index_updated
+
+        log.info("ShardedWriter", f"Changes detected in {output_path}:")
+        for change in changes:
+            log.info("ShardedWriter", change)
+        log.info("ShardedWriter", f"Successfully wrote {output_path}")
+        return True
@@ -0,0 +1,24 @@
+from typing import Dict, Type
+
+from output.base_writer import BaseWriter
+from output.json_writer import JsonWriter
+from output.sharded_writer import ShardedWriter
+from output.yaml_writer import SharedStructureYamlWriter, YamlWriter
+
+WRITERS: Dict[str, Type[BaseWriter]] = {
+    w.name: w for w in (YamlWriter, JsonWriter, ShardedWriter)
+}
+
+# Formats that support the opt-in shared-structure (named anchors) mode.
+SHARED_STRUCTURE_WRITERS: Dict[str, Type[BaseWriter]] = {
+    YamlWriter.name: SharedStructureYamlWriter,
+}
+
+
+def get_writer(output_format: str, shared_structure: bool = False) -> Type[BaseWriter]:
+    """Return the writer class for an output format (yaml | json | sharded)."""
+    if output_format not in WRITERS:
+        raise ValueError(f"Unknown output format '{output_format}', expected one of {'|'.join(WRITERS)}")
+    if shared_structure and output_format in SHARED_STRUCTURE_WRITERS:
+        return SHARED_STRUCTURE_WRITERS[output_format]
+    return WRITERS[output_format]
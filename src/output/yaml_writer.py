@@ -1,104 +1,136 @@
+import itertools
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, IO
 
 import yaml
+from output.base_writer import BaseWriter, apply_order, is_section
+from output.diff import fingerprint
+from output.ordering import DEFAULT_MAX_IN_MEMORY, OrderBy
+from utils.frozen import FrozenDict, FrozenList
 from utils.logger import Logger as log
 
+HEADER = "# Auto-generated by seeder\n# Do not edit manually - changes will be overwritten\n\n"
 
-class YamlWriter:
-    """Writes collected data to an inputs.yaml file with diff detection."""
+# Items per yaml.dump call when streaming a section.
+EMIT_CHUNK_SIZE = 1000
 
-    @staticmethod
-    def load_existing(output_path: Path) -> Optional[Dict[str, Any]]:
-        """Load existing inputs.yaml if it exists."""
-        if not output_path.exists():
-            return None
+# libyaml bindings are an order of magnitude faster than the pure-Python implementation.
+_Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+_Dumper = getattr(yaml, "CDumper", yaml.Dumper)
 
-        try:
-            content = output_path.read_text()
-            data = yaml.safe_load(content)
-            return data if data else None
-        except yaml.YAMLError as e:
-            log.warn("YamlWriter", f"Failed to parse existing {output_path}: {e}")
-            return None
 
-    @staticmethod
-    def diff(existing: Dict[str, Any], new_data: Dict[str, Any]) -> List[str]:
-        """Compare existing and new data, return list of change descriptions."""
-        changes = []
+class _ExpandedDumper(_Dumper):
+    """Never emits anchors/aliases: objects shared between items (e.g. defaults) are written out in full."""
 
-        all_keys = set(list(existing.keys()) + list(new_data.keys()))
+    def ignore_aliases(self, data):
+        return True
 
-        for key in sorted(all_keys):
-            old_items = existing.get(key, [])
-            new_items = new_data.get(key, [])
 
-            if not isinstance(old_items, list):
-                old_items = []
-            if not isinstance(new_items, list):
-                new_items = []
+class _SharedStructureDumper(yaml.Dumper):
+    """Emits anchors for objects referenced more than once, named after their content.
 
-            if key not in existing:
-                changes.append(f"  + [{key}] new section with {len(new_items)} item(s)")
-                continue
+    Needs the pure-Python serializer, since libyaml always names anchors ``id001``...
+    """
 
-            if key not in new_data:
-                changes.append(f"  - [{key}] section removed ({len(old_items)} item(s))")
-                continue
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._objects: Dict[int, Any] = {}
+        self._node_objects: Optional[Dict[int, Any]] = None
+        self._anchor_names = set()
 
-            old_by_name = {item.get("name", f"__idx_{i}"): item for i, item in enumerate(old_items)}
-            new_by_name = {item.get("name", f"__idx_{i}"): item for i, item in enumerate(new_items)}
+    def represent_data(self, data):
+        self._objects[id(data)] = data
+        return super().represent_data(data)
 
-            all_names = set(list(old_by_name.keys()) + list(new_by_name.keys()))
+    def generate_anchor(self, node):
+        if self._node_objects is None:
+            self._node_objects = {id(n): self._objects[key] for key, n in self.represented_objects.items()}
+        obj = self._node_objects.get(id(node))
+        name = f"shared_{fingerprint(obj)[:10]}" if obj is not None else super().generate_anchor(node)
+        base, n = name, 1
+        while name in self._anchor_names:
+            n += 1
+            name = f"{base}_{n}"
+        self._anchor_names.add(name)
+        return name
 
-            for name in sorted(all_names):
-                if name not in old_by_name:
-                    changes.append(f"  + [{key}] added: {name}")
-                elif name not in new_by_name:
-                    changes.append(f"  - [{key}] removed: {name}")
-                elif old_by_name[name] != new_by_name[name]:
-                    old_item = old_by_name[name]
-                    new_item = new_by_name[name]
-                    changed_fields = []
-                    all_fields = set(list(old_item.keys()) + list(new_item.keys()))
-                    for field in sorted(all_fields):
-                        if old_item.get(field) != new_item.get(field):
-                            changed_fields.append(field)
-                    changes.append(f"  ~ [{key}] changed: {name} ({', '.join(changed_fields)})")
 
-        return changes
+for _cls in (_ExpandedDumper, _SharedStructureDumper):
+    _cls.add_representer(FrozenDict, _cls.represent_dict)
+    _cls.add_representer(FrozenList, _cls.represent_list)
 
-    @staticmethod
-    def write(output_path: Path, data: Dict[str, List[Dict[str, Any]]]) -> bool:
-        """Write data to YAML file. Returns True if file was updated, False if unchanged.
 
-        Args:
-            output_path: Path to the output YAML file.
-            data: Dictionary with target_keys as keys and lists of dicts as values.
-        """
-        existing = YamlWriter.load_existing(output_path)
+class YamlWriter(BaseWriter):
+    """Writes collected data to an inputs.yaml file with diff detection.
 
-        if existing is not None:
-            changes = YamlWriter.diff(existing, data)
-            if not changes:
-                log.info("YamlWriter", f"No changes detected, {output_path} is up to date")
-                return False
+    Output is fully expanded (no ``&id001``/``*id001`` anchors) and streamed section by
+    section in chunks of items, so compact sections are never materialized as a whole.
+    """
 
-            log.info("YamlWriter", f"Changes detected in {output_path}:")
-            for change in changes:
-                log.info("YamlWriter", change)
-        else:
-            log.info("YamlWriter", f"Creating new file: {output_path}")
+    name = "yaml"
 
-        output_path.parent.mkdir(parents=True, exist_ok=True)
+    @classmethod
+    def load_existing(cls, output_path: Path) -> Optional[Dict[str, Any]]:
+        """Load existing inputs.yaml if it exists."""
+        if not output_path.exists():
+            return None
 
-        total_items = sum(len(v) for v in data.values())
-        log.info("YamlWriter", f"Writing {total_items} item(s) to {output_path}")
+        try:
+            with open(output_path, "r", encoding="utf-8") as f:
+                data = yaml.load(f, Loader=_Loader)
+            return data if data else None
+        except yaml.YAMLError as e:
+            log.warn("YamlWriter", f"Failed to parse existing {output_path}: {e}")
+            return None
 
-        with open(output_path, "w") as f:
-            f.write("# Auto-generated by seeder\n")
-            f.write("# Do not edit manually - changes will be overwritten\n\n")
-            yaml.dump(data, f, default_flow_style=False, allow_unicode=True, sort_keys=False)
+    @staticmethod
+    def dump(value: Any, stream: IO[str], dumper=_ExpandedDumper) -> None:
+        yaml.dump(value, stream, Dumper=dumper, default_flow_style=False, allow_unicode=True, sort_keys=False)
+
+    @classmethod
+    def emit(
+        cls,
+        stream: IO[str],
+        data: Dict[str, List[Dict[str, Any]]],
+        order_by: Optional[OrderBy] = None,
+        max_in_memory: int = DEFAULT_MAX_IN_MEMORY,
+    ) -> None:
+        """Render data as YAML. Sections listed in ``order_by`` are emitted in canonical order.
+
+        Without aliases, dumping ``{key: chunk1}`` followed by ``chunk2``, ``chunk3``...
+        is byte-identical to dumping the whole document at once.
+        """
+        stream.write(HEADER)
+        for key, items in apply_order(data, order_by, max_in_memory).items():
+            if not is_section(items):
+                cls.dump({key: items}, stream)
+                continue
 
-        log.info("YamlWriter", f"Successfully wrote {output_path}")
-        return True
+            source = iter(items)
+            cls.dump({key: list(itertools.islice(source, EMIT_CHUNK_SIZE))}, stream)
+            for chunk in iter(lambda: list(itertools.islice(source, EMIT_CHUNK_SIZE)), []):
+                cls.dump(chunk, stream)
+
+
+class SharedStructureYamlWriter(YamlWriter):
+    """YAML writer that deliberately keeps shared objects (e.g. defaults) as named anchors.
+
+    Shrinks output where many items reference the same defaults; the consumer must
+    support YAML anchors/aliases.
+    """
+
+    name = "yaml-shared"
+
+    @classmethod
+    def emit(
+        cls,
+        stream: IO[str],
+        data: Dict[str, List[Dict[str, Any]]],
+        order_by: Optional[OrderBy] = None,
+        max_in_memory: int = DEFAULT_MAX_IN_MEMORY,
+    ) -> None:
+        """Render data as one YAML document, so anchors can span items and sections."""
+        stream.write(HEADER)
+        data = apply_order(data, order_by, max_in_memory)
+        materialized = {k: list(v) if is_section(v) and not isinstance(v, list) else v for k, v in data.items()}
+        cls.dump(materialized, stream, dumper=_SharedStructureDumper)
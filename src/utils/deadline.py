@@ -0,0 +1,42 @@
+import time
+from typing import Optional
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised by work that notices the run deadline has passed."""
+
+
+class Deadline:
+    """Absolute point in time (monotonic) by which a run must finish; ``None`` means no limit.
+
+    Long-running work checks it cooperatively: before starting a request, while
+    reading a response body, and to cap socket timeouts to the time left.
+    """
+
+    def __init__(self, seconds: Optional[float] = None):
+        self.seconds = seconds if seconds and seconds > 0 else None
+        self.at: Optional[float] = time.monotonic() + self.seconds if self.seconds else None
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left (never negative), or None without a deadline."""
+        if self.at is None:
+            return None
+        return max(self.at - time.monotonic(), 0.0)
+
+    @property
+    def expired(self) -> bool:
+        return self.at is not None and time.monotonic() >= self.at
+
+    def check(self, what: str = "") -> None:
+        if self.expired:
+            raise DeadlineExceeded(f"run deadline of {self.seconds:g}s exceeded{' ' + what if what else ''}")
+
+    def cap(self, timeout: float) -> float:
+        """Limit a timeout to the time left before the deadline."""
+        remaining = self.remaining()
+        if remaining is None:
+            return timeout
+        return max(min(timeout, remaining), 0.001)
+
+    def __repr__(self):
+        return f"Deadline(seconds={self.seconds}, remaining={self.remaining()})"
@@ -1,7 +1,7 @@
 """Display utilities for seeder console output."""
 
 from dataclasses import dataclass, field
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 
 class Colors:
@@ -32,6 +32,19 @@ BANNER = r"""
 """
 
 
+def _size(size: int) -> str:
+    for unit in ("B", "KiB", "MiB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
+
+
+def _transfer(wire_bytes: int, decoded_bytes: int) -> str:
+    """E.g. ``1.2 MiB on the wire, 18.4 MiB decoded (15.3x)``."""
+    return f"{_size(wire_bytes)} on the wire, {_size(decoded_bytes)} decoded ({decoded_bytes / wire_bytes:.1f}x)"
+
+
 @dataclass
 class ConnectorResult:
     """Result of a single connector collection."""
@@ -40,6 +53,17 @@ class ConnectorResult:
     items_collected: int
     success: bool
     message: Optional[str] = None
+    shared_response: bool = False
+    skipped: bool = False
+    timed_out: bool = False
+    network_seconds: float = 0.0
+    rate_limit_wait_seconds: float = 0.0
+    wire_bytes: int = 0
+    decoded_bytes: int = 0
+
+    @property
+    def compression_ratio(self) -> Optional[float]:
+        return self.decoded_bytes / self.wire_bytes if self.wire_bytes else None
 
 
 @dataclass
@@ -49,14 +73,41 @@ class SeederStats:
     successful_connectors: int = 0
     failed_connectors: int = 0
     skipped_connectors: int = 0
+    coalesced_requests: int = 0
+    deadline_hits: List[str] = field(default_factory=list)
+    hedged_requests: int = 0
+    hedge_wins: int = 0
+    network_seconds: float = 0.0
+    rate_limit_wait_seconds: float = 0.0
+    wire_bytes: int = 0
+    decoded_bytes: int = 0
     total_items: int = 0
     output_updated: bool = False
+    outputs: Dict[str, bool] = field(default_factory=dict)
     changes: List[str] = field(default_factory=list)
+    integrity_issues: List[str] = field(default_factory=list)
+    # Slowest profiled phases (utils.profiling.PhaseProfile) when run with --profile.
+    profile: List[Any] = field(default_factory=list)
+    profile_dir: Optional[str] = None
     results: List[ConnectorResult] = field(default_factory=list)
 
+    @property
+    def compression_ratio(self) -> Optional[float]:
+        return self.decoded_bytes / self.wire_bytes if self.wire_bytes else None
+
     def add_result(self, result: ConnectorResult):
         self.results.append(result)
-        if result.success:
+        self.network_seconds += result.network_seconds
+        self.rate_limit_wait_seconds += result.rate_limit_wait_seconds
+        self.wire_bytes += result.wire_bytes
+        self.decoded_bytes += result.decoded_bytes
+        if result.shared_response:
+            self.coalesced_requests += 1
+        if result.timed_out:
+            self.deadline_hits.append(result.name)
+        if result.skipped:
+            self.skipped_connectors += 1
+        elif result.success:
             self.successful_connectors += 1
             self.total_items += result.items_collected
         else:
@@ -94,15 +145,21 @@ class Display:
 
             print(f"  {status} {name_style}{s.name}{Colors.RESET}")
             print(f"      {Colors.DIM}Host:{Colors.RESET}     {s.host}")
-            print(f"      {Colors.DIM}Endpoint:{Colors.RESET} {s.endpoint}")
+            method = f"{s.method} " if s.method != "GET" else ""
+            print(f"      {Colors.DIM}Endpoint:{Colors.RESET} {method}{s.endpoint}")
             print(f"      {Colors.DIM}Target:{Colors.RESET}   {s.target_key}")
+            if s.depends_on:
+                print(f"      {Colors.DIM}Needs:{Colors.RESET}    {', '.join(s.depends_on)}")
+            if s.fan_out:
+                batch = f", batches of {s.fan_out.batch_size}" if s.fan_out.batch_size > 1 else ""
+                print(f"      {Colors.DIM}Fan-out:{Colors.RESET}  {s.fan_out.param} x{len(s.fan_out.values)}{batch}")
 
             if debug and s.mapping_fields:
                 print(f"      {Colors.DIM}Mapping:{Colors.RESET}  {len(s.mapping_fields)} field(s)")
                 if s.mapping_replace_object:
                     print(f"      {Colors.DIM}Replace:{Colors.RESET}  {s.mapping_replace_object}")
                 for m in s.mapping_fields:
-                    api_f = m.get("from", "")
+                    api_f = m.get("from") or m.get("expr") or m.get("template", "")
                     out_f = m.get("to", "")
                     print(f"        {Colors.DIM}{api_f} -> {out_f}{Colors.RESET}")
 
@@ -128,9 +185,15 @@ class Display:
         print(f"\n{Colors.CYAN}{progress}{Colors.RESET} {bar} {Colors.BOLD}{name}{Colors.RESET}")
 
     @staticmethod
-    def source_result(success: bool, items: int = 0, message: str = None):
+    def source_result(
+        success: bool, items: int = 0, message: str = None, shared: bool = False,
+        wire_bytes: int = 0, decoded_bytes: int = 0,
+    ):
         if success:
-            print(f"    {Colors.GREEN}✓ {items} item(s) collected{Colors.RESET}")
+            note = f" {Colors.DIM}(shared response){Colors.RESET}" if shared else ""
+            if wire_bytes:
+                note += f" {Colors.DIM}{_transfer(wire_bytes, decoded_bytes)}{Colors.RESET}"
+            print(f"    {Colors.GREEN}✓ {items} item(s) collected{Colors.RESET}{note}")
         else:
             print(f"    {Colors.RED}✗ FAILED{Colors.RESET}")
             if message:
@@ -173,20 +236,65 @@ class Display:
         if stats.skipped_connectors > 0:
             print(f"    {Colors.YELLOW}Skipped:{Colors.RESET}     {stats.skipped_connectors}")
         print(f"    Items:       {stats.total_items}")
+        if stats.coalesced_requests > 0:
+            print(f"    Coalesced:   {stats.coalesced_requests} request(s)")
+        if stats.hedged_requests > 0:
+            print(f"    Hedged:      {stats.hedged_requests} request(s), {stats.hedge_wins} won by the hedge")
+        if stats.deadline_hits:
+            print(f"    {Colors.RED}Deadline:{Colors.RESET}    {len(stats.deadline_hits)} connector(s) cut off")
+        if stats.integrity_issues:
+            issues = len(stats.integrity_issues)
+            print(f"    {Colors.YELLOW}Integrity:{Colors.RESET}   {issues} dangling reference rule(s)")
 
         if stats.output_updated:
             print(f"    Output:      {Colors.GREEN}updated{Colors.RESET}")
         else:
             print(f"    Output:      {Colors.DIM}unchanged{Colors.RESET}")
+        if len(stats.outputs) > 1:
+            for name, updated in stats.outputs.items():
+                state = f"{Colors.GREEN}updated{Colors.RESET}" if updated else f"{Colors.DIM}unchanged{Colors.RESET}"
+                print(f"      {name}: {state}")
 
         print(f"    {Colors.BOLD}Duration:{Colors.RESET}    {duration:.2f}s")
+        if stats.network_seconds > 0:
+            print(f"    Network:     {stats.network_seconds:.2f}s (summed over requests)")
+        if stats.rate_limit_wait_seconds > 0:
+            print(f"    {Colors.YELLOW}Rate limit:{Colors.RESET}  {stats.rate_limit_wait_seconds:.2f}s waited")
+        if stats.wire_bytes > 0:
+            print(f"    Transfer:    {_transfer(stats.wire_bytes, stats.decoded_bytes)}")
         print()
 
-        failed = [r for r in stats.results if not r.success]
+        failed = [r for r in stats.results if not r.success and not r.skipped and not r.timed_out]
         if failed:
             print(f"  {Colors.RED}{Colors.BOLD}Failed Connectors:{Colors.RESET}")
             for r in failed:
                 print(f"    - {r.name}: {r.message or 'Unknown error'}")
             print()
 
+        timed_out = [r for r in stats.results if r.timed_out]
+        if timed_out:
+            print(f"  {Colors.RED}{Colors.BOLD}Deadline Exceeded (last-good data kept):{Colors.RESET}")
+            for r in timed_out:
+                print(f"    - {r.name}: {r.message}")
+            print()
+
+        if stats.integrity_issues:
+            print(f"  {Colors.YELLOW}{Colors.BOLD}Dangling References:{Colors.RESET}")
+            for issue in stats.integrity_issues:
+                print(f"    - {issue}")
+            print()
+
+        skipped = [r for r in stats.results if r.skipped]
+        if skipped:
+            print(f"  {Colors.YELLOW}{Colors.BOLD}Skipped Connectors:{Colors.RESET}")
+            for r in skipped:
+                print(f"    - {r.name}: {r.message}")
+            print()
+
+        if stats.profile_dir:
+            print(f"  {Colors.MAGENTA}{Colors.BOLD}Profile:{Colors.RESET} {Colors.DIM}{stats.profile_dir}{Colors.RESET}")
+            for phase in stats.profile:
+                print(f"    - {phase.describe()}")
+            print()
+
         print(f"{Colors.DIM}{'─' * 50}{Colors.RESET}")
@@ -1,38 +1,103 @@
 import datetime
+import json
+import sys
+import threading
+import time
 
 
 class Logger:
+    """Level-gated console logger.
+
+    Messages are only formatted once the level check passed. ``msg`` may be a string,
+    a %-format string with ``args``, or a zero-argument callable returning the message,
+    so expensive debug output costs nothing when debug is off::
+
+        log.debug("ApiClient", "GET %s", url)
+        log.debug("ApiClient", lambda: f"headers={mask(headers)}")
+
+    Lines are written to the stream's buffer without a flush per call; errors flush.
+    ``LOG_FORMAT=json`` (or ``configure(fmt="json")``) emits JSON lines for log shipping.
+    """
+
     DEBUG_ENABLED = False
+    FORMAT = "text"
+    STREAM = None  # None -> sys.stdout at write time
+
+    COLORS = {
+        "DEBUG": "\033[94m",
+        "INFO": "\033[92m",
+        "WARN": "\033[93m",
+        "ERROR": "\033[91m",
+    }
+    RESET = "\033[0m"
+
+    _lock = threading.Lock()
+    _ts_second = -1
+    _ts_text = ""
 
     @staticmethod
-    def configure(debug: bool):
+    def configure(debug: bool, fmt: str = None, stream=None):
         Logger.DEBUG_ENABLED = debug
+        if fmt:
+            fmt = fmt.lower()
+            if fmt not in ("text", "json"):
+                raise ValueError(f"log format must be text|json, got '{fmt}'")
+            Logger.FORMAT = fmt
+        if stream is not None:
+            Logger.STREAM = stream
+
+    @staticmethod
+    def _timestamp() -> str:
+        now = int(time.time())
+        if now != Logger._ts_second:
+            Logger._ts_text = datetime.datetime.fromtimestamp(now).strftime("%Y-%m-%d %H:%M:%S")
+            Logger._ts_second = now
+        return Logger._ts_text
+
+    @staticmethod
+    def _render(msg, args) -> str:
+        if callable(msg):
+            msg = msg()
+        if args:
+            try:
+                return str(msg) % args
+            except (TypeError, ValueError):
+                # Like stdlib logging, a bad format string must not break the caller.
+                return f"{msg} {args}"
+        return str(msg)
+
+    @staticmethod
+    def log(level, cls, msg, *args):
+        text = Logger._render(msg, args)
+        ts = Logger._timestamp()
+        if Logger.FORMAT == "json":
+            line = json.dumps({"ts": ts, "level": level, "logger": cls, "msg": text}, ensure_ascii=False) + "\n"
+        else:
+            line = f"{Logger.COLORS.get(level, '')}[{ts}] [{level}] [{cls}] {text}{Logger.RESET}\n"
+
+        stream = Logger.STREAM or sys.stdout
+        with Logger._lock:
+            stream.write(line)
+            if level == "ERROR":
+                stream.flush()
 
     @staticmethod
-    def log(level, cls, msg):
-        colors = {
-            "DEBUG": "\033[94m",
-            "INFO": "\033[92m",
-            "WARN": "\033[93m",
-            "ERROR": "\033[91m",
-        }
-        reset = "\033[0m"
-        ts = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        print(f"{colors.get(level, '')}[{ts}] [{level}] [{cls}] {msg}{reset}")
+    def flush():
+        (Logger.STREAM or sys.stdout).flush()
 
     @staticmethod
-    def debug(cls, msg):
+    def debug(cls, msg, *args):
         if Logger.DEBUG_ENABLED:
-            Logger.log("DEBUG", cls, msg)
+            Logger.log("DEBUG", cls, msg, *args)
 
     @staticmethod
-    def info(cls, msg):
-        Logger.log("INFO", cls, msg)
+    def info(cls, msg, *args):
+        Logger.log("INFO", cls, msg, *args)
 
     @staticmethod
-    def warn(cls, msg):
-        Logger.log("WARN", cls, msg)
+    def warn(cls, msg, *args):
+        Logger.log("WARN", cls, msg, *args)
 
     @staticmethod
-    def error(cls, msg):
-        Logger.log("ERROR", cls, msg)
+    def error(cls, msg, *args):
+        Logger.log("ERROR", cls, msg, *args)
@@ -0,0 +1,113 @@
+"""Opt-in profiling of connector and writer phases with cProfile and tracemalloc."""
+
+import cProfile
+import pstats
+import re
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, List, NamedTuple
+
+from utils.logger import Logger as log
+
+DEFAULT_TOP = 25
+TRACE_FRAMES = 1
+_IGNORED = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+)
+
+
+class PhaseProfile(NamedTuple):
+    """Measurements of one profiled phase (a connector's collect/transform, or writing an output)."""
+
+    name: str
+    seconds: float
+    cpu_seconds: float  # time spent in Python functions of the phase's thread
+    hotspot: str  # function with the most own time
+    allocated: int  # net bytes allocated (process-wide) while the phase ran
+
+    def describe(self) -> str:
+        return (f"{self.name}: {self.seconds:.2f}s, {self.cpu_seconds:.2f}s in Python, "
+                f"{_mib(self.allocated)} allocated, hotspot {self.hotspot}")
+
+
+def _mib(size: int) -> str:
+    return f"{size / (1024 * 1024):+.1f} MiB"
+
+
+def _function(key) -> str:
+    filename, line, name = key
+    return name if filename == "~" else f"{Path(filename).name}:{line}({name})"
+
+
+class Profiler:
+    """Wraps phases in cProfile and tracemalloc and writes one report pair per phase.
+
+    For every phase ``<directory>`` receives ``<phase>.pstats`` (load with ``pstats`` or
+    snakeviz) and ``<phase>.alloc.txt`` with the top allocation sites. cProfile follows
+    only the thread that runs the phase; tracemalloc is process-wide, so allocation
+    numbers of connectors running at the same time overlap (profile with
+    ``MAX_PARALLEL_CONNECTORS=1`` to separate them).
+    """
+
+    def __init__(self, directory: Path, top: int = DEFAULT_TOP):
+        self.directory = Path(directory)
+        self.top = top
+        self.phases: List[PhaseProfile] = []
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(TRACE_FRAMES)
+        log.info("Profiler", f"Profiling connectors and writers into {self.directory}")
+
+    def stop(self) -> None:
+        tracemalloc.stop()
+        lines = [p.describe() for p in self.worst(len(self.phases))]
+        (self.directory / "phases.txt").write_text("\n".join(lines) + "\n")
+
+    def worst(self, count: int) -> List[PhaseProfile]:
+        """The ``count`` slowest phases, slowest first."""
+        with self._lock:
+            return sorted(self.phases, key=lambda p: p.seconds, reverse=True)[:count]
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        stem = re.sub(r"[^A-Za-z0-9_.-]", "_", name)
+        before = tracemalloc.take_snapshot().filter_traces(_IGNORED)
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:  # Python 3.12+ allows one cProfile per process at a time
+            log.warn("Profiler", f"Another phase is being profiled, '{name}' only gets timings and allocations")
+            profile = None
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            cpu_seconds, hotspot = 0.0, "-"
+            if profile is not None:
+                profile.disable()
+                profile.dump_stats(str(self.directory / f"{stem}.pstats"))
+                stats = pstats.Stats(profile)
+                cpu_seconds = stats.total_tt
+                if stats.stats:
+                    hotspot = _function(max(stats.stats, key=lambda key: stats.stats[key][2]))
+
+            after = tracemalloc.take_snapshot().filter_traces(_IGNORED)
+            sites = after.compare_to(before, "lineno")
+            allocated = sum(s.size_diff for s in sites)
+            report = [f"{name}: {_mib(allocated)} net allocated, top {self.top} sites by size change"]
+            report.extend(str(s) for s in sites[:self.top])
+            (self.directory / f"{stem}.alloc.txt").write_text("\n".join(report) + "\n")
+
+            result = PhaseProfile(name, seconds, cpu_seconds, hotspot, allocated)
+            with self._lock:
+                self.phases.append(result)
+            log.debug("Profiler", lambda: result.describe())
@@ -97,3 +97,177 @@ def test_mapping_replace_object_sets_target_key(monkeypatch, tmp_path):
     Config.reset()
     cfg = Config()
     assert cfg.sources[0].target_key == "integrations"
+
+
+def _connector(name, target):
+    return {
+        "name": name,
+        "connection": {"host": "https://example.com", "endpoint": f"/{name}", "auth_type": "none"},
+        "mapping": {"replace_object": target, "fields": [{"from": "title", "to": "name"}]},
+    }
+
+
+def test_legacy_output_block_is_single_catch_all_target(monkeypatch, tmp_path):
+    settings = {
+        "output": {"file": str(tmp_path / "inputs.yaml"), "identity_keys": {"teams": ["organization", "team_name"]}},
+        "connectors": [_connector("c1", "notifiers")],
+    }
+    cfg_path = tmp_path / "settings.yaml"
+    _write_settings(cfg_path, settings)
+    monkeypatch.setenv("SEEDER_CONFIG_FILE", str(cfg_path))
+    monkeypatch.delenv("OUTPUT_FILE", raising=False)
+
+    Config.reset()
+    cfg = Config()
+    assert len(cfg.outputs) == 1
+    out = cfg.outputs[0]
+    assert out.file == tmp_path / "inputs.yaml"
+    assert out.format == "yaml"
+    assert out.accepts("anything")
+    assert out.identity_keys == {"teams": ("organization", "team_name")}
+
+
+def test_multiple_output_targets(monkeypatch, tmp_path):
+    settings = {
+        "output": {"order_by": {"notifiers": "identity"}},
+        "outputs": [
+            {"name": "acs", "file": str(tmp_path / "acs.yaml"), "target_keys": ["notifiers", "integrations"]},
+            {"name": "quay", "file": str(tmp_path / "quay.json"), "format": "json", "target_keys": ["teams"]},
+        ],
+        "connectors": [_connector("c1", "notifiers"), _connector("c2", "teams")],
+    }
+    cfg_path = tmp_path / "settings.yaml"
+    _write_settings(cfg_path, settings)
+    monkeypatch.setenv("SEEDER_CONFIG_FILE", str(cfg_path))
+    monkeypatch.delenv("OUTPUT_FILE", raising=False)
+    monkeypatch.delenv("OUTPUT_FORMAT", raising=False)
+
+    Config.reset()
+    cfg = Config()
+    acs, quay = cfg.outputs
+    assert (acs.name, acs.format, quay.name, quay.format) == ("acs", "yaml", "quay", "json")
+    assert acs.order_by == {"notifiers": ("name",)}
+    collected = {"notifiers": [1], "teams": [2], "other": [3]}
+    assert acs.select(collected) == {"notifiers": [1]}
+    assert quay.select(collected) == {"teams": [2]}
+
+
+def test_output_format_env_only_overrides_a_single_output(monkeypatch, tmp_path):
+    settings = {
+        "output": {"file": str(tmp_path / "inputs.yaml")},
+        "connectors": [_connector("c1", "notifiers")],
+    }
+    cfg_path = tmp_path / "settings.yaml"
+    _write_settings(cfg_path, settings)
+    monkeypatch.setenv("SEEDER_CONFIG_FILE", str(cfg_path))
+    monkeypatch.delenv("OUTPUT_FILE", raising=False)
+    monkeypatch.setenv("OUTPUT_FORMAT", "json")
+
+    Config.reset()
+    assert [o.format for o in Config().outputs] == ["json"]
+
+    settings["outputs"] = [
+        {"name": "acs", "file": str(tmp_path / "acs.yaml")},
+        {"name": "quay", "file": str(tmp_path / "quay.yaml"), "format": "sharded"},
+    ]
+    _write_settings(cfg_path, settings)
+    Config.reset()
+    assert [o.format for o in Config().outputs] == ["yaml", "sharded"]
+
+
+def test_duplicate_output_files_fail(monkeypatch, tmp_path):
+    settings = {
+        "outputs": [
+            {"name": "a", "file": str(tmp_path / "x.yaml")},
+            {"name": "b", "file": str(tmp_path / "x.yaml")},
+        ],
+        "connectors": [_connector("c1", "notifiers")],
+    }
+    cfg_path = tmp_path / "settings.yaml"
+    _write_settings(cfg_path, settings)
+    monkeypatch.setenv("SEEDER_CONFIG_FILE", str(cfg_path))
+
+    Config.reset()
+    with pytest.raises(ValueError):
+        Config()
+
+
+def test_unknown_output_format_fails(monkeypatch, tmp_path):
+    settings = {"output": {"format": "xml"}, "connectors": [_connector("c1", "notifiers")]}
+    cfg_path = tmp_path / "settings.yaml"
+    _write_settings(cfg_path, settings)
+    monkeypatch.setenv("SEEDER_CONFIG_FILE", str(cfg_path))
+    monkeypatch.delenv("OUTPUT_FORMAT", raising=False)
+
+    Config.reset()
+    with pytest.raises(ValueError):
+        Config()
+
+
+def _write_connectors_d(tmp_path):
+    conn_dir = tmp_path / "connectors.d"
+    conn_dir.mkdir()
+    _write_settings(conn_dir / "10-acs.yaml", [_connector("c1", "notifiers")])
+    _write_settings(conn_dir / "20-quay.yaml", {"connectors": [_connector("c2", "teams"), _connector("c3", "orgs")]})
+    settings = {
+        "output": {"file": str(tmp_path / "inputs.yaml")},
+        "connectors": [_connector("inline", "apis")],
+        "connector_includes": ["connectors.d/*.yaml"],
+    }
+    cfg_path = tmp_path / "settings.yaml"
+    _write_settings(cfg_path, settings)
+    return cfg_path, conn_dir
+
+
+def test_connectors_from_include_directory(monkeypatch, tmp_path):
+    cfg_path, _ = _write_connectors_d(tmp_path)
+    monkeypatch.setenv("SEEDER_CONFIG_FILE", str(cfg_path))
+    monkeypatch.setenv("SEEDER_CACHE_DIR", str(tmp_path / "cache"))
+
+    Config.reset()
+    cfg = Config()
+    assert [c.name for c in cfg.sources] == ["inline", "c1", "c2", "c3"]
+    assert [c.source_file for c in cfg.sources] == ["settings.yaml", "10-acs.yaml", "20-quay.yaml", "20-quay.yaml"]
+
+
+def test_connector_files_are_only_reparsed_on_change(monkeypatch, tmp_path):
+    import config.connector_files as cf
+
+    cfg_path, conn_dir = _write_connectors_d(tmp_path)
+    monkeypatch.setenv("SEEDER_CONFIG_FILE", str(cfg_path))
+    monkeypatch.setenv("SEEDER_CACHE_DIR", str(tmp_path / "cache"))
+    Config.reset()
+    Config()
+
+    parsed = []
+    real_parse = cf._raw_connectors
+    monkeypatch.setattr(cf, "_raw_connectors", lambda data, path: parsed.append(1) or real_parse(data, path))
+
+    Config.reset()
+    assert len(Config().sources) == 4
+    assert parsed == []
+
+    # Touched but unchanged content is recognised by its hash.
+    os.utime(conn_dir / "10-acs.yaml", ns=(1, 1))
+    Config.reset()
+    Config()
+    assert parsed == []
+
+    _write_settings(conn_dir / "10-acs.yaml", [_connector("c1-renamed", "notifiers")])
+    Config.reset()
+    cfg = Config()
+    assert parsed == [1]
+    assert cfg.sources[1].name == "c1-renamed"
+
+
+def test_invalid_connector_file_fails(monkeypatch, tmp_path):
+    cfg_path, conn_dir = _write_connectors_d(tmp_path)
+    bad = _connector("bad", "notifiers")
+    bad["connection"]["auth_type"] = "kerberos"
+    _write_settings(conn_dir / "30-bad.yaml", [bad])
+    monkeypatch.setenv("SEEDER_CONFIG_FILE", str(cfg_path))
+    monkeypatch.setenv("SEEDER_CACHE_DIR", str(tmp_path / "cache"))
+
+    Config.reset()
+    with pytest.raises(ValueError):
+        Config()
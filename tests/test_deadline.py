@@ -0,0 +1,157 @@
+"""Tests for the run deadline, per-connector timeouts and last-good carry-over."""
+
+import os
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+import yaml
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from collectors.scheduler import ConnectorGraph
+from config.loader import Config, ConnectorConfig
+from gateway.client import ApiClient
+from main import main
+from utils.deadline import Deadline, DeadlineExceeded
+import gateway.client as client_mod
+
+
+def _source(timeout=None):
+    conn = {"host": "https://x.example.com", "auth_type": "none", "endpoint": "/"}
+    if timeout is not None:
+        conn["timeout"] = timeout
+    return ConnectorConfig({"name": "s", "target_key": "items", "connection": conn})
+
+
+class TestDeadline:
+
+    def test_no_deadline(self):
+        d = Deadline()
+        assert d.remaining() is None and not d.expired
+        assert d.cap(30) == 30
+        d.check()
+
+    def test_expired(self):
+        d = Deadline(0.01)
+        time.sleep(0.02)
+        assert d.expired and d.remaining() == 0
+        with pytest.raises(DeadlineExceeded, match="0.01s"):
+            d.check()
+
+    def test_cap(self):
+        assert Deadline(5).cap(30) <= 5
+        assert Deadline(60).cap(3) == 3
+
+
+class TestConnectorTimeouts:
+
+    def test_default_from_env(self, monkeypatch):
+        monkeypatch.setenv("API_TIMEOUT", "12")
+        assert ApiClient(_source()).timeout == (12, 12)
+
+    def test_scalar_and_split(self):
+        assert ApiClient(_source(7)).timeout == (7, 7)
+        assert ApiClient(_source({"connect": 2, "read": 90})).timeout == (2, 90)
+
+    def test_partial_uses_default_for_rest(self, monkeypatch):
+        monkeypatch.delenv("API_TIMEOUT", raising=False)
+        assert ApiClient(_source({"connect": 2})).timeout == (2, 30)
+
+    def test_invalid(self):
+        with pytest.raises(ValueError, match="connection.timeout"):
+            _source({"read": "soon"})
+        with pytest.raises(ValueError, match="positive"):
+            _source(0)
+
+    def test_capped_by_deadline(self):
+        client = ApiClient(_source({"connect": 10, "read": 60}), deadline=Deadline(1))
+        connect, read = client.timeout
+        assert connect <= 1 and read <= 1
+
+    def test_no_request_after_deadline(self):
+        deadline = Deadline(0.01)
+        time.sleep(0.02)
+        client = ApiClient(_source(), deadline=deadline)
+        client._session = SimpleNamespace(get=lambda **kw: pytest.fail("request sent after deadline"))
+        with pytest.raises(DeadlineExceeded):
+            client.get("/")
+
+    def test_slow_body_is_abandoned(self):
+        client = ApiClient(_source(), deadline=Deadline(0.05))
+
+        def trickle(size):
+            while True:
+                time.sleep(0.02)
+                yield b"x"
+
+        with pytest.raises(DeadlineExceeded, match="while reading"):
+            raw = SimpleNamespace(stream=lambda size, decode_content: trickle(size))
+            client._read_body(SimpleNamespace(headers={}, raw=raw), "https://x.example.com/")
+
+
+def _node(name, depends_on=()):
+    return SimpleNamespace(name=name, depends_on=list(depends_on), enabled=True)
+
+
+class TestSchedulerDeadline:
+
+    def test_outstanding_work_is_reported_and_not_waited_for(self):
+        release = threading.Event()
+        graph = ConnectorGraph([_node("fast"), _node("hung"), _node("after", ["hung"])])
+
+        def execute(source, upstream):
+            if source.name == "hung":
+                release.wait(5)
+            return [1]
+
+        start = time.monotonic()
+        try:
+            outcomes = list(graph.run(execute, bool, 4, Deadline(0.1)))
+        finally:
+            release.set()
+        assert time.monotonic() - start < 1
+        assert [(o.source.name, o.timed_out) for o in outcomes] == [
+            ("fast", False), ("hung", True), ("after", True),
+        ]
+        assert outcomes[2].skipped == "not started before the run deadline"
+
+
+def test_run_keeps_last_good_data_for_cut_off_connector(tmp_path, monkeypatch, capsys):
+    fixture = yaml.safe_load(open(os.path.join(os.path.dirname(__file__), "fixtures", "settings.yaml")).read())
+    fixture["output"] = {"file": str(tmp_path / "inputs.yaml")}
+    fixture["run"] = {"deadline": 0.3}
+    fixture["connectors"].append({
+        "name": "slow-cmdb",
+        "target_key": "hosts",
+        "connection": {"host": "https://cmdb.example.com", "auth_type": "none", "endpoint": "/export"},
+    })
+    cfg_path = tmp_path / "settings.yaml"
+    cfg_path.write_text(yaml.safe_dump(fixture, sort_keys=False))
+    (tmp_path / "inputs.yaml").write_text(yaml.safe_dump({"apis": [], "hosts": [{"name": "db-1"}]}))
+    monkeypatch.setenv("SEEDER_CONFIG_FILE", str(cfg_path))
+    monkeypatch.delenv("OUTPUT_FILE", raising=False)
+    monkeypatch.delenv("RUN_DEADLINE", raising=False)
+
+    def fake_get(self, endpoint, **kwargs):
+        if endpoint == "/export":
+            while True:
+                self.deadline.check(f"while reading {endpoint}")
+                time.sleep(0.01)
+        return {"1forge.com": {"preferred": "1", "versions": {"1": {"info": {"title": "1Forge"}}}}}
+
+    monkeypatch.setattr(client_mod.ApiClient, "get", fake_get)
+
+    Config.reset()
+    with pytest.raises(SystemExit) as exc:
+        main()
+    assert exc.value.code == 1
+
+    content = yaml.safe_load((tmp_path / "inputs.yaml").read_text())
+    assert list(content) == ["apis", "hosts"]
+    assert content["apis"][0]["title"] == "1Forge"
+    assert content["hosts"] == [{"name": "db-1"}]
+    out = capsys.readouterr().out
+    assert "Deadline Exceeded" in out and "slow-cmdb" in out
@@ -5,6 +5,7 @@ import sys
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
 
+from output.diff import DuplicateIdentity, SectionIndex, normalize_identity_keys
 from output.yaml_writer import YamlWriter
 
 
@@ -115,3 +116,70 @@ class TestWriteWithDiff:
         data = {"notifiers": [{"name": "A"}]}
         assert YamlWriter.write(out, data) is True
         assert out.exists()
+
+
+# ── Identity-Keys ────────────────────────────────────────
+
+
+class TestIdentityKeys:
+    """Konfigurierbare (auch zusammengesetzte) Identity-Keys pro Section."""
+
+    KEYS = {"team_members": ("organization", "team_name", "member_name")}
+
+    def test_reorder_without_name_is_no_change(self):
+        old = {"team_members": [
+            {"organization": "o", "team_name": "t", "member_name": "a"},
+            {"organization": "o", "team_name": "t", "member_name": "b"},
+        ]}
+        new = {"team_members": list(reversed(old["team_members"]))}
+        assert YamlWriter.diff(old, new, self.KEYS) == []
+
+    def test_composite_key_added_and_removed(self):
+        old = {"team_members": [{"organization": "o", "team_name": "t", "member_name": "a"}]}
+        new = {"team_members": [{"organization": "o", "team_name": "t", "member_name": "b"}]}
+        changes = YamlWriter.diff(old, new, self.KEYS)
+        assert changes == [
+            "  - [team_members] removed: o/t/a",
+            "  + [team_members] added: o/t/b",
+        ]
+
+    def test_key_order_inside_item_is_ignored(self):
+        old = {"notifiers": [{"name": "A", "type": "jira", "traits": {"x": 1, "y": 2}}]}
+        new = {"notifiers": [{"type": "jira", "traits": {"y": 2, "x": 1}, "name": "A"}]}
+        assert YamlWriter.diff(old, new) == []
+
+    def test_duplicate_keys_are_kept_apart(self):
+        old = {"notifiers": [{"name": "A", "v": 1}, {"name": "A", "v": 2}]}
+        new = {"notifiers": [{"name": "A", "v": 1}, {"name": "A", "v": 3}]}
+        changes = YamlWriter.diff(old, new)
+        assert changes == ["  ~ [notifiers] changed: A#2 (v)"]
+
+    def test_duplicate_keys_are_detected(self):
+        index = SectionIndex([{"name": "A"}, {"name": "A"}, {"name": "A"}, {"name": "B"}])
+        assert index.duplicates == {"A": 3}
+        assert len(index) == 4
+
+    def test_duplicate_marker_never_equals_a_composite_identity(self):
+        marker = DuplicateIdentity(("x", 1), 2)
+        assert marker != (("x", 1), 2) and hash(marker) != hash((("x", 1), 2))
+        index = SectionIndex(
+            [{"org": "x", "n": 1}, {"org": "x", "n": 1}, {"org": ("x", 1), "n": 2}], ("org", "n"),
+        )
+        assert len(index) == 3
+
+    def test_int_and_float_of_same_value_are_no_change(self):
+        old = {"notifiers": [{"name": "A", "port": 1, "weight": 2.5}]}
+        new = {"notifiers": [{"name": "A", "port": 1.0, "weight": 2.5}]}
+        assert YamlWriter.diff(old, new) == []
+        new["notifiers"][0]["weight"] = 3
+        assert YamlWriter.diff(old, new) == ["  ~ [notifiers] changed: A (weight)"]
+
+    def test_normalize_identity_keys(self):
+        keys = normalize_identity_keys({"notifiers": "name", "teams": ["organization", "team_name"]})
+        assert keys == {"notifiers": ("name",), "teams": ("organization", "team_name")}
+
+    def test_large_section_diff(self):
+        items = [{"organization": "o", "team_name": f"t{i % 100}", "member_name": f"m{i}"} for i in range(50_000)]
+        old = {"team_members": items}
+        new = {"team_members": list(reversed(items))}
+        assert YamlWriter.diff(old, new, self.KEYS) == []
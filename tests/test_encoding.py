@@ -0,0 +1,90 @@
+"""Tests for Content-Encoding negotiation, streaming decompression and byte accounting."""
+
+import gzip
+import json
+import os
+import sys
+import threading
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from config.loader import ConnectorConfig
+from gateway.client import ApiClient
+from gateway.encoding import ACCEPT_ENCODING, StreamDecoder
+from utils.display import ConnectorResult, SeederStats
+
+PAYLOAD = json.dumps({"data": [{"name": f"team-{i}", "role": "member"} for i in range(5000)]}).encode()
+
+
+def _decode(encoding, body, chunk=1000):
+    decoder = StreamDecoder(encoding)
+    parts = [decoder.decompress(body[i:i + chunk]) for i in range(0, len(body), chunk)]
+    return b"".join(parts) + decoder.flush()
+
+
+class TestStreamDecoder:
+
+    def test_offers_gzip_and_deflate(self):
+        assert ACCEPT_ENCODING.startswith("gzip, deflate")
+
+    @pytest.mark.parametrize("encoding, encode", [
+        ("", lambda b: b),
+        ("identity", lambda b: b),
+        ("gzip", gzip.compress),
+        ("deflate", zlib.compress),
+        ("deflate", lambda b: zlib.compress(b)[2:-4]),  # raw deflate without zlib header
+        ("gzip, deflate", lambda b: zlib.compress(gzip.compress(b))),
+    ])
+    def test_chunked_decoding(self, encoding, encode):
+        assert _decode(encoding, encode(PAYLOAD)) == PAYLOAD
+
+    def test_unknown_encoding(self):
+        with pytest.raises(ValueError, match="compress"):
+            StreamDecoder("compress")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = PAYLOAD
+        gzipped = "gzip" in self.headers.get("Accept-Encoding", "")
+        if gzipped:
+            body = gzip.compress(body)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        if gzipped:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+
+
+def test_client_negotiates_gzip_and_counts_wire_and_decoded_bytes(server):
+    client = ApiClient(ConnectorConfig({
+        "name": "teams",
+        "target_key": "teams",
+        "connection": {"host": server, "auth_type": "none", "endpoint": "/teams"},
+    }))
+    assert len(client.get("/teams")["data"]) == 5000
+    assert client.decoded_bytes == len(PAYLOAD)
+    assert client.wire_bytes == len(gzip.compress(PAYLOAD))
+
+    stats = SeederStats()
+    stats.add_result(ConnectorResult("teams", "teams", 5000, True,
+                                     wire_bytes=client.wire_bytes, decoded_bytes=client.decoded_bytes))
+    assert stats.compression_ratio > 10
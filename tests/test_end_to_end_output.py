@@ -1,5 +1,6 @@
 """End-to-end test: seeder writes inputs.yaml."""
 
+import json
 import os
 import sys
 import yaml
@@ -51,3 +52,33 @@ def test_seeder_writes_inputs_yaml(tmp_path, monkeypatch):
     assert content["apis"][0]["preferred"] == "0.0.1"
     assert content["apis"][0]["title"] == "1Forge Finance APIs"
     assert content["apis"][0]["contact_email"] == "contact@1forge.com"
+
+
+def test_one_fetch_is_routed_to_several_outputs(tmp_path, monkeypatch):
+    fixture = yaml.safe_load(open(os.path.join(os.path.dirname(__file__), "fixtures", "settings.yaml")).read())
+    fixture.pop("output")
+    fixture["outputs"] = [
+        {"name": "acs", "file": str(tmp_path / "acs" / "inputs.yaml"), "target_keys": ["apis"]},
+        {"name": "quay", "file": str(tmp_path / "quay" / "inputs.json"), "format": "json", "target_keys": ["apis"]},
+    ]
+    cfg_path = tmp_path / "settings.yaml"
+    cfg_path.write_text(yaml.safe_dump(fixture, sort_keys=False))
+    monkeypatch.setenv("SEEDER_CONFIG_FILE", str(cfg_path))
+    monkeypatch.delenv("OUTPUT_FILE", raising=False)
+
+    calls = []
+
+    def fake_get(self, endpoint, **kwargs):
+        calls.append(endpoint)
+        return {"1forge.com": {"preferred": "0.0.1", "versions": {"0.0.1": {"info": {"title": "1Forge"}}}}}
+
+    monkeypatch.setattr(client_mod.ApiClient, "get", fake_get)
+
+    Config.reset()
+    main()
+
+    assert calls == ["/v2/list.json"]
+    acs = yaml.safe_load((tmp_path / "acs" / "inputs.yaml").read_text())
+    quay = json.loads((tmp_path / "quay" / "inputs.json").read_text())
+    assert acs == quay
+    assert acs["apis"][0]["title"] == "1Forge"
@@ -0,0 +1,138 @@
+"""Tests for loading and diffing the existing output in the background during collection."""
+
+import os
+import sys
+
+import pytest
+import yaml
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from config.loader import Config
+from main import main
+from output.diff import diff
+from output.existing import ExistingOutput
+from output.sharded_writer import ShardedWriter
+from output.yaml_writer import YamlWriter
+import gateway.client as client_mod
+import output.existing as existing_mod
+
+OLD = {
+    "notifiers": [{"name": f"n{i}", "type": "jira"} for i in range(50)],
+    "teams": [{"organization": "o", "team_name": f"t{i}"} for i in range(20)],
+    "gone": [{"name": "x"}],
+}
+IDENTITY = {"teams": ("organization", "team_name")}
+
+
+def _new():
+    notifiers = [dict(item) for item in OLD["notifiers"][1:]] + [{"name": "n99", "type": "email"}]
+    notifiers[0]["type"] = "email"
+    teams = [dict(item, role="member") if i == 3 else dict(item) for i, item in enumerate(OLD["teams"])]
+    return {"notifiers": notifiers, "teams": teams, "extra": [{"name": "e"}]}
+
+
+@pytest.fixture
+def counted(monkeypatch):
+    """Counts how often a section is actually indexed and diffed."""
+    calls = []
+    original = existing_mod.section_changes
+
+    def section_changes(key, *args):
+        calls.append(key)
+        return original(key, *args)
+
+    monkeypatch.setattr(existing_mod, "section_changes", section_changes)
+    return calls
+
+
+@pytest.fixture
+def open_existing():
+    """Creates ExistingOutput instances and stops their workers after the test."""
+    instances = []
+
+    def open_existing(*args):
+        instances.append(ExistingOutput(*args))
+        return instances[-1]
+
+    yield open_existing
+    for existing in instances:
+        existing.close()
+
+
+def test_sections_are_diffed_as_they_arrive(tmp_path, counted, open_existing):
+    out = tmp_path / "inputs.yaml"
+    YamlWriter.write(out, OLD, IDENTITY)
+    new = _new()
+
+    existing = open_existing(YamlWriter, out, IDENTITY)
+    for key, items in new.items():
+        existing.section_ready(key, items)
+    existing._sections["teams"][1].result()  # both sections were diffed on the worker
+    assert sorted(counted) == ["notifiers", "teams"]
+
+    assert existing.diff(new) == diff(OLD, new, IDENTITY)
+    assert sorted(counted) == ["notifiers", "teams"]
+
+
+def test_replaced_section_is_diffed_at_write_time(tmp_path, counted, open_existing):
+    out = tmp_path / "inputs.yaml"
+    YamlWriter.write(out, OLD, IDENTITY)
+    new = _new()
+    existing = open_existing(YamlWriter, out, IDENTITY)
+    existing.section_ready("teams", new["teams"])
+
+    new["teams"] = new["teams"][:10]  # e.g. rows dropped by the integrity check
+    assert existing.diff(new) == diff(OLD, new, IDENTITY)
+    assert counted.count("teams") == 2
+
+
+def test_write_uses_the_background_diff(tmp_path, open_existing):
+    out = tmp_path / "inputs.yaml"
+    existing = open_existing(YamlWriter, out)
+    assert existing.diff(OLD) is None
+    assert YamlWriter.write(out, OLD, IDENTITY, existing_output=existing) is True
+
+    existing = open_existing(YamlWriter, out, IDENTITY)
+    new = _new()
+    for key, items in new.items():
+        existing.section_ready(key, items)
+    assert YamlWriter.write(out, new, IDENTITY, existing_output=existing) is True
+    assert YamlWriter.load_existing(out) == new
+    assert YamlWriter.write(out, new, IDENTITY, existing_output=open_existing(YamlWriter, out, IDENTITY)) is False
+
+
+def test_sharded_writer(tmp_path, open_existing):
+    out = tmp_path / "index.yaml"
+    ShardedWriter.write(out, OLD, IDENTITY)
+    existing = open_existing(ShardedWriter, out, IDENTITY)
+    new = _new()
+    for key, items in new.items():
+        existing.section_ready(key, items)
+    assert ShardedWriter.write(out, new, IDENTITY, existing_output=existing) is True
+    assert ShardedWriter.load_existing(out) == new
+
+
+def test_sharded_output_is_not_loaded_in_the_background(tmp_path, monkeypatch):
+    settings = {
+        "output": {"file": str(tmp_path / "index.yaml"), "format": "sharded"},
+        "connectors": [{
+            "name": "quay-orgs", "target_key": "organizations",
+            "connection": {"host": "https://quay.example.com", "auth_type": "none", "endpoint": "/orgs"},
+        }],
+    }
+    cfg_path = tmp_path / "settings.yaml"
+    cfg_path.write_text(yaml.safe_dump(settings))
+    monkeypatch.setenv("SEEDER_CONFIG_FILE", str(cfg_path))
+    monkeypatch.delenv("OUTPUT_FILE", raising=False)
+    monkeypatch.delenv("OUTPUT_FORMAT", raising=False)
+    monkeypatch.setattr(client_mod.ApiClient, "get", lambda self, endpoint, **kw: [{"name": "acme"}])
+    Config.reset()
+    main()
+
+    loaded = []
+    monkeypatch.setattr(ShardedWriter, "load_existing", classmethod(lambda cls, path: loaded.append(path)))
+    Config.reset()
+    main()
+    assert loaded == []
+    assert (tmp_path / "organizations.yaml").exists()
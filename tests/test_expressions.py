@@ -0,0 +1,129 @@
+"""Tests fuer berechnete Mapping-Felder (expr/template)."""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from collectors.expressions import compile_expression, compile_template
+from collectors.generic_collector import GenericCollector
+from config.loader import ConnectorConfig
+
+
+def _collector(fields, compact=True):
+    source = ConnectorConfig({
+        "name": "test-source",
+        "connection": {"host": "https://example.com", "auth_type": "none", "endpoint": "/api"},
+        "mapping": {"replace_object": "items", "fields": fields},
+        "options": {"compact_records": compact},
+    })
+    collector = GenericCollector.__new__(GenericCollector)
+    collector.source = source
+    return collector
+
+
+class TestExpressions:
+
+    @pytest.mark.parametrize("source,item,expected", [
+        ("lower(name)", {"name": "Jira-Sec"}, "jira-sec"),
+        ("org + '/' + name", {"org": "acme", "name": "api"}, "acme/api"),
+        ("'bot' if is_bot else 'user'", {"is_bot": True}, "bot"),
+        ("'bot' if is_bot else 'user'", {}, "user"),
+        ("info.title", {"info": {"title": "T"}}, "T"),
+        ("tags[0]", {"tags": ["a", "b"]}, "a"),
+        ("tags[5]", {"tags": ["a"]}, None),
+        ("count * 2 + 1", {"count": 3}, 7),
+        ("1 < count <= 3", {"count": 3}, True),
+        ("'x' in tags", {"tags": ["x"]}, True),
+        ("'x' in tags", {}, False),
+        ("coalesce(alias, name)", {"alias": "", "name": "n"}, "n"),
+        ("join(tags, '|')", {"tags": ["a", 1, None]}, "a|1|"),
+        ("upper(missing)", {}, None),
+        ("a and b or 'fallback'", {"a": 1, "b": 0}, "fallback"),
+    ])
+    def test_evaluate(self, source, item, expected):
+        assert compile_expression(source)(item) == expected
+
+    def test_evaluation_error_yields_none(self):
+        assert compile_expression("name + 1")({"name": "x"}) is None
+        assert compile_expression("a / b")({"a": 1, "b": 0}) is None
+
+    @pytest.mark.parametrize("source", [
+        "__import__('os')",
+        "name.__class__()",
+        "open('x')",
+        "[x for x in tags]",
+        "lambda: 1",
+        "2 ** 8",
+        "name[::-1]",
+        "lower(name, sep=',')",
+    ])
+    def test_unsafe_or_unsupported_syntax_is_rejected(self, source):
+        with pytest.raises(ValueError):
+            compile_expression(source)
+
+    def test_invalid_syntax(self):
+        with pytest.raises(ValueError, match="invalid expression"):
+            compile_expression("name +")
+
+    def test_repeat_is_bounded(self):
+        assert compile_expression("name * 100000")({"name": "x"}) is None
+        assert compile_expression("name * 9999 * 9999")({"name": "x"}) is None
+        assert compile_expression("name * 5000")({"name": "ab"}) == "ab" * 5000
+        assert compile_expression("name * 5000")({"name": "abc"}) is None
+
+    @pytest.mark.parametrize("source", [
+        "'%050000s' % name",
+        "str([[0] * 5000] * 2000)",
+        "[[name] * 5000] * 2000",
+        "join(split(csv, ','), name * 9000)",
+        "replace(name * 5000, 'x', 'xxxxx')",
+        "str(split(commas, ','))",
+    ])
+    def test_output_size_is_bounded(self, source):
+        assert compile_expression(source)({"name": "x", "csv": "a,b,c", "commas": "," * 4000}) is None
+
+    def test_modulo_takes_numbers(self):
+        assert compile_expression("n % 3")({"n": 7}) == 1
+        assert compile_expression("'%s' % n")({"n": 7}) is None
+
+    def test_template_output_is_bounded(self):
+        assert compile_template("{name}-{name}")({"name": "x" * 6000}) is None
+        assert compile_template("{name}-{name}")({"name": "x"}) == "x-x"
+
+    def test_template(self):
+        render = compile_template("https://{org}.example.com/{lower(info.title)}")
+        assert render({"org": "acme", "info": {"title": "API"}}) == "https://acme.example.com/api"
+        assert render({}) == "https://.example.com/"
+
+    def test_constant_template(self):
+        assert compile_template("static")({}) == "static"
+
+
+class TestMappingIntegration:
+
+    FIELDS = [
+        {"from": "title", "to": "name"},
+        {"to": "slug", "expr": "lower(replace(title, ' ', '-'))"},
+        {"to": "url", "template": "/apis/{title}"},
+        {"to": "owner", "expr": "owner.login"},
+    ]
+
+    @pytest.mark.parametrize("compact", [True, False])
+    def test_computed_fields(self, compact):
+        c = _collector(self.FIELDS, compact=compact)
+        items = [{"title": "My API", "owner": {"login": "jo"}}, {"title": "Other"}]
+        if compact:
+            result = list(c._transform_compact(items))
+        else:
+            result = [c._transform(i) for i in items]
+        assert result == [
+            {"name": "My API", "slug": "my-api", "url": "/apis/My API", "owner": "jo"},
+            {"name": "Other", "slug": "other", "url": "/apis/Other"},
+        ]
+
+    def test_invalid_expression_fails_at_config_load(self):
+        with pytest.raises(ValueError, match="test-source.*'slug'"):
+            _collector([{"to": "slug", "expr": "exec('x')"}])
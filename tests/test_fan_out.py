@@ -0,0 +1,174 @@
+"""Tests for fan-out connectors (templated endpoint over a list of values)."""
+
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from collectors.generic_collector import GenericCollector
+from config.loader import ConnectorConfig
+from utils.deadline import Deadline
+
+
+def _source(fan_out, mapping=None, **conn):
+    data = {
+        "name": "quay-teams",
+        "target_key": "teams",
+        "connection": {
+            "host": "https://quay.example.com",
+            "auth_type": "none",
+            "endpoint": "/api/v1/organization/{org}/teams",
+            **conn,
+        },
+        "fan_out": fan_out,
+    }
+    if mapping:
+        data["mapping"] = {"replace_object": "teams", "fields": mapping}
+    return ConnectorConfig(data)
+
+
+def _collector(source, responses, delay=0.0):
+    collector = GenericCollector.__new__(GenericCollector)
+    collector.source = source
+    collector.shared = None
+    collector.shared_response = False
+    collector.deadline = Deadline()
+    calls = []
+    active = [0, 0]
+    lock = threading.Lock()
+
+    def fake_fetch(endpoint=None, body=None):
+        with lock:
+            calls.append(endpoint if body is None else (endpoint, body))
+            active[0] += 1
+            active[1] = max(active[1], active[0])
+        time.sleep(delay)
+        with lock:
+            active[0] -= 1
+        result = responses(endpoint, body) if callable(responses) else responses[endpoint]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    collector._fetch = fake_fetch
+    return collector, calls, active
+
+
+class TestFanOutConfig:
+
+    def test_param_must_appear_in_endpoint(self):
+        with pytest.raises(ValueError, match="does not appear"):
+            _source({"param": "cluster", "values": ["a"]})
+
+    def test_values_must_be_scalars(self):
+        with pytest.raises(ValueError, match="fan_out.values"):
+            _source({"param": "org", "values": [{"a": 1}]})
+
+    def test_endpoint_values_are_quoted(self):
+        source = _source({"param": "org", "values": ["a b/c"]})
+        assert source.fan_out.endpoint_for(source.endpoint, "a b/c") == "/api/v1/organization/a%20b%2Fc/teams"
+
+    def test_inject_true_uses_param_name(self):
+        assert _source({"param": "org", "values": ["a"], "inject": True}).fan_out.inject == "org"
+
+    def test_injected_field_is_added_to_mapping(self):
+        source = _source({"param": "org", "values": ["a"], "inject": "org"}, mapping=[{"from": "name", "to": "name"}])
+        assert {"from": "org", "to": "org"} in source.mapping_fields
+
+
+class TestFanOutCollect:
+
+    RESPONSES = {
+        "/api/v1/organization/acme/teams": {"teams": [], "items": [{"name": "owners"}, {"name": "devs"}]},
+        "/api/v1/organization/infra/teams": [{"name": "ops"}],
+        "/api/v1/organization/empty/teams": [],
+    }
+
+    def test_items_concatenated_in_value_order_with_inject(self):
+        source = _source({"param": "org", "values": ["acme", "infra", "empty"], "inject": True})
+        collector, calls, _ = _collector(source, self.RESPONSES)
+        assert collector.collect() == [
+            {"name": "owners", "org": "acme"},
+            {"name": "devs", "org": "acme"},
+            {"name": "ops", "org": "infra"},
+        ]
+        assert sorted(calls) == sorted(self.RESPONSES)
+
+    def test_inject_is_mapped(self):
+        source = _source(
+            {"param": "org", "values": ["acme", "infra"], "inject": "organization"},
+            mapping=[{"from": "name", "to": "team"}],
+        )
+        collector, _, _ = _collector(source, self.RESPONSES)
+        assert list(collector.collect()) == [
+            {"team": "owners", "organization": "acme"},
+            {"team": "devs", "organization": "acme"},
+            {"team": "ops", "organization": "infra"},
+        ]
+
+    def test_response_items_are_not_modified(self):
+        responses = {"/api/v1/organization/acme/teams": [{"name": "owners"}]}
+        source = _source({"param": "org", "values": ["acme"], "inject": True})
+        collector, _, _ = _collector(source, responses)
+        collector.collect()
+        assert responses["/api/v1/organization/acme/teams"] == [{"name": "owners"}]
+
+    def test_concurrency_is_bounded(self):
+        values = [f"o{i}" for i in range(8)]
+        responses = {f"/api/v1/organization/{v}/teams": [{"name": v}] for v in values}
+        source = _source({"param": "org", "values": values, "max_workers": 3})
+        collector, calls, active = _collector(source, responses, delay=0.02)
+        assert [i["name"] for i in collector.collect()] == values
+        assert len(calls) == 8
+        assert 1 < active[1] <= 3
+
+    def test_failing_sub_request_fails_connector(self):
+        responses = dict(self.RESPONSES)
+        responses["/api/v1/organization/infra/teams"] = RuntimeError("HTTP 500")
+        source = _source({"param": "org", "values": ["acme", "infra"]})
+        collector, _, _ = _collector(source, responses)
+        assert collector.collect() == []
+
+
+class TestBatches:
+
+    def _bulk(self, **fan_out):
+        return _source(
+            {"param": "ids", "values": list(range(1, 6)), "batch_size": 2, **fan_out},
+            endpoint="/api/v1/lookup", method="POST", body={"query": {"ids": "{ids}"}, "source": "seeder"},
+        )
+
+    def test_values_are_split_into_batches(self):
+        fan_out = self._bulk().fan_out
+        assert fan_out.requests_for([1, 2, 3, 4, 5]) == [[1, 2], [3, 4], [5]]
+        assert fan_out.body_for({"query": {"ids": "{ids}"}, "n": "ids={ids}"}, [3, 4]) == {
+            "query": {"ids": [3, 4]}, "n": "ids=3,4",
+        }
+
+    def test_batched_get_joins_values_in_endpoint(self):
+        source = _source({"param": "ids", "values": ["a b", "c"], "batch_size": 10}, endpoint="/lookup?ids={ids}")
+        assert source.fan_out.endpoint_for(source.endpoint, ["a b", "c"]) == "/lookup?ids=a%20b,c"
+
+    def test_invalid(self):
+        with pytest.raises(ValueError, match="inject cannot be combined"):
+            self._bulk(inject=True)
+        with pytest.raises(ValueError, match="does not appear"):
+            _source({"param": "ids", "values": [1]}, endpoint="/lookup", method="POST", body={"ids": []})
+        with pytest.raises(ValueError, match="requires method POST"):
+            _source({"param": "org", "values": ["a"]}, body={"x": 1})
+        with pytest.raises(ValueError, match="GET\\|POST"):
+            _source({"param": "org", "values": ["a"]}, method="DELETE")
+
+    def test_batches_are_posted_concurrently_and_merged_in_order(self):
+        """5 IDs in Batches zu 2: 3 POSTs statt 5 GETs, Ergebnis in Wertreihenfolge."""
+        def respond(endpoint, body):
+            return {"data": [{"id": i, "name": f"item-{i}"} for i in body["query"]["ids"]]}
+
+        collector, calls, active = _collector(self._bulk(), respond, delay=0.02)
+        assert [item["id"] for item in collector.collect()] == [1, 2, 3, 4, 5]
+        assert sorted(body["query"]["ids"] for _, body in calls) == [[1, 2], [3, 4], [5]]
+        assert active[1] > 1
@@ -0,0 +1,120 @@
+"""Tests for the content-addressed history of written outputs."""
+
+import os
+import sys
+
+import pytest
+import yaml
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from collectors.records import CompactSection
+from config.loader import Config
+from main import history_main, main
+from output.history import HistoryStore
+import gateway.client as client_mod
+
+
+RUN_1 = {
+    "teams": [{"organization": "acme", "team_name": "owners"}, {"organization": "acme", "team_name": "devs"}],
+    "organizations": [{"name": "acme", "email": "ops@acme.example"}],
+}
+RUN_2 = {
+    "teams": [{"organization": "acme", "team_name": "owners"}, {"organization": "acme", "team_name": "ops"}],
+    "organizations": [{"name": "acme", "email": "ops@acme.example"}],
+}
+
+
+def _count(store, table):
+    return store._db.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+class TestHistoryStore:
+
+    def test_round_trip_keeps_order(self, tmp_path):
+        with HistoryStore(tmp_path / "h.sqlite") as store:
+            item = {"name": "x", "a": 1, "z": [1, 2]}
+            run_id = store.record("quay", {"b": [item, {"name": "y"}], "a": []})
+            assert store.load(run_id) == {"b": [item, {"name": "y"}], "a": []}
+            assert list(store.load(run_id)["b"][0]) == ["name", "a", "z"]
+
+    def test_items_and_sections_are_stored_once(self, tmp_path):
+        with HistoryStore(tmp_path / "h.sqlite") as store:
+            store.record("quay", RUN_1)
+            store.record("quay", RUN_1)
+            assert (_count(store, "objects"), _count(store, "sections")) == (3, 2)
+            store.record("quay", RUN_2)
+            assert (_count(store, "objects"), _count(store, "sections")) == (4, 3)
+            assert [r.id for r in store.runs("quay")] == [3, 2, 1]
+
+    def test_compact_sections(self, tmp_path):
+        section = CompactSection(["organization", "team_name"])
+        for team in RUN_1["teams"]:
+            section.append_row([team["organization"], team["team_name"]])
+        with HistoryStore(tmp_path / "h.sqlite") as store:
+            assert store.load(store.record("quay", {"teams": section})) == {"teams": RUN_1["teams"]}
+
+    def test_diff_between_runs(self, tmp_path):
+        with HistoryStore(tmp_path / "h.sqlite") as store:
+            old, new = store.record("quay", RUN_1), store.record("quay", RUN_2)
+            keys = {"teams": ("organization", "team_name")}
+            assert sorted(store.diff(old, new, keys)) == [
+                "  + [teams] added: acme/ops",
+                "  - [teams] removed: acme/devs",
+            ]
+            assert store.diff(old, old) == []
+
+    def test_unknown_run(self, tmp_path):
+        with HistoryStore(tmp_path / "h.sqlite") as store:
+            with pytest.raises(KeyError, match="run 7"):
+                store.load(7)
+
+    def test_prune_keeps_newest_runs_and_collects_garbage(self, tmp_path):
+        with HistoryStore(tmp_path / "h.sqlite", keep=2) as store:
+            for i in range(4):
+                store.record("quay", {"teams": [{"team_name": f"t{i}"}]})
+            assert [r.id for r in store.runs("quay")] == [4, 3]
+            assert _count(store, "objects") == 2
+            assert store.load(3) == {"teams": [{"team_name": "t2"}]}
+
+
+def _settings(tmp_path):
+    fixture = yaml.safe_load(open(os.path.join(os.path.dirname(__file__), "fixtures", "settings.yaml")).read())
+    fixture["output"] = {"file": str(tmp_path / "inputs.yaml")}
+    fixture["history"] = {"enabled": True, "path": str(tmp_path / "history.sqlite")}
+    path = tmp_path / "settings.yaml"
+    path.write_text(yaml.safe_dump(fixture, sort_keys=False))
+    return path
+
+
+def test_runs_are_recorded_and_restored(tmp_path, monkeypatch, capsys):
+    """Zwei Läufe aufzeichnen, Lauf 1 ohne API-Zugriff wiederherstellen."""
+    monkeypatch.setenv("SEEDER_CONFIG_FILE", str(_settings(tmp_path)))
+    monkeypatch.delenv("OUTPUT_FILE", raising=False)
+    monkeypatch.delenv("HISTORY_ENABLED", raising=False)
+    titles = iter(["First", "First", "Second"])
+
+    def fake_get(self, endpoint, **kwargs):
+        return {"1forge.com": {"preferred": "1", "versions": {"1": {"info": {"title": next(titles)}}}}}
+
+    monkeypatch.setattr(client_mod.ApiClient, "get", fake_get)
+    for _ in range(3):
+        Config.reset()
+        main()
+    output = tmp_path / "inputs.yaml"
+    assert yaml.safe_load(output.read_text())["apis"][0]["title"] == "Second"
+
+    with HistoryStore(tmp_path / "history.sqlite") as store:
+        assert [r.id for r in store.runs()] == [2, 1]  # the unchanged second run is not recorded
+
+    def no_api(self, endpoint, **kwargs):
+        pytest.fail("restore must not call any API")
+
+    monkeypatch.setattr(client_mod.ApiClient, "get", no_api)
+    Config.reset()
+    capsys.readouterr()
+    assert history_main(["diff", "1", "2"]) == 0
+    assert "[apis] changed: __idx_0 (title)" in capsys.readouterr().out
+    assert history_main(["restore", "1"]) == 0
+    assert yaml.safe_load(output.read_text())["apis"][0]["title"] == "First"
+    assert history_main(["restore", "9"]) == 1
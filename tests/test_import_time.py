@@ -0,0 +1,78 @@
+"""Import-time budget: startup must not pull in heavy modules before they are needed."""
+
+import os
+import subprocess
+import sys
+
+SRC = os.path.join(os.path.dirname(__file__), "..", "src")
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "settings.yaml")
+
+# Import time of everything main() loads before its first connector runs, in milliseconds;
+# override for slow CI machines.
+BUDGET_MS = float(os.getenv("SEEDER_IMPORT_BUDGET_MS", "250"))
+HEAVY_MODULES = {"requests", "urllib3", "pydantic"}
+# Modules of features that are off in the fixture config; reading the config must not load them.
+OPTIONAL_FEATURE_MODULES = {"sqlite3", "output.history", "collectors.sharding", "gateway.oauth", "config.connector_files"}
+
+# Runs main() with the fixture config and stops the process when the first connector starts collecting.
+UNTIL_FIRST_CONNECTOR = (
+    "import os\n"
+    "import main\n"
+    "from collectors.generic_collector import GenericCollector\n"
+    "GenericCollector.collect = lambda self: os._exit(0)\n"
+    "main.main([])\n"
+)
+
+
+def _importtime(code, **env):
+    """Run code under `python -X importtime`, return ({module: cumulative_us}, top-level total in us)."""
+    env = dict(os.environ, SEEDER_CONFIG_FILE=FIXTURE, PYTHONDONTWRITEBYTECODE="1", **env)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=SRC, env=env, capture_output=True, text=True, check=True,
+    )
+    timings, total = {}, 0
+    lines = result.stderr.splitlines()
+    # Imports before `site` finished belong to the interpreter and its .pth hooks.
+    started = not any(line.endswith("| site") for line in lines)
+    for line in lines:
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not started:
+            started = name.strip() == "site"
+            continue
+        timings[name.strip()] = int(cumulative)
+        if len(name) - len(name.lstrip()) == 1:
+            total += int(cumulative)
+    return timings, total
+
+
+def test_import_main_is_lazy():
+    timings, _ = _importtime("import main")
+    assert not HEAVY_MODULES & set(timings)
+    assert "yaml" not in timings
+
+
+def test_startup_until_first_connector_is_within_budget(tmp_path):
+    timings, total = _importtime(UNTIL_FIRST_CONNECTOR, SEEDER_CACHE_DIR=str(tmp_path))
+    assert {"config.loader", "collectors.generic_collector", "output.writers"} <= set(timings)
+    assert total / 1000 < BUDGET_MS
+    assert not HEAVY_MODULES & set(timings)
+
+
+def test_config_and_collectors_do_not_import_requests():
+    timings, _ = _importtime(
+        "import main\n"
+        "from config.loader import Config\n"
+        "from collectors.generic_collector import GenericCollector\n"
+        "GenericCollector(Config().sources[0])\n"
+    )
+    assert "yaml" in timings
+    assert not HEAVY_MODULES & set(timings)
+
+
+def test_config_does_not_load_disabled_features():
+    timings, _ = _importtime("from config.loader import Config\nConfig()\n")
+    assert "config.loader" in timings
+    assert not OPTIONAL_FEATURE_MODULES & set(timings)
@@ -0,0 +1,186 @@
+"""Tests for latency history, adaptive timeouts and hedged GETs."""
+
+import os
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from config.loader import ConnectorConfig
+from gateway.client import ApiClient
+from gateway.latency import MAX_SAMPLES, MIN_SAMPLES, LatencyHistory
+from utils.deadline import Deadline
+
+KEY = "https://x.example.com/api"
+
+
+def _source(**conn):
+    return ConnectorConfig({
+        "name": "s",
+        "target_key": "items",
+        "connection": {"host": "https://x.example.com", "auth_type": "none", "endpoint": "/api", **conn},
+    })
+
+
+def _primed(seconds, n=100):
+    history = LatencyHistory()
+    for _ in range(n):
+        history.record(KEY, seconds)
+    return history
+
+
+class _FakeResponse:
+    def __init__(self, body, delay=0.0, status=200):
+        self.body, self.delay, self.status_code = body, delay, status
+        self.encoding = "utf-8"
+        self.raw = self
+        self.headers = {"Content-Type": "application/json"}
+
+    def stream(self, size, decode_content=True):
+        time.sleep(self.delay)
+        yield self.body
+
+    def raise_for_status(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class TestLatencyHistory:
+
+    def test_no_quantile_without_enough_samples(self):
+        assert _primed(0.2, n=MIN_SAMPLES - 1).quantile(KEY, 0.99) is None
+
+    def test_quantiles(self):
+        history = LatencyHistory()
+        for _ in range(95):
+            history.record(KEY, 0.1)
+        for _ in range(5):
+            history.record(KEY, 2.0)
+        assert 0.1 <= history.quantile(KEY, 0.95) < 0.13
+        assert 2.0 <= history.quantile(KEY, 0.99) < 2.5
+
+    def test_old_samples_fade_out(self):
+        history = _primed(0.1, n=MAX_SAMPLES)
+        history.record(KEY, 0.1)
+        assert history.samples(KEY) <= MAX_SAMPLES // 2 + 1
+
+    def test_persisted_round_trip(self, tmp_path):
+        path = tmp_path / "latency.json"
+        history = _primed(0.3)
+        history.path = path
+        history.save()
+        assert LatencyHistory.load(path).quantile(KEY, 0.5) == history.quantile(KEY, 0.5)
+
+    def test_unreadable_file_is_ignored(self, tmp_path):
+        path = tmp_path / "latency.json"
+        path.write_text("{not json")
+        assert LatencyHistory.load(path).samples(KEY) == 0
+
+
+class TestAdaptiveTimeout:
+
+    def test_read_timeout_follows_history(self):
+        client = ApiClient(_source(timeout=60, adaptive_timeout={"multiplier": 3, "min": 0.5}), latency=_primed(0.4))
+        connect, read = client.timeout
+        assert connect == 60
+        assert 1.2 <= read <= 1.6
+
+    def test_minimum_and_maximum(self):
+        fast = ApiClient(_source(timeout=60, adaptive_timeout={"min": 2}), latency=_primed(0.01))
+        assert fast.timeout[1] == 2
+        slow = ApiClient(_source(timeout=60, adaptive_timeout={"max": 200}), latency=_primed(100))
+        assert slow.timeout[1] == 200
+
+    def test_slow_endpoint_may_exceed_the_configured_timeout(self):
+        client = ApiClient(_source(timeout=60, adaptive_timeout=True), latency=_primed(30))
+        assert 90 <= client.timeout[1] <= 120
+
+    def test_maximum_is_capped_by_the_deadline(self):
+        client = ApiClient(
+            _source(timeout=60, adaptive_timeout=True), latency=_primed(100), deadline=Deadline(10),
+        )
+        assert client.timeout[1] <= 10
+
+    def test_configured_timeout_without_history(self):
+        client = ApiClient(_source(timeout=60, adaptive_timeout=True), latency=LatencyHistory())
+        assert client.timeout == (60, 60)
+
+    def test_invalid_settings(self):
+        with pytest.raises(ValueError, match="adaptive_timeout"):
+            _source(adaptive_timeout={"quantile": 2})
+        with pytest.raises(ValueError, match="min <= max"):
+            _source(adaptive_timeout={"min": 10, "max": 5})
+
+    def test_successful_requests_are_recorded(self):
+        history = LatencyHistory()
+        client = ApiClient(_source(), latency=history)
+        client._session = SimpleNamespace(get=lambda **kw: _FakeResponse(b'{"data": []}'))
+        assert client.get("/api") == {"data": []}
+        assert history.samples(KEY) == 1
+
+
+class TestHedging:
+
+    def _client(self, delays):
+        history = _primed(0.02)
+        client = ApiClient(_source(hedge=True), latency=history)
+        calls = []
+        lock = threading.Lock()
+
+        def get(**kwargs):
+            with lock:
+                n = len(calls)
+                calls.append(n)
+            return _FakeResponse(f'{{"attempt": {n}}}'.encode(), delay=delays[n])
+
+        client._session = SimpleNamespace(get=get)
+        client.hedge_sessions = []
+
+        def new_session():
+            session = SimpleNamespace(get=get, closed=False)
+            session.close = lambda: setattr(session, "closed", True)
+            client.hedge_sessions.append(session)
+            return session
+
+        client._new_session = new_session
+        return client, calls, history
+
+    def test_fast_request_is_not_hedged(self):
+        client, calls, history = self._client([0.0, 0.0])
+        assert client.get("/api") == {"attempt": 0}
+        assert calls == [0] and history.hedged == 0
+        assert client.hedge_sessions == []
+
+    def test_stalled_request_is_hedged_and_hedge_wins(self):
+        client, calls, history = self._client([1.0, 0.0])
+        start = time.monotonic()
+        assert client.get("/api") == {"attempt": 1}
+        assert time.monotonic() - start < 0.5
+        assert calls == [0, 1]
+        assert (history.hedged, history.hedge_wins) == (1, 1)
+        assert len(client.hedge_sessions) == 1 and client.hedge_sessions[0].closed
+
+    def test_post_is_never_hedged(self):
+        client = ApiClient(_source(hedge=True), latency=_primed(0.02))
+        posts = []
+
+        def post(**kwargs):
+            posts.append(kwargs["json"])
+            return _FakeResponse(b'{"ok": true}', delay=0.2)
+
+        client._session = SimpleNamespace(post=post, get=lambda **kw: pytest.fail("POST sent as GET"))
+        assert client.post("/api", {"ids": [1, 2]}) == {"ok": True}
+        assert posts == [{"ids": [1, 2]}] and client.latency.hedged == 0
+
+    def test_no_hedge_without_history(self):
+        client = ApiClient(_source(hedge=True), latency=LatencyHistory())
+        assert client._hedge_delay() is None
@@ -0,0 +1,66 @@
+"""Tests for the lazy, level-gated logger."""
+
+import io
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from utils.logger import Logger
+
+
+@pytest.fixture
+def stream():
+    buf = io.StringIO()
+    saved = (Logger.DEBUG_ENABLED, Logger.FORMAT, Logger.STREAM)
+    Logger.configure(False, fmt="text", stream=buf)
+    yield buf
+    Logger.DEBUG_ENABLED, Logger.FORMAT, Logger.STREAM = saved
+
+
+def test_debug_is_not_formatted_when_disabled(stream):
+    calls = []
+    Logger.debug("T", lambda: calls.append(1) or "expensive")
+    Logger.debug("T", "value=%s", object())
+    assert calls == []
+    assert stream.getvalue() == ""
+
+
+def test_lazy_message_when_enabled(stream):
+    Logger.configure(True)
+    Logger.debug("T", lambda: "computed")
+    Logger.info("T", "a=%s b=%d", "x", 2)
+    lines = stream.getvalue().splitlines()
+    assert "[DEBUG] [T] computed" in lines[0]
+    assert "[INFO] [T] a=x b=2" in lines[1]
+
+
+def test_percent_without_args_is_literal(stream):
+    Logger.info("T", "100% done")
+    assert "100% done" in stream.getvalue()
+
+
+def test_mismatched_args_are_appended(stream):
+    Logger.info("T", "no placeholders", 42)
+    Logger.info("T", "%d items", "many")
+    lines = stream.getvalue().splitlines()
+    assert "[INFO] [T] no placeholders (42,)" in lines[0]
+    assert "[INFO] [T] %d items ('many',)" in lines[1]
+
+
+def test_json_lines_format(stream):
+    Logger.configure(False, fmt="json")
+    Logger.warn("Config", "bad %s", "value")
+    record = json.loads(stream.getvalue())
+    assert record["level"] == "WARN"
+    assert record["logger"] == "Config"
+    assert record["msg"] == "bad value"
+    assert "ts" in record
+
+
+def test_invalid_format_fails():
+    with pytest.raises(ValueError):
+        Logger.configure(False, fmt="xml")
@@ -0,0 +1,164 @@
+"""Tests for OAuth2 client-credentials tokens shared across connectors."""
+
+import json
+import os
+import stat
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from config.loader import ConnectorConfig
+from gateway.client import ApiClient
+from gateway.oauth import TokenProvider
+
+TOKEN_URL = "https://auth.example.com/oauth/token"
+
+
+def _source(name="s", **oauth2):
+    return ConnectorConfig({
+        "name": name,
+        "target_key": "items",
+        "connection": {
+            "host": "https://api.example.com",
+            "endpoint": "/items",
+            "auth_type": "oauth2_client_credentials",
+            "oauth2": {"token_url": TOKEN_URL, "client_id": "seeder", "client_secret_env": "OAUTH_SECRET",
+                       "scope": "read", **oauth2},
+        },
+    })
+
+
+class _Response:
+    def __init__(self, payload=None, status=200, body=b"{}"):
+        self.payload, self.status_code, self.body = payload, status, body
+        self.encoding = "utf-8"
+        self.raw = self
+        self.headers = {"Content-Type": "application/json"}
+        self.text = str(payload)
+
+    def json(self):
+        return self.payload
+
+    def stream(self, size, decode_content=True):
+        yield self.body
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"HTTP {self.status_code}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+@pytest.fixture
+def token_endpoint(monkeypatch):
+    """Ein Token-Endpunkt, der jede Anfrage zählt und fortlaufende Tokens ausgibt."""
+    monkeypatch.setenv("OAUTH_SECRET", "s3cret")
+    calls, expires_in = [], [3600]
+    lock = threading.Lock()
+
+    def post(url, data=None, auth=None, **kw):
+        time.sleep(0.05)
+        with lock:
+            calls.append({"url": url, "data": data, "auth": auth})
+            return _Response({"access_token": f"tok-{len(calls)}", "expires_in": expires_in[0]})
+
+    monkeypatch.setattr(requests, "post", post)
+    return SimpleNamespace(calls=calls, expires_in=expires_in)
+
+
+class TestConfig:
+
+    def test_settings_are_parsed(self):
+        settings = _source(scope=["read", "write"]).oauth2
+        assert settings.token_url == TOKEN_URL and settings.scope == "read write"
+
+    def test_client_secret_env_is_required(self):
+        with pytest.raises(ValueError, match="client_secret_env"):
+            _source(client_secret_env="")
+
+    def test_oauth2_block_is_required(self):
+        with pytest.raises(ValueError, match="connection.oauth2"):
+            ConnectorConfig({"name": "s", "target_key": "x", "connection": {
+                "host": "https://api.example.com", "auth_type": "oauth2_client_credentials"}})
+
+
+class TestTokenProvider:
+
+    def test_concurrent_requests_share_one_fetch(self, token_endpoint):
+        provider = TokenProvider()
+        settings = _source().oauth2
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            tokens = list(pool.map(lambda _: provider.token(settings), range(16)))
+        assert set(tokens) == {"tok-1"} and len(token_endpoint.calls) == 1
+        call = token_endpoint.calls[0]
+        assert call["auth"] == ("seeder", "s3cret")
+        assert call["data"] == {"grant_type": "client_credentials", "scope": "read"}
+
+    def test_different_scopes_get_different_tokens(self, token_endpoint):
+        provider = TokenProvider()
+        assert provider.token(_source().oauth2) != provider.token(_source(scope="write").oauth2)
+
+    def test_token_is_refreshed_shortly_before_expiry(self, token_endpoint):
+        token_endpoint.expires_in[0] = 0.2  # refreshed after half its lifetime
+        provider = TokenProvider()
+        settings = _source().oauth2
+        assert provider.token(settings) == provider.token(settings) == "tok-1"
+        time.sleep(0.15)
+        assert provider.token(settings) == "tok-2"
+
+    def test_disk_cache_is_reused_by_the_next_run(self, token_endpoint, tmp_path):
+        path = tmp_path / "oauth_tokens.json"
+        TokenProvider(path).token(_source().oauth2)
+        assert stat.S_IMODE(path.stat().st_mode) == 0o600
+        assert TokenProvider(path).token(_source().oauth2) == "tok-1"
+        assert len(token_endpoint.calls) == 1
+
+    def test_rejected_token_is_removed_from_the_disk_cache(self, token_endpoint, tmp_path):
+        path = tmp_path / "oauth_tokens.json"
+        provider = TokenProvider(path)
+        provider.invalidate(_source().oauth2, provider.token(_source().oauth2))
+        assert json.loads(path.read_text()) == {}
+        assert TokenProvider(path).token(_source().oauth2) == "tok-2"
+
+    def test_rotated_secret_gets_a_new_token(self, token_endpoint, monkeypatch, tmp_path):
+        path = tmp_path / "oauth_tokens.json"
+        assert TokenProvider(path).token(_source().oauth2) == "tok-1"
+        monkeypatch.setenv("OAUTH_SECRET", "rotated")
+        assert TokenProvider(path).token(_source().oauth2) == "tok-2"
+        assert token_endpoint.calls[-1]["auth"] == ("seeder", "rotated")
+        assert "rotated" not in path.read_text()
+
+    def test_client_secret_post(self, token_endpoint):
+        TokenProvider().token(_source(auth_method="client_secret_post").oauth2)
+        call = token_endpoint.calls[0]
+        assert call["auth"] is None and call["data"]["client_secret"] == "s3cret"
+
+
+class TestApiClient:
+
+    def test_connectors_share_the_token_and_retry_once_on_401(self, token_endpoint):
+        provider = TokenProvider()
+        seen = []
+
+        def get(headers=None, **kw):
+            seen.append(headers["Authorization"])
+            return _Response(status=401 if len(seen) == 2 else 200, body=b'{"data": []}')
+
+        clients = [ApiClient(_source(name), tokens=provider) for name in ("a", "b")]
+        for client in clients:
+            client._session = SimpleNamespace(get=get)
+            client.get("/items")
+        assert seen == ["Bearer tok-1", "Bearer tok-1", "Bearer tok-2"]
+        assert clients[0].identity_headers == clients[1].identity_headers
+        assert "tok" not in str(clients[0].identity_headers)
@@ -0,0 +1,117 @@
+"""Tests for canonical section ordering and byte-stable output."""
+
+import os
+import random
+import stat
+import sys
+from collections.abc import Iterator
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from output.base_writer import apply_order
+from output.json_writer import JsonWriter
+from output.ordering import canonical_order, normalize_order_by
+from output.yaml_writer import YamlWriter
+
+
+def _members(n):
+    return [
+        {"organization": f"org{i % 7}", "team_name": f"team{i % 13}", "member_name": f"user{i}"}
+        for i in range(n)
+    ]
+
+
+class TestCanonicalOrder:
+    FIELDS = ("organization", "team_name", "member_name")
+
+    def test_sorted_by_fields(self):
+        items = [{"name": "b"}, {"name": "a"}, {"name": "c"}]
+        assert [i["name"] for i in canonical_order(items, ["name"])] == ["a", "b", "c"]
+
+    def test_ties_broken_by_content(self):
+        items = [{"name": "a", "v": 2}, {"name": "a", "v": 1}]
+        assert list(canonical_order(items, ["name"])) == [{"name": "a", "v": 1}, {"name": "a", "v": 2}]
+
+    def test_mixed_types_and_missing_fields(self):
+        items = [{"name": "x"}, {"name": 3}, {}, {"name": None}, {"name": {"a": 1}}]
+        ordered = list(canonical_order(items, ["name"]))
+        assert len(ordered) == 5
+        assert ordered[-1] == {"name": {"a": 1}}
+
+    def test_external_merge_sort_matches_in_memory(self):
+        items = _members(2_000)
+        random.Random(1).shuffle(items)
+        in_memory = list(canonical_order(items, self.FIELDS))
+        external = list(canonical_order(items, self.FIELDS, max_in_memory=128))
+        assert external == in_memory
+
+    def test_normalize_identity_order(self):
+        order = normalize_order_by(
+            {"team_members": "identity", "notifiers": "identity", "apis": ["provider", "id"]},
+            {"team_members": ("organization", "team_name", "member_name")},
+        )
+        assert order == {
+            "team_members": ("organization", "team_name", "member_name"),
+            "notifiers": ("name",),
+            "apis": ("provider", "id"),
+        }
+
+
+class TestByteStableOutput:
+    ORDER = {"team_members": ("organization", "team_name", "member_name")}
+
+    def test_shuffled_input_is_byte_identical(self, tmp_path):
+        items = _members(500)
+        out1, out2 = tmp_path / "a.yaml", tmp_path / "b.yaml"
+        YamlWriter.write(out1, {"team_members": items}, order_by=self.ORDER)
+        shuffled = list(items)
+        random.Random(2).shuffle(shuffled)
+        YamlWriter.write(out2, {"team_members": shuffled}, order_by=self.ORDER, max_in_memory=64)
+        assert out1.read_bytes() == out2.read_bytes()
+
+    def test_identical_output_skips_parse(self, tmp_path, monkeypatch):
+        out = tmp_path / "inputs.yaml"
+        data = {"team_members": _members(50)}
+        assert YamlWriter.write(out, data, order_by=self.ORDER) is True
+
+        def fail(_path):
+            raise AssertionError("existing output must not be parsed when bytes are identical")
+
+        monkeypatch.setattr(YamlWriter, "load_existing", staticmethod(fail))
+        shuffled = list(reversed(data["team_members"]))
+        assert YamlWriter.write(out, {"team_members": shuffled}, order_by=self.ORDER) is False
+
+    def test_no_temp_files_left_behind(self, tmp_path):
+        out = tmp_path / "inputs.yaml"
+        YamlWriter.write(out, {"notifiers": [{"name": "A"}]})
+        YamlWriter.write(out, {"notifiers": [{"name": "A"}]})
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["inputs.yaml"]
+
+    def test_ordered_sections_are_streamed(self, tmp_path):
+        ordered = apply_order({"team_members": _members(10), "other": [1]}, self.ORDER)
+        assert isinstance(ordered["team_members"], Iterator) and ordered["other"] == [1]
+
+        items = _members(300)
+        out1, out2 = tmp_path / "a.json", tmp_path / "b.json"
+        JsonWriter.write(out1, {"team_members": items, "empty": []}, order_by=self.ORDER)
+        JsonWriter.write(out2, {"team_members": list(reversed(items)), "empty": []}, order_by=self.ORDER,
+                         max_in_memory=32)
+        assert out1.read_bytes() == out2.read_bytes()
+        assert JsonWriter.load_existing(out1)["empty"] == []
+
+
+class TestFileMode:
+
+    def test_rewrite_keeps_the_existing_mode(self, tmp_path):
+        out = tmp_path / "inputs.yaml"
+        YamlWriter.write(out, {"notifiers": [{"name": "A"}]})
+        out.chmod(0o644)
+        assert YamlWriter.write(out, {"notifiers": [{"name": "B"}]}) is True
+        assert stat.S_IMODE(out.stat().st_mode) == 0o644
+
+    def test_new_file_follows_the_umask(self, tmp_path):
+        umask = os.umask(0o027)
+        os.umask(umask)
+        out = tmp_path / "inputs.yaml"
+        YamlWriter.write(out, {"notifiers": [{"name": "A"}]})
+        assert stat.S_IMODE(out.stat().st_mode) == 0o666 & ~umask
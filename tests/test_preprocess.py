@@ -0,0 +1,126 @@
+"""Tests fuer die Preprocessing-Pipeline (collectors/preprocess.py)."""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from collectors.generic_collector import GenericCollector
+from collectors.preprocess import STEPS, compile_pipeline, parse_steps
+from collectors.records import CompactSection
+from config.loader import ConnectorConfig
+
+
+def _pipeline(*steps):
+    return compile_pipeline(parse_steps({"preprocess": list(steps)}))
+
+
+def _collector(options, mapping=None, defaults=None):
+    source = ConnectorConfig({
+        "name": "test-source",
+        "target_key": "items",
+        "connection": {"host": "https://example.com", "auth_type": "none", "endpoint": "/api"},
+        "mapping": {"replace_object": "items", "fields": mapping} if mapping else {},
+        "defaults": defaults or {},
+        "options": options,
+    })
+    collector = GenericCollector.__new__(GenericCollector)
+    collector.source = source
+    collector.shared = None
+    collector.shared_response = False
+    return collector
+
+
+class TestSteps:
+
+    def test_registry_contains_builtin_steps(self):
+        for name in ("flatten", "flatten_preferred_version", "rename", "drop", "explode", "coerce"):
+            assert name in STEPS
+
+    def test_rename_drop_coerce_in_one_pass(self):
+        run = _pipeline(
+            {"step": "rename", "fields": {"title": "name"}},
+            {"step": "drop", "fields": ["internal"]},
+            {"step": "coerce", "fields": {"port": "int", "enabled": "bool"}},
+        )
+        out = run({"title": "a", "internal": 1, "port": "8080", "enabled": "yes"})
+        assert out == [{"name": "a", "port": 8080, "enabled": True}]
+
+    def test_coerce_keeps_unconvertible_values(self):
+        run = _pipeline({"step": "coerce", "fields": {"port": "int"}})
+        assert run({"port": "n/a"}) == [{"port": "n/a"}]
+
+    def test_flatten_with_prefix(self):
+        run = _pipeline({"step": "flatten", "field": "info", "prefix": "info_"})
+        assert run({"id": 1, "info": {"a": 1, "b": 2}}) == [{"id": 1, "info_a": 1, "info_b": 2}]
+
+    def test_explode_into_field(self):
+        run = _pipeline({"step": "explode", "field": "members", "into": "member"})
+        out = run({"team": "x", "members": ["a", "b"]})
+        assert out == [{"team": "x", "member": "a"}, {"team": "x", "member": "b"}]
+
+    def test_explode_merge_then_later_steps_apply_to_each(self):
+        run = _pipeline(
+            {"step": "explode", "field": "repos", "merge": True},
+            {"step": "rename", "fields": {"name": "repo"}},
+        )
+        out = run({"org": "o", "repos": [{"name": "r1"}, {"name": "r2"}]})
+        assert out == [{"org": "o", "repo": "r1"}, {"org": "o", "repo": "r2"}]
+
+    def test_explode_passes_non_list_through(self):
+        run = _pipeline({"step": "explode", "field": "members"})
+        assert run({"team": "x"}) == [{"team": "x"}]
+
+    def test_explode_drops_item_with_empty_list(self):
+        run = _pipeline({"step": "explode", "field": "members"})
+        assert run({"team": "x", "members": []}) == []
+
+    def test_source_item_is_not_modified(self):
+        item = {"title": "a", "internal": 1}
+        _pipeline({"step": "drop", "fields": ["internal"]})(item)
+        assert item == {"title": "a", "internal": 1}
+
+    def test_no_steps_compiles_to_none(self):
+        assert compile_pipeline(parse_steps({})) is None
+
+    def test_legacy_flag_runs_first(self):
+        specs = parse_steps({"flatten_preferred_version": True, "preprocess": [{"step": "drop", "fields": ["versions"]}]})
+        assert [s["step"] for s in specs] == ["flatten_preferred_version", "drop"]
+        item = {"preferred": "1", "versions": {"1": {"info": {"title": "T"}}}}
+        out = compile_pipeline(specs)(item)[0]
+        assert out["preferred_info"] == {"title": "T"}
+        assert "versions" not in out
+
+
+class TestValidation:
+
+    def test_unknown_step_fails_at_config_load(self):
+        with pytest.raises(ValueError, match="test-source"):
+            _collector({"preprocess": [{"step": "nope"}]})
+
+    def test_missing_parameter(self):
+        with pytest.raises(ValueError, match="'fields' is required"):
+            _pipeline({"step": "rename"})
+
+    def test_unknown_coerce_type(self):
+        with pytest.raises(ValueError, match="unknown type"):
+            _pipeline({"step": "coerce", "fields": {"a": "decimal"}})
+
+
+class TestCollectorIntegration:
+
+    def test_compact_path_uses_exploded_items(self):
+        c = _collector(
+            {"preprocess": [{"step": "explode", "field": "members", "into": "member"}]},
+            mapping=[{"from": "team", "to": "team"}, {"from": "member", "to": "name"}],
+        )
+        section = c._transform_compact([{"team": "x", "members": ["a", "b"]}])
+        assert isinstance(section, CompactSection)
+        assert section == [{"team": "x", "name": "a"}, {"team": "x", "name": "b"}]
+
+    def test_pipeline_without_mapping_reuses_working_copy(self):
+        c = _collector({"preprocess": [{"step": "drop", "fields": ["secret"]}]}, defaults={"type": "t"})
+        c._fetch = lambda: [{"name": "a", "secret": "s"}]
+        assert c.collect() == [{"name": "a", "type": "t"}]
@@ -0,0 +1,60 @@
+"""Tests for the --profile mode (cProfile + tracemalloc per connector and writer)."""
+
+import os
+import pstats
+import sys
+from pathlib import Path
+
+import yaml
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from config.loader import Config
+from main import _profile_dir, main
+from utils.profiling import Profiler
+import gateway.client as client_mod
+
+
+def test_phase_writes_pstats_and_allocation_report(tmp_path):
+    profiler = Profiler(tmp_path / "prof", top=5)
+    profiler.start()
+    with profiler.phase("connector-cmdb/notifiers"):
+        blob = [str(i) * 10 for i in range(20000)]
+    profiler.stop()
+
+    phase = profiler.phases[0]
+    assert phase.name == "connector-cmdb/notifiers" and phase.allocated > 0
+    assert pstats.Stats(str(tmp_path / "prof" / "connector-cmdb_notifiers.pstats")).total_calls > 0
+    report = (tmp_path / "prof" / "connector-cmdb_notifiers.alloc.txt").read_text().splitlines()
+    assert "test_profiling.py" in report[1] and len(report) <= 6
+    assert (tmp_path / "prof" / "phases.txt").read_text().startswith("connector-cmdb/notifiers:")
+    assert blob
+
+
+def test_profile_dir_from_flag_or_env(tmp_path, monkeypatch):
+    monkeypatch.delenv("SEEDER_PROFILE_DIR", raising=False)
+    assert _profile_dir([], tmp_path) is None
+    assert _profile_dir(["--profile", "out"], tmp_path) == Path("out")
+    assert _profile_dir(["--profile"], tmp_path).parent == tmp_path / "profiles"
+    monkeypatch.setenv("SEEDER_PROFILE_DIR", str(tmp_path / "env"))
+    assert _profile_dir([], None) == tmp_path / "env"
+
+
+def test_main_profiles_connectors_and_writer(tmp_path, monkeypatch, capsys):
+    fixture = yaml.safe_load(open(os.path.join(os.path.dirname(__file__), "fixtures", "settings.yaml")).read())
+    fixture["output"] = {"file": str(tmp_path / "inputs.yaml")}
+    cfg_path = tmp_path / "settings.yaml"
+    cfg_path.write_text(yaml.safe_dump(fixture, sort_keys=False))
+    monkeypatch.setenv("SEEDER_CONFIG_FILE", str(cfg_path))
+    monkeypatch.delenv("OUTPUT_FILE", raising=False)
+    monkeypatch.setattr(
+        client_mod.ApiClient, "get",
+        lambda self, endpoint, **kw: {"1forge.com": {"preferred": "1", "versions": {"1": {"info": {"title": "1Forge"}}}}},
+    )
+
+    Config.reset()
+    main(["--profile", str(tmp_path / "prof")])
+    files = sorted(p.name for p in (tmp_path / "prof").iterdir())
+    assert "connector-apis-guru.pstats" in files and "write-default.alloc.txt" in files
+    out = capsys.readouterr().out
+    assert "Profile:" in out and "connector-apis-guru:" in out
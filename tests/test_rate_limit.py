@@ -0,0 +1,189 @@
+"""Tests for the per-host token-bucket rate limiter."""
+
+import os
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from config.loader import Config, ConnectorConfig
+from gateway.client import ApiClient
+from gateway.rate_limit import RateLimiters, TokenBucket, _parse_reset, _parse_retry_after
+
+
+class _FakeResponse:
+    def __init__(self, status=200, headers=None, body=b"[]"):
+        self.status_code = status
+        self.headers = headers or {}
+        self.body = body
+        self.encoding = "utf-8"
+        self.raw = self
+
+    def stream(self, size, decode_content=True):
+        yield self.body
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            import requests
+            raise requests.HTTPError(f"{self.status_code}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+def _client(limiters, responses):
+    source = ConnectorConfig({
+        "name": "quay",
+        "target_key": "orgs",
+        "connection": {"host": "https://quay.example.com", "auth_type": "none", "endpoint": "/api"},
+    })
+    client = ApiClient(source, rate_limiters=limiters)
+    calls = []
+
+    def get(**kwargs):
+        calls.append(time.monotonic())
+        return responses.pop(0)
+
+    client._session = SimpleNamespace(get=get)
+    return client, calls
+
+
+class TestHeaders:
+
+    def test_retry_after_seconds_and_date(self):
+        assert _parse_retry_after("3") == 3
+        assert _parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0
+        assert _parse_retry_after("soon") is None
+
+    def test_reset_delta_and_epoch(self):
+        assert _parse_reset("30") == 30
+        assert 29 <= _parse_reset(str(int(time.time()) + 30)) <= 31
+
+
+class TestTokenBucket:
+
+    def test_burst_then_rate(self):
+        bucket = TokenBucket(rate=10, burst=2)
+        assert bucket.reserve() == 0
+        assert bucket.reserve() == 0
+        assert 0.09 <= bucket.reserve() <= 0.11
+        assert 0.19 <= bucket.reserve() <= 0.21
+
+    def test_unconfigured_bucket_does_not_limit(self):
+        bucket = TokenBucket()
+        assert all(bucket.reserve() == 0 for _ in range(100))
+
+    def test_retry_after_pauses(self):
+        bucket = TokenBucket()
+        bucket.observe(429, {"Retry-After": "2"})
+        assert 1.9 <= bucket.reserve() <= 2
+
+    def test_exhausted_budget_pauses_until_reset(self):
+        bucket = TokenBucket(rate=100)
+        bucket.observe(200, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "5"})
+        assert 4.9 <= bucket.reserve() <= 5
+
+    def test_remaining_budget_lowers_rate(self):
+        bucket = TokenBucket(rate=100, burst=1)
+        bucket.observe(200, {"X-RateLimit-Remaining": "10", "X-RateLimit-Reset": "10"})
+        bucket.reserve()
+        assert 0.9 <= bucket.reserve() <= 1.0
+
+    def test_429_without_hints_pauses_briefly(self):
+        bucket = TokenBucket()
+        bucket.observe(429, {})
+        assert 0.9 <= bucket.reserve() <= 1.0
+
+    def test_concurrent_reservations_queue_up(self):
+        bucket = TokenBucket(rate=100, burst=1)
+        delays = []
+        threads = [threading.Thread(target=lambda: delays.append(bucket.reserve())) for _ in range(5)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        delays.sort()
+        assert delays[0] == 0
+        assert all(b > a for a, b in zip(delays, delays[1:]))
+        assert 0.03 <= delays[-1] <= 0.041
+
+    def test_callers_queued_behind_a_pause_are_spread_at_the_rate(self):
+        bucket = TokenBucket(rate=10, burst=5)
+        bucket.observe(429, {"Retry-After": "1"})
+        delays = [bucket.reserve() for _ in range(3)]
+        assert 0.9 <= delays[0] <= 1.0
+        assert [round(b - a, 2) for a, b in zip(delays, delays[1:])] == [0.1, 0.1]
+
+
+class TestClient:
+
+    def test_limiter_is_per_host(self):
+        limiters = RateLimiters({"quay.example.com": {"rate": 5, "burst": 1}, "default": {"rate": 1000}})
+        assert limiters.bucket("quay.example.com").rate == 5
+        assert limiters.bucket("cmdb.example.com").rate == 1000
+        assert limiters.bucket("quay.example.com") is limiters.bucket("quay.example.com")
+
+    def test_limiter_key_is_the_host_name(self):
+        source = ConnectorConfig({
+            "name": "quay",
+            "target_key": "orgs",
+            "connection": {"host": "https://user:pw@Quay.Example.com:8443", "auth_type": "none", "endpoint": "/api"},
+        })
+        assert ApiClient(source).host == "quay.example.com"
+
+    def test_429_is_retried_after_retry_after(self):
+        limiters = RateLimiters()
+        client, calls = _client(limiters, [
+            _FakeResponse(429, {"Retry-After": "0.1"}),
+            _FakeResponse(200, body=b'[{"name": "a"}]'),
+        ])
+        assert client.get("/api") == [{"name": "a"}]
+        assert len(calls) == 2 and calls[1] - calls[0] >= 0.09
+        assert client.rate_limit_wait_seconds >= 0.09
+        assert limiters.waited["quay.example.com"] >= 0.09
+
+    def test_persistent_429_gives_up(self):
+        import requests
+
+        responses = [_FakeResponse(429, {"Retry-After": "0"}) for _ in range(10)]
+        client, calls = _client(RateLimiters(), responses)
+        with pytest.raises(requests.HTTPError):
+            client.get("/api")
+        assert len(calls) == 4
+
+    def test_wait_is_reported_separately_from_network_time(self):
+        client, _ = _client(RateLimiters({"default": {"rate": 20, "burst": 1}}), [_FakeResponse() for _ in range(3)])
+        for _ in range(3):
+            client.get("/api")
+        assert client.rate_limit_wait_seconds >= 0.09
+        assert client.network_seconds < client.rate_limit_wait_seconds
+
+
+class TestConfig:
+
+    def test_rate_limits_validated(self):
+        assert Config._load_rate_limits({"q": {"rate": 2}}) == {"q": {"rate": 2.0, "burst": 2.0}}
+        with pytest.raises(ValueError, match="rate"):
+            Config._load_rate_limits({"q": {"burst": 2}})
+        with pytest.raises(ValueError, match="positive"):
+            Config._load_rate_limits({"q": {"rate": 0}})
+
+    def test_hosts_are_normalized_like_the_client(self):
+        limits = Config._load_rate_limits({"API.example.com:8443": {"rate": 2}, "default": {"rate": 50}})
+        assert list(limits) == ["api.example.com", "default"]
+        limiters = RateLimiters(limits)
+        source = ConnectorConfig({
+            "name": "api", "target_key": "items",
+            "connection": {"host": "https://api.example.com:8443", "auth_type": "none", "endpoint": "/items"},
+        })
+        assert limiters.bucket(ApiClient(source).host).rate == 2
+        assert RateLimiters({"Quay.example.com:443": {"rate": 5}}).bucket("quay.example.com").rate == 5
+        with pytest.raises(ValueError, match="more than once"):
+            Config._load_rate_limits({"api.example.com": {"rate": 1}, "API.example.com:80": {"rate": 2}})
@@ -0,0 +1,142 @@
+"""Tests for the compact item representation of mapped sections."""
+
+import os
+import pickle
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from collectors.generic_collector import GenericCollector
+from collectors.records import MISSING, CompactSection
+from config.loader import ConnectorConfig
+from output.json_writer import JsonWriter
+from output.yaml_writer import YamlWriter
+
+DEFAULTS = {"traits": {"mutabilityMode": "ALLOW_MUTATE", "visibility": "VISIBLE", "origin": "IMPERATIVE"}}
+
+
+def _collector(options=None):
+    source = ConnectorConfig({
+        "name": "test-source",
+        "connection": {"host": "https://example.com", "auth_type": "none", "endpoint": "/api/test"},
+        "mapping": {
+            "replace_object": "notifiers",
+            "fields": [
+                {"from": "title", "to": "name"},
+                {"from": "kind", "to": "type"},
+                {"from": "config.url", "to": "url"},
+                {"from": "traits", "to": "traits"},
+            ],
+        },
+        "defaults": DEFAULTS,
+        "options": options or {},
+    })
+    collector = GenericCollector.__new__(GenericCollector)
+    collector.source = source
+    return collector
+
+
+def _api_items(n):
+    return [
+        {"title": f"notifier-{i}", "kind": "jira", "config": {"url": f"https://jira/{i % 10}"}, "internal": i}
+        for i in range(n)
+    ]
+
+
+class TestCompactSection:
+
+    def test_matches_dict_transform(self):
+        c = _collector()
+        items = _api_items(20) + [{"title": "custom", "traits": {"origin": "CUSTOM"}}, {"title": None}]
+        section = c._transform_compact(items)
+        assert isinstance(section, CompactSection)
+        assert section == [c._transform(item) for item in items]
+        assert section[-2]["traits"] == {"origin": "CUSTOM"}
+        assert section[0]["traits"] == DEFAULTS["traits"]
+
+    def test_defaults_are_not_stored_per_row(self):
+        section = _collector()._transform_compact(_api_items(3))
+        slot = section.slot("traits")
+        assert all(row[slot] is MISSING for row in section.rows)
+
+    def test_pickle_keeps_missing_marker(self):
+        section = _collector()._transform_compact(_api_items(3))
+        copy = pickle.loads(pickle.dumps(section))
+        assert copy.rows[0][copy.slot("traits")] is MISSING
+        assert list(copy) == list(section)
+
+    def test_strings_are_interned(self):
+        section = _collector()._transform_compact(_api_items(100))
+        slot = section.slot("type")
+        assert len({id(row[slot]) for row in section.rows}) == 1
+
+    def test_column_access(self):
+        section = _collector()._transform_compact(_api_items(3))
+        assert list(section.column("name")) == ["notifier-0", "notifier-1", "notifier-2"]
+        assert list(section.column("traits")) == [DEFAULTS["traits"]] * 3
+
+    def test_collect_returns_compact_section_unless_disabled(self):
+        class FakeClient:
+            def get(self, endpoint):
+                return {"items": _api_items(3)}
+
+        for options, expected in (({}, CompactSection), ({"compact_records": False}, list)):
+            c = _collector(options)
+            c.client, c.shared, c.shared_response = FakeClient(), None, False
+            result = c.collect()
+            assert isinstance(result, expected)
+            assert result == [c._transform(item) for item in _api_items(3)]
+
+    def test_key_order_matches_dict_transform(self):
+        class FakeClient:
+            def get(self, endpoint):
+                return {"items": [{"title": "a", "kind": "jira"}, {"title": "b", "traits": {"origin": "CUSTOM"}}]}
+
+        def collect(compact):
+            c = _collector({"compact_records": compact})
+            c.source.defaults = {"type": "email", **DEFAULTS, "enabled": True}
+            c.client, c.shared, c.shared_response = FakeClient(), None, False
+            return [list(item.items()) for item in c.collect()]
+
+        assert collect(True) == collect(False)
+        assert [key for key, _ in collect(True)[1]] == ["name", "traits", "type", "enabled"]
+
+    def test_uses_less_memory_than_dicts(self):
+        c = _collector()
+        items = _api_items(20_000)
+
+        tracemalloc.start()
+        as_dicts = [c._transform(item) for item in items]
+        dict_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del as_dicts
+
+        tracemalloc.start()
+        compact = c._transform_compact(items)
+        compact_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        assert len(compact) == 20_000
+        assert compact_bytes < dict_bytes * 0.6
+
+
+class TestCompactOutput:
+
+    def test_writers_materialize_compact_sections(self, tmp_path):
+        c = _collector()
+        section = c._transform_compact(_api_items(5))
+        plain = section.materialize()
+
+        YamlWriter.write(tmp_path / "a.yaml", {"notifiers": section})
+        YamlWriter.write(tmp_path / "b.yaml", {"notifiers": plain})
+        assert (tmp_path / "a.yaml").read_bytes() == (tmp_path / "b.yaml").read_bytes()
+
+        JsonWriter.write(tmp_path / "a.json", {"notifiers": section})
+        assert JsonWriter.load_existing(tmp_path / "a.json") == {"notifiers": plain}
+
+    def test_diff_against_compact_section(self, tmp_path):
+        c = _collector()
+        out = tmp_path / "inputs.yaml"
+        YamlWriter.write(out, {"notifiers": c._transform_compact(_api_items(5))})
+        assert YamlWriter.write(out, {"notifiers": c._transform_compact(list(reversed(_api_items(5))))}) is False
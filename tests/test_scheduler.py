@@ -0,0 +1,199 @@
+"""Tests for the connector dependency graph and scheduler."""
+
+import os
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+import yaml
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from collectors.generic_collector import GenericCollector
+from collectors.records import CompactSection
+from collectors.scheduler import ConnectorGraph
+from config.loader import Config, ConnectorConfig
+from main import connector_runner, main
+import gateway.client as client_mod
+
+
+def _node(name, depends_on=(), enabled=True):
+    return SimpleNamespace(name=name, depends_on=list(depends_on), enabled=enabled)
+
+
+def _run(graph, execute, max_workers=4):
+    return [(o.source.name, o.result, o.skipped) for o in graph.run(execute, bool, max_workers)]
+
+
+class TestGraphValidation:
+
+    def test_unknown_dependency(self):
+        with pytest.raises(ValueError, match="'teams': depends_on 'orgs'"):
+            ConnectorGraph([_node("teams", ["orgs"])])
+
+    def test_cycle(self):
+        with pytest.raises(ValueError, match="cycle between: a, b"):
+            ConnectorGraph([_node("a", ["b"]), _node("b", ["a"]), _node("c")])
+
+    def test_self_dependency_is_a_cycle(self):
+        with pytest.raises(ValueError, match="cycle"):
+            ConnectorGraph([_node("a", ["a"])])
+
+    def test_ambiguous_dependency(self):
+        with pytest.raises(ValueError, match="ambiguous"):
+            ConnectorGraph([_node("a"), _node("a"), _node("b", ["a"])])
+
+
+class TestRun:
+
+    def test_dependents_receive_upstream_results(self):
+        graph = ConnectorGraph([_node("teams", ["orgs"]), _node("orgs"), _node("robots", ["orgs", "teams"])])
+        seen = {}
+
+        def execute(source, upstream):
+            seen[source.name] = dict(upstream)
+            return [source.name]
+
+        outcomes = _run(graph, execute)
+        assert [name for name, _, _ in outcomes] == ["orgs", "teams", "robots"]
+        assert seen == {"orgs": {}, "teams": {"orgs": ["orgs"]}, "robots": {"orgs": ["orgs"], "teams": ["teams"]}}
+
+    def test_independent_branches_run_concurrently(self):
+        graph = ConnectorGraph([_node("a"), _node("b"), _node("c")])
+        barrier = threading.Barrier(3, timeout=2)
+
+        def execute(source, upstream):
+            barrier.wait()
+            return [1]
+
+        assert len(_run(graph, execute)) == 3
+
+    def test_dependent_starts_before_unrelated_slow_connector_finishes(self):
+        graph = ConnectorGraph([_node("slow"), _node("orgs"), _node("teams", ["orgs"])])
+        finished = []
+
+        def execute(source, upstream):
+            if source.name == "slow":
+                time.sleep(0.2)
+            finished.append(source.name)
+            return [1]
+
+        _run(graph, execute)
+        assert finished.index("teams") < finished.index("slow")
+
+    def test_failure_skips_only_dependents(self):
+        graph = ConnectorGraph([
+            _node("orgs"), _node("teams", ["orgs"]), _node("members", ["teams"]), _node("clusters"),
+        ])
+        outcomes = _run(graph, lambda source, upstream: [] if source.name == "orgs" else [1])
+        by_name = {name: (result, skipped) for name, result, skipped in outcomes}
+        assert by_name["orgs"] == ([], None)
+        assert by_name["teams"] == (None, "upstream 'orgs' failed")
+        assert by_name["members"] == (None, "upstream 'orgs' failed")
+        assert by_name["clusters"] == ([1], None)
+
+    def test_disabled_upstream_skips_dependents(self):
+        graph = ConnectorGraph([_node("orgs", enabled=False), _node("teams", ["orgs"]), _node("other")])
+        outcomes = _run(graph, lambda source, upstream: [1])
+        assert ("teams", None, "upstream 'orgs' is disabled") in outcomes
+        assert [name for name, _, _ in outcomes if name == "orgs"] == []
+
+
+class TestValuesFromUpstream:
+
+    def _source(self):
+        return ConnectorConfig({
+            "name": "quay-teams",
+            "target_key": "teams",
+            "connection": {
+                "host": "https://quay.example.com", "auth_type": "none",
+                "endpoint": "/api/v1/organization/{org}/teams",
+            },
+            "fan_out": {"param": "org", "values_from": {"connector": "quay-orgs", "field": "name"}, "inject": True},
+        })
+
+    def test_values_from_adds_dependency(self):
+        assert self._source().depends_on == ["quay-orgs"]
+
+    @pytest.mark.parametrize("compact", [True, False])
+    def test_endpoints_templated_from_upstream_items(self, compact):
+        orgs = [{"name": "acme"}, {"name": "infra"}, {"name": "acme"}, {"other": 1}]
+        if compact:
+            section = CompactSection(["name", "other"])
+            for org in orgs:
+                section.append_row([org.get("name"), org.get("other")])
+            orgs = section
+
+        collector = GenericCollector.__new__(GenericCollector)
+        collector.source = self._source()
+        collector.shared = None
+        collector.shared_response = False
+        collector.upstream = {"quay-orgs": orgs}
+        calls = []
+        collector._fetch = lambda endpoint=None, body=None: calls.append(endpoint) or [{"name": "owners"}]
+
+        assert collector.collect() == [{"name": "owners", "org": "acme"}, {"name": "owners", "org": "infra"}]
+        assert sorted(calls) == ["/api/v1/organization/acme/teams", "/api/v1/organization/infra/teams"]
+
+
+def test_values_from_fans_out_through_the_graph(monkeypatch):
+    monkeypatch.setenv("SEEDER_CONFIG_FILE", os.path.join(os.path.dirname(__file__), "fixtures", "settings.yaml"))
+    Config.reset()
+    orgs = ConnectorConfig({
+        "name": "quay-orgs", "target_key": "organizations",
+        "connection": {"host": "https://quay.example.com", "auth_type": "none", "endpoint": "/orgs"},
+    })
+    teams = TestValuesFromUpstream()._source()
+
+    def fake_get(self, endpoint, **kwargs):
+        if endpoint == "/orgs":
+            return [{"name": "acme"}, {"name": "infra"}]
+        return [{"name": endpoint.split("/")[-2] + "-owners"}]
+
+    monkeypatch.setattr(client_mod.ApiClient, "get", fake_get)
+    ready = []
+    execute = connector_runner(on_items=lambda source, items: ready.append(source.name))
+    outcomes = {o.source.name: o for o in ConnectorGraph([teams, orgs]).run(execute, lambda run: bool(run.items), 2)}
+
+    assert outcomes["quay-orgs"].result.items == [{"name": "acme"}, {"name": "infra"}]
+    assert sorted(outcomes["quay-teams"].result.items, key=lambda item: item["org"]) == [
+        {"name": "acme-owners", "org": "acme"}, {"name": "infra-owners", "org": "infra"},
+    ]
+    assert ready == ["quay-orgs", "quay-teams"]
+
+
+def test_values_from_receives_upstream_items_in_a_run(tmp_path, monkeypatch):
+    """values_from bekommt die Items des Upstream-Connectors, nicht das Laufergebnis."""
+    settings = {
+        "output": {"file": str(tmp_path / "inputs.yaml")},
+        "connectors": [
+            {
+                "name": "quay-orgs", "target_key": "organizations",
+                "connection": {"host": "https://quay.example.com", "auth_type": "none", "endpoint": "/orgs"},
+            },
+            {
+                "name": "quay-teams", "target_key": "teams",
+                "connection": {
+                    "host": "https://quay.example.com", "auth_type": "none",
+                    "endpoint": "/api/v1/organization/{org}/teams",
+                },
+                "fan_out": {"param": "org", "values_from": {"connector": "quay-orgs", "field": "name"}, "inject": True},
+            },
+        ],
+    }
+    cfg_path = tmp_path / "settings.yaml"
+    cfg_path.write_text(yaml.safe_dump(settings, sort_keys=False))
+    monkeypatch.setenv("SEEDER_CONFIG_FILE", str(cfg_path))
+    monkeypatch.delenv("OUTPUT_FILE", raising=False)
+
+    def fake_get(self, endpoint, **kwargs):
+        if endpoint == "/orgs":
+            return [{"name": "acme"}]
+        return [{"name": endpoint.split("/")[-2] + "-owners"}]
+
+    monkeypatch.setattr(client_mod.ApiClient, "get", fake_get)
+    Config.reset()
+    main()
+    assert yaml.safe_load((tmp_path / "inputs.yaml").read_text())["teams"] == [{"name": "acme-owners", "org": "acme"}]
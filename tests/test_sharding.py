@@ -0,0 +1,167 @@
+"""Tests for splitting connectors across replicas via lease files."""
+
+import json
+import multiprocessing
+import os
+import signal
+import sys
+import time
+from types import SimpleNamespace
+
+import pytest
+import yaml
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from collectors.scheduler import ConnectorGraph
+from collectors.sharding import FileCoordinator, ShardWorker
+from config.loader import Config
+from main import main
+import gateway.client as client_mod
+
+
+def _node(name, depends_on=()):
+    return SimpleNamespace(name=name, depends_on=list(depends_on), enabled=True)
+
+
+CONNECTORS = [("orgs", ()), ("teams", ("orgs",))] + [(f"c{i}", ()) for i in range(8)]
+
+
+def _replica(root, owner, log_path, result_path, block=None, lease_seconds=5.0):
+    """Eine Replika: arbeitet Connector-Gruppen ab und schreibt beim Mergen das Gesamtergebnis."""
+    graph = ConnectorGraph([_node(name, deps) for name, deps in CONNECTORS])
+    coordinator = FileCoordinator(root, "run-1", owner, lease_seconds)
+
+    def execute(source, upstream):
+        with open(log_path, "a") as f:
+            f.write(f"{owner} {source.name}\n")
+        if source.name == block:
+            time.sleep(60)
+        time.sleep(0.05)
+        return [f"{source.name}<-{','.join(sorted(upstream))}"]
+
+    merging, outcomes = ShardWorker(coordinator, graph, poll_interval=0.05).run(execute, bool, 2)
+    if merging:
+        with open(result_path, "w") as f:
+            json.dump({o.source.name: o.result for o in outcomes}, f)
+        coordinator.finish()
+
+
+def _runs(log_path):
+    with open(log_path) as f:
+        return [line.split() for line in f.read().splitlines()]
+
+
+class TestFileCoordinator:
+
+    def test_lease_is_exclusive_until_it_expires(self, tmp_path):
+        a = FileCoordinator(tmp_path, "r", "a", lease_seconds=0.1)
+        b = FileCoordinator(tmp_path, "r", "b", lease_seconds=0.1)
+        lease = a.claim("unit")
+        assert lease.generation == 0 and b.claim("unit") is None
+        time.sleep(0.15)
+        taken = b.claim("unit")
+        assert taken.generation == 1
+        assert not a.renew(lease) and b.renew(taken)
+
+    def test_results_are_write_once(self, tmp_path):
+        a = FileCoordinator(tmp_path, "r", "a")
+        b = FileCoordinator(tmp_path, "r", "b")
+        assert a.complete("unit", [1]) and not b.complete("unit", [2])
+        assert b.result("unit") == [1] and b.claim("unit") is None
+
+    def test_finish(self, tmp_path):
+        a = FileCoordinator(tmp_path, "r", "a")
+        a.complete("unit", [1])
+        a.finish()
+        assert a.is_done() and a.result("unit") is None
+
+
+class TestComponents:
+
+    def test_dependent_connectors_stay_together(self):
+        graph = ConnectorGraph([_node("a"), _node("b", ["c"]), _node("c"), _node("d", ["a"])])
+        assert graph.components() == [[0, 3], [1, 2]]
+
+
+@pytest.fixture
+def ctx():
+    return multiprocessing.get_context("fork")
+
+
+def test_replicas_split_the_work_and_one_merges(tmp_path, ctx):
+    log_path, result_path = tmp_path / "log", tmp_path / "result.json"
+    procs = [
+        ctx.Process(target=_replica, args=(tmp_path / "shards", f"r{i}", log_path, result_path))
+        for i in range(3)
+    ]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(30)
+        assert p.exitcode == 0
+
+    runs = _runs(log_path)
+    assert sorted(name for _, name in runs) == sorted(name for name, _ in CONNECTORS)
+    assert len({owner for owner, _ in runs}) > 1
+    owners = {name: owner for owner, name in runs}
+    assert owners["orgs"] == owners["teams"]
+
+    merged = json.loads(result_path.read_text())
+    assert merged["teams"] == ["teams<-orgs"]
+    assert len(merged) == len(CONNECTORS)
+    assert (tmp_path / "shards" / "run-1" / "done").exists()
+
+
+def test_work_of_a_dead_replica_is_reassigned(tmp_path, ctx):
+    log_path, result_path = tmp_path / "log", tmp_path / "result.json"
+    shards = tmp_path / "shards"
+    dying = ctx.Process(target=_replica, args=(shards, "dying", log_path, result_path, "c3", 0.5))
+    dying.start()
+    for _ in range(200):
+        if log_path.exists() and ["dying", "c3"] in _runs(log_path):
+            break
+        time.sleep(0.05)
+    os.kill(dying.pid, signal.SIGKILL)
+    dying.join()
+    time.sleep(0.6)  # its leases, including the merge lease, expire
+
+    survivor = ctx.Process(target=_replica, args=(shards, "survivor", log_path, result_path, None, 0.5))
+    survivor.start()
+    survivor.join(30)
+    assert survivor.exitcode == 0
+
+    assert ["survivor", "c3"] in _runs(log_path)
+    merged = json.loads(result_path.read_text())
+    assert merged["c3"] == ["c3<-"] and len(merged) == len(CONNECTORS)
+
+
+def test_main_with_single_shard_writes_output(tmp_path, monkeypatch):
+    fixture = yaml.safe_load(open(os.path.join(os.path.dirname(__file__), "fixtures", "settings.yaml")).read())
+    fixture["output"] = {"file": str(tmp_path / "inputs.yaml")}
+    fixture["shard"] = {"dir": str(tmp_path / "shards"), "run_id": "job-1"}
+    cfg_path = tmp_path / "settings.yaml"
+    cfg_path.write_text(yaml.safe_dump(fixture, sort_keys=False))
+    monkeypatch.setenv("SEEDER_CONFIG_FILE", str(cfg_path))
+    monkeypatch.delenv("OUTPUT_FILE", raising=False)
+    monkeypatch.setattr(
+        client_mod.ApiClient, "get",
+        lambda self, endpoint, **kw: {"1forge.com": {"preferred": "1", "versions": {"1": {"info": {"title": "1Forge"}}}}},
+    )
+
+    Config.reset()
+    main()
+    assert yaml.safe_load((tmp_path / "inputs.yaml").read_text())["apis"][0]["title"] == "1Forge"
+    assert (tmp_path / "shards" / "job-1" / "done").exists()
+
+
+def test_run_id_is_required(tmp_path, monkeypatch):
+    fixture = yaml.safe_load(open(os.path.join(os.path.dirname(__file__), "fixtures", "settings.yaml")).read())
+    fixture["shard"] = {"dir": str(tmp_path / "shards")}
+    cfg_path = tmp_path / "settings.yaml"
+    cfg_path.write_text(yaml.safe_dump(fixture, sort_keys=False))
+    monkeypatch.setenv("SEEDER_CONFIG_FILE", str(cfg_path))
+    monkeypatch.delenv("SHARD_RUN_ID", raising=False)
+    Config.reset()
+    with pytest.raises(ValueError, match="run_id"):
+        Config()
@@ -0,0 +1,125 @@
+"""Tests for request coalescing across connectors."""
+
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from collectors.generic_collector import GenericCollector
+from collectors.shared_responses import SharedResponses
+from config.loader import Config, ConnectorConfig
+import gateway.client as client_mod
+
+
+def _source(name, target, field):
+    return ConnectorConfig({
+        "name": name,
+        "connection": {"host": "https://cmdb.example.com", "auth_type": "none", "endpoint": "/api/v1/all"},
+        "mapping": {"replace_object": target, "fields": [{"from": field, "to": "name"}]},
+    })
+
+
+class TestSharedResponses:
+
+    def test_identical_key_fetched_once(self):
+        shared = SharedResponses()
+        key = SharedResponses.request_key("GET", "https://x/a", {"Authorization": "Bearer t"})
+        calls = []
+        first = shared.fetch(key, lambda: calls.append(1) or {"data": [1]})
+        second = shared.fetch(key, lambda: calls.append(1) or {"data": [2]})
+        assert calls == [1]
+        assert first == ({"data": [1]}, False)
+        assert second == ({"data": [1]}, True)
+        assert (shared.requests, shared.coalesced) == (1, 1)
+
+    def test_different_auth_is_not_coalesced(self):
+        a = SharedResponses.request_key("GET", "https://x/a", {"Authorization": "Bearer a"})
+        b = SharedResponses.request_key("GET", "https://x/a", {"Authorization": "Bearer b"})
+        c = SharedResponses.request_key("GET", "https://x/a", {"Authorization": "Bearer a"}, params={"page": 2})
+        assert len({a, b, c}) == 3
+
+    def test_concurrent_requests_wait_for_first(self):
+        shared = SharedResponses()
+        key = SharedResponses.request_key("GET", "https://x/a")
+        calls = []
+
+        def slow():
+            calls.append(1)
+            time.sleep(0.05)
+            return [1, 2, 3]
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(shared.fetch(key, slow))) for _ in range(5)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert calls == [1]
+        assert sorted(shared_flag for _, shared_flag in results) == [False, True, True, True, True]
+
+    def test_finished_responses_are_bounded(self):
+        shared = SharedResponses(max_entries=2)
+        keys = [SharedResponses.request_key("GET", f"https://x/{i}") for i in range(3)]
+        shared.fetch(keys[0], lambda: "a")
+        shared.fetch(keys[1], lambda: "b")
+        assert shared.fetch(keys[0], lambda: "stale") == ("a", True)  # now most recently used
+        shared.fetch(keys[2], lambda: "c")
+        assert list(shared._entries) == [keys[0], keys[2]]
+        assert shared.fetch(keys[1], lambda: "b2") == ("b2", False)
+
+    def test_in_flight_requests_are_not_dropped(self):
+        shared = SharedResponses(max_entries=1)
+        slow_key, key = (SharedResponses.request_key("GET", f"https://x/{i}") for i in range(2))
+        started, release = threading.Event(), threading.Event()
+
+        def slow():
+            started.set()
+            release.wait()
+            return "slow"
+
+        thread = threading.Thread(target=shared.fetch, args=(slow_key, slow))
+        thread.start()
+        started.wait()
+        shared.fetch(key, lambda: "fast")
+        assert list(shared._entries) == [slow_key]
+        release.set()
+        assert shared.fetch(slow_key, lambda: "again") == ("slow", True)
+        thread.join()
+
+    def test_error_is_shared(self):
+        shared = SharedResponses()
+        key = SharedResponses.request_key("GET", "https://x/a")
+
+        def boom():
+            raise RuntimeError("down")
+
+        with pytest.raises(RuntimeError):
+            shared.fetch(key, boom)
+        with pytest.raises(RuntimeError):
+            shared.fetch(key, lambda: [1])
+
+
+def test_connectors_share_one_download(monkeypatch):
+    monkeypatch.setenv("SEEDER_CONFIG_FILE", os.path.join(os.path.dirname(__file__), "fixtures", "settings.yaml"))
+    Config.reset()
+
+    calls = []
+
+    def fake_get(self, endpoint, **kwargs):
+        calls.append(endpoint)
+        return [{"title": "t1", "label": "l1"}, {"title": "t2", "label": "l2"}]
+
+    monkeypatch.setattr(client_mod.ApiClient, "get", fake_get)
+
+    shared = SharedResponses()
+    notifiers = GenericCollector(_source("notifiers", "notifiers", "title"), shared=shared)
+    integrations = GenericCollector(_source("integrations", "integrations", "label"), shared=shared)
+
+    assert notifiers.collect() == [{"name": "t1"}, {"name": "t2"}]
+    assert integrations.collect() == [{"name": "l1"}, {"name": "l2"}]
+    assert calls == ["/api/v1/all"]
+    assert (notifiers.shared_response, integrations.shared_response) == (False, True)
@@ -3,6 +3,8 @@
 import os
 import sys
 
+import pytest
+
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
 
 from config.loader import ConnectorConfig
@@ -255,3 +257,20 @@ class TestNormalization:
         result = c._dict_to_list(data)
         assert result[0]["api_id"] == "1forge.com"
         assert result[1]["api_id"] == "1password.com:events"
+
+
+class TestDefaultsAreShared:
+    """Defaults werden einmal pro Connector eingefroren und per Referenz geteilt."""
+
+    def test_defaults_are_not_copied_per_item(self):
+        c = _make_collector(mapping={"title": "name"}, defaults={"traits": {"origin": "IMPERATIVE"}})
+        a = c._transform({"title": "A"})
+        b = c._transform({"title": "B"})
+        assert a["traits"] is b["traits"]
+
+    def test_defaults_are_read_only(self):
+        c = _make_collector(mapping={"title": "name"}, defaults={"traits": {"origin": "IMPERATIVE"}})
+        result = c._transform({"title": "A"})
+        with pytest.raises(TypeError):
+            result["traits"]["origin"] = "CUSTOM"
+        assert c.source.defaults["traits"]["origin"] == "IMPERATIVE"
@@ -0,0 +1,165 @@
+"""Tests for the JSON and sharded output writers."""
+
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from output.json_writer import JsonWriter
+from output.sharded_writer import ShardedWriter
+from output.writers import get_writer
+from output.yaml_writer import SharedStructureYamlWriter, YamlWriter
+import output.yaml_writer as yaml_writer_mod
+from utils.frozen import freeze
+
+import yaml
+
+DATA = {
+    "notifiers": [{"name": "A", "type": "jira", "traits": {"origin": "IMPERATIVE"}}, {"name": "Ü", "type": "email"}],
+    "integrations": [],
+}
+
+
+class TestJsonWriter:
+
+    def test_round_trip(self, tmp_path):
+        out = tmp_path / "inputs.json"
+        assert JsonWriter.write(out, DATA) is True
+        assert json.loads(out.read_text()) == DATA
+        assert JsonWriter.load_existing(out) == DATA
+
+    def test_same_data_skips_write(self, tmp_path):
+        out = tmp_path / "inputs.json"
+        JsonWriter.write(out, DATA)
+        assert JsonWriter.write(out, DATA) is False
+
+    def test_reorder_is_not_a_change(self, tmp_path):
+        out = tmp_path / "inputs.json"
+        JsonWriter.write(out, DATA)
+        reordered = {"notifiers": list(reversed(DATA["notifiers"])), "integrations": []}
+        assert JsonWriter.write(out, reordered) is False
+
+    def test_empty_data(self, tmp_path):
+        out = tmp_path / "inputs.json"
+        JsonWriter.write(out, {})
+        assert json.loads(out.read_text()) == {}
+
+
+class TestShardedWriter:
+
+    def test_writes_index_and_sections(self, tmp_path):
+        out = tmp_path / "inputs" / "index.yaml"
+        assert ShardedWriter.write(out, DATA) is True
+        assert (out.parent / "notifiers.yaml").exists()
+        assert (out.parent / "integrations.yaml").exists()
+        assert ShardedWriter.load_existing(out) == DATA
+
+    def test_unchanged_sections_are_not_serialized(self, tmp_path, monkeypatch):
+        out = tmp_path / "index.yaml"
+        ShardedWriter.write(out, DATA)
+
+        emitted = []
+        original = YamlWriter.emit.__func__
+
+        def spy(cls, stream, data, *args, **kwargs):
+            emitted.append(list(data))
+            return original(cls, stream, data, *args, **kwargs)
+
+        monkeypatch.setattr(YamlWriter, "emit", classmethod(spy))
+        changed = dict(DATA, integrations=[{"name": "Q", "type": "quay"}])
+        assert ShardedWriter.write(out, changed) is True
+        assert ["integrations"] in emitted
+        assert ["notifiers"] not in emitted
+
+    def test_same_data_reports_unchanged(self, tmp_path):
+        out = tmp_path / "index.yaml"
+        ShardedWriter.write(out, DATA)
+        mtime = (tmp_path / "notifiers.yaml").stat().st_mtime_ns
+        assert ShardedWriter.write(out, DATA) is False
+        assert (tmp_path / "notifiers.yaml").stat().st_mtime_ns == mtime
+
+    def test_removed_section_deletes_file(self, tmp_path):
+        out = tmp_path / "index.yaml"
+        ShardedWriter.write(out, DATA)
+        assert ShardedWriter.write(out, {"notifiers": DATA["notifiers"]}) is True
+        assert not (tmp_path / "integrations.yaml").exists()
+        assert list(ShardedWriter.load_index(out)) == ["notifiers"]
+
+    def test_section_named_like_the_index(self, tmp_path):
+        out = tmp_path / "index.yaml"
+        data = dict(DATA, index=[{"name": "I"}])
+        assert ShardedWriter.write(out, data) is True
+        assert ShardedWriter.load_index(out)["index"]["file"].startswith("index-")
+        assert ShardedWriter.load_existing(out) == data
+        assert ShardedWriter.write(out, data) is False
+
+    def test_sanitized_names_do_not_collide(self, tmp_path):
+        out = tmp_path / "index.yaml"
+        data = {"a b": [{"name": "space"}], "a_b": [{"name": "underscore"}]}
+        assert ShardedWriter.write(out, data) is True
+        files = {key: entry["file"] for key, entry in ShardedWriter.load_index(out).items()}
+        assert files["a_b"] == "a_b.yaml" and files["a b"].startswith("a_b-")
+        assert ShardedWriter.load_existing(out) == data
+
+        assert ShardedWriter.write(out, {"a b": data["a b"]}) is True
+        assert not (tmp_path / "a_b.yaml").exists()
+        assert ShardedWriter.load_existing(out) == {"a b": data["a b"]}
+
+
+class TestSharedStructure:
+    """Defaults shared by reference: expanded by default, named anchors on request."""
+
+    TRAITS = freeze({"mutabilityMode": "ALLOW_MUTATE", "visibility": "VISIBLE", "origin": "IMPERATIVE"})
+
+    def _data(self, n=50):
+        return {"notifiers": [{"name": f"n{i}", "traits": self.TRAITS} for i in range(n)]}
+
+    def test_default_output_has_no_anchors(self, tmp_path):
+        out = tmp_path / "inputs.yaml"
+        YamlWriter.write(out, self._data())
+        text = out.read_text()
+        assert "&" not in text and "*" not in text
+        assert yaml.safe_load(text) == self._data()
+
+    def test_shared_mode_emits_named_anchors(self, tmp_path):
+        expanded, shared = tmp_path / "expanded.yaml", tmp_path / "shared.yaml"
+        YamlWriter.write(expanded, self._data())
+        SharedStructureYamlWriter.write(shared, self._data())
+        text = shared.read_text()
+        assert "&shared_" in text and "*shared_" in text
+        assert "&id001" not in text
+        assert yaml.safe_load(text) == self._data()
+        assert shared.stat().st_size < expanded.stat().st_size
+
+    def test_equal_but_distinct_objects_get_distinct_anchors(self, tmp_path):
+        a, b = {"x": 1}, {"x": 1}
+        out = tmp_path / "shared.yaml"
+        SharedStructureYamlWriter.write(out, {"s": [{"t": a}, {"t": a}, {"t": b}, {"t": b}]})
+        assert yaml.safe_load(out.read_text()) == {"s": [{"t": {"x": 1}}] * 4}
+
+    def test_chunked_emission_matches_single_dump(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(yaml_writer_mod, "EMIT_CHUNK_SIZE", 7)
+        out = tmp_path / "inputs.yaml"
+        data = dict(self._data(30), integrations=[], other={"k": "v"})
+        YamlWriter.write(out, data)
+        single = yaml_writer_mod.HEADER + yaml.dump(
+            data, Dumper=yaml_writer_mod._ExpandedDumper, default_flow_style=False, allow_unicode=True, sort_keys=False,
+        )
+        assert out.read_text() == single
+
+    def test_frozen_defaults_are_read_only(self):
+        with pytest.raises(TypeError):
+            self.TRAITS["origin"] = "CUSTOM"
+
+
+def test_get_writer():
+    assert get_writer("yaml") is YamlWriter
+    assert get_writer("json") is JsonWriter
+    assert get_writer("sharded") is ShardedWriter
+    assert get_writer("yaml", shared_structure=True) is SharedStructureYamlWriter
+    assert get_writer("json", shared_structure=True) is JsonWriter
+    with pytest.raises(ValueError):
+        get_writer("xml")